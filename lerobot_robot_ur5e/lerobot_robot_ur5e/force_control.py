@@ -0,0 +1,81 @@
+import math
+from typing import Sequence
+
+import numpy as np
+
+from .config_ur5e import UR5eConfig
+
+
+def _half_angle_quaternion(rx: float, ry: float, rz: float) -> tuple[float, float, float, float]:
+    theta = math.sqrt(rx * rx + ry * ry + rz * rz)
+    if theta < 1e-12:
+        return 1.0, 0.5 * rx, 0.5 * ry, 0.5 * rz
+    s = math.sin(0.5 * theta) / theta
+    return math.cos(0.5 * theta), rx * s, ry * s, rz * s
+
+
+def _clip(value: float, limit: float) -> float:
+    if value > limit:
+        return limit
+    if value < -limit:
+        return -limit
+    return value
+
+
+class ForceController:
+    """Clipped PD wrench for UR forceMode, computed without temporary arrays.
+
+    Gains are read from UR5eConfig once. Each tick writes into a preallocated
+    wrench buffer; the rotation error log(R_target @ R_curr.T) is evaluated in
+    closed form through quaternions instead of exp3/log3 matrices.
+    """
+
+    def __init__(self, config: UR5eConfig):
+        self.kp = float(config.kp)
+        self.kd = float(config.kd)
+        # The legacy controller divided the rotational PD term by rtde_freq.
+        self.kp_rot = float(config.kp_rot) / float(config.rtde_freq)
+        self.kd_rot = float(config.kd_rot) / float(config.rtde_freq)
+        self.pos_delta = float(config.pos_delta)
+        self.vel_delta = float(config.vel_delta)
+        self.wrench = np.zeros(6, dtype=float)
+
+    def compute(self, target_pose: Sequence[float], curr_pose: Sequence[float], curr_vel: Sequence[float]) -> np.ndarray:
+        """Return the wrench [Fx, Fy, Fz, Tx, Ty, Tz] for rotation-vector poses.
+
+        The returned array is the controller's own buffer and is overwritten
+        on the next call.
+        """
+        tx, ty, tz, trx, try_, trz = target_pose
+        cx, cy, cz, crx, cry, crz = curr_pose
+        vx, vy, vz, wx, wy, wz = curr_vel
+        wrench = self.wrench
+
+        # position
+        kp, kd, pos_delta, vel_delta = self.kp, self.kd, self.pos_delta, self.vel_delta
+        wrench[0] = kp * _clip(tx - cx, pos_delta) + kd * _clip(-vx, vel_delta)
+        wrench[1] = kp * _clip(ty - cy, pos_delta) + kd * _clip(-vy, vel_delta)
+        wrench[2] = kp * _clip(tz - cz, pos_delta) + kd * _clip(-vz, vel_delta)
+
+        # orientation: q_err = q_target * conj(q_curr), rot_err = log(q_err)
+        aw, ax, ay, az = _half_angle_quaternion(trx, try_, trz)
+        bw, bx, by, bz = _half_angle_quaternion(crx, cry, crz)
+        qw = aw * bw + ax * bx + ay * by + az * bz
+        qx = -aw * bx + ax * bw - ay * bz + az * by
+        qy = -aw * by + ay * bw - az * bx + ax * bz
+        qz = -aw * bz + az * bw - ax * by + ay * bx
+        if qw < 0.0:
+            qw, qx, qy, qz = -qw, -qx, -qy, -qz
+        norm = math.sqrt(qx * qx + qy * qy + qz * qz)
+        scale = 2.0 * math.atan2(norm, qw) / norm if norm > 1e-12 else 2.0
+
+        kp_rot, kd_rot = self.kp_rot, self.kd_rot
+        wrench[3] = kp_rot * scale * qx - kd_rot * wx
+        wrench[4] = kp_rot * scale * qy - kd_rot * wy
+        wrench[5] = kp_rot * scale * qz - kd_rot * wz
+        return wrench
+
+    def compute_from_state(self, target_pose: Sequence[float], tcp_state: np.ndarray) -> np.ndarray:
+        """Same as compute(), reading pose and velocity from a [pose(6), speed(6)] state vector."""
+        state = tcp_state.tolist()
+        return self.compute(target_pose, state[:6], state[6:])
@@ -13,6 +13,7 @@ from lerobot.utils.errors import DeviceNotConnectedError, DeviceAlreadyConnected
 from lerobot.robots.robot import Robot
 from pyDHgripper import PGE
 from .config_ur5e import UR5eConfig
+from .force_control import ForceController
 from pathlib import Path
 import pinocchio as pin
 from datetime import datetime
@@ -43,11 +44,36 @@ class UR5e(Robot):
         self.urdf_path=Path(__file__).parents[2] / self.config.robot_urdf_path
         self.task_frame= [0,0,0,0,0,0]
         self.type=2
+        self._force_controller = ForceController(config)
+        # EE pose (rotvec) and TCP speed from the latest observation, used by joint_to_tcp_force
+        self._tcp_state = np.zeros(12, dtype=float)
+        self._tcp_state_fresh = False
             
     def connect(self) -> None:
         if self.is_connected:
             raise DeviceAlreadyConnectedError(f"{self.name} is already connected.")
 
+        self.validate_config()
+
+        # Connect to robot
+        self.connect_arm()
+
+        # Init_pinocchio
+        self.init_kinematics()
+
+        # Initialize gripper
+        self.connect_gripper()
+
+        # Connect cameras
+        logger.info("\n===== [CAM] Initializing Cameras =====")
+        for cam_name in self.cameras:
+            self.connect_camera(cam_name)
+        logger.info("===== [CAM] Cameras Initialized Successfully =====\n")
+
+        self.is_connected = True
+        logger.info(f"[INFO] {self.name} env initialization completed successfully.\n")
+
+    def validate_config(self) -> None:
         if self.config.control_space not in ("joint", "joint_to_tcp_force", "tcp_force", "tcp_position"):
             raise ValueError(
                 f"Unsupported control_space: {self.config.control_space}. "
@@ -64,32 +90,35 @@ class UR5e(Robot):
                 "Expected 'base' or 'tcp'."
             )
 
-        # Connect to robot
+    # The steps below make up connect(); they are independent of each other, so a
+    # startup orchestrator may run them concurrently and then set is_connected itself.
+    def connect_arm(self) -> None:
         self._arm['rtde_r'], self._arm['rtde_c'] = self._check_ur5e_connection(self.config.robot_ip)
-        
+
         # Set force mode gain scaling
         if self.config.control_space in ("joint_to_tcp_force", "tcp_force"):
             self._arm["rtde_c"].forceModeSetGainScaling(self.config.gain_scale)
-        
-        # Init_pinocchio
+
+    def init_kinematics(self) -> None:
         self._init_pinocchio(self.urdf_path, base_frame="base", ee_frame="tool0")
-        
-        # Initialize gripper
-        if self.config.use_gripper:
-            self._gripper = self._check_gripper_connection(self.config.gripper_port)
 
-            # Start gripper state reader
-            self._start_gripper_state_reader()
+    def connect_gripper(self) -> None:
+        if not self.config.use_gripper:
+            return
+        self._gripper = self._check_gripper_connection(self.config.gripper_port)
 
-        # Connect cameras
-        logger.info("\n===== [CAM] Initializing Cameras =====")
-        for cam_name, cam in self.cameras.items():
-            cam.connect()
-            logger.info(f"[CAM] {cam_name} connected successfully.")
-        logger.info("===== [CAM] Cameras Initialized Successfully =====\n")
+        # Start gripper state reader
+        self._start_gripper_state_reader()
 
-        self.is_connected = True
-        logger.info(f"[INFO] {self.name} env initialization completed successfully.\n")
+    def connect_camera(self, cam_name: str) -> None:
+        self.cameras[cam_name].connect()
+        logger.info(f"[CAM] {cam_name} connected successfully.")
+
+    def disconnect_arm(self) -> None:
+        if not self._arm:
+            return
+        self._arm["rtde_c"].disconnect()
+        self._arm["rtde_r"].disconnect()
 
 
     def _check_gripper_connection(self, port: str):
@@ -207,19 +236,7 @@ class UR5e(Robot):
         self.data=self.model.createData()
         
     def _calculate_force(self, target_pos, curr_pos, curr_vel):
-        # position
-        diff_p = np.clip(np.array(target_pos[:3]) - np.array(curr_pos[:3]), -self.config.pos_delta, self.config.pos_delta)
-        diff_d = np.clip(-np.array(curr_vel[:3]), -self.config.vel_delta, self.config.vel_delta)
-        force_pos = self.config.kp * diff_p + self.config.kd * diff_d
-        
-        # orientation (Pinocchio version)
-        R_target = pin.exp3(np.array(target_pos[3:]))
-        R_curr   = pin.exp3(np.array(curr_pos[3:]))
-        R_err = R_target @ R_curr.T
-        rot_err = pin.log3(R_err)
-        torque = (self.config.kp_rot * rot_err - self.config.kd_rot * np.array(curr_vel[3:])) / self.config.rtde_freq
-
-        return np.concatenate((force_pos, torque))  
+        return self._force_controller.compute(target_pos, curr_pos, curr_vel)
 
     def _fk(self, joint_positions):
         q = np.array(joint_positions)
@@ -238,19 +255,20 @@ class UR5e(Robot):
 
         return np.concatenate([position, rotvec])
     
-    def _calculate_ft_target(self, action: dict[str, Any]) -> list[float]:
+    def _read_tcp_state(self) -> None:
+        tcp_pose = self._arm["rtde_r"].getActualTCPPose()
+        tcp_offset = self._arm["rtde_c"].getTCPOffset()
+        self._tcp_state[:6] = self.tcp_to_ee_pose(tcp_pose, tcp_offset)
+        self._tcp_state[6:] = self._arm["rtde_r"].getActualTCPSpeed()
+
+    def _calculate_ft_target(self, action: dict[str, Any]) -> np.ndarray:
         joint_positions = [float(action[f"joint_{i+1}.pos"]) for i in range(self._num_joints)]
-        target_pose = self._fk(joint_positions)
-        curr_pose = [
-            float(self.obs_dict["tcp_pose.x"]), float(self.obs_dict["tcp_pose.y"]), float(self.obs_dict["tcp_pose.z"]),
-            float(self.obs_dict["tcp_pose.rx"]), float(self.obs_dict["tcp_pose.ry"]), float(self.obs_dict["tcp_pose.rz"])
-        ]
-        curr_vel = [
-            float(self.obs_dict["tcp_speed.x"]), float(self.obs_dict["tcp_speed.y"]), float(self.obs_dict["tcp_speed.z"]),
-            float(self.obs_dict["tcp_speed.rx"]), float(self.obs_dict["tcp_speed.ry"]), float(self.obs_dict["tcp_speed.rz"])
-        ]
-        ft_target = self._calculate_force(target_pose, curr_pose, curr_vel)  # [Fx,Fy,Fz,Tx,Ty,Tz]
-        return ft_target
+        target_pose = self._fk(joint_positions).tolist()
+        # Reuse the state read by get_observation() in this tick, otherwise (e.g. replay) read it now
+        if not self._tcp_state_fresh:
+            self._read_tcp_state()
+        self._tcp_state_fresh = False
+        return self._force_controller.compute_from_state(target_pose, self._tcp_state)  # [Fx,Fy,Fz,Tx,Ty,Tz]
 
     def _pose_to_transform(self, pose: list[float] | np.ndarray) -> np.ndarray:
         transform = np.eye(4)
@@ -264,6 +282,19 @@ class UR5e(Robot):
             *R.from_matrix(transform[:3, :3]).as_rotvec().tolist(),
         ]
 
+    def get_joint_positions(self) -> list[float]:
+        return self._arm["rtde_r"].getActualQ()
+
+    def get_tcp_offset(self) -> list[float]:
+        return self._arm["rtde_c"].getTCPOffset()
+
+    @property
+    def episode_reference_ee_pose(self) -> np.ndarray | None:
+        return None if self._episode_reference_ee_pose is None else self._episode_reference_ee_pose.copy()
+
+    def get_tcp_pose(self) -> list[float]:
+        return self._arm["rtde_r"].getActualTCPPose()
+
     def get_ee_pose(self) -> list[float]:
         tcp_pose = self._arm["rtde_r"].getActualTCPPose()
         tcp_offset = self._arm["rtde_c"].getTCPOffset()
@@ -361,10 +392,60 @@ class UR5e(Robot):
             
         return action
     
+    def send_target_pose(self, target_pose: list[float], gripper_position: float | None = None) -> None:
+        """Track an absolute TCP target [x, y, z, rx, ry, rz] in the base frame.
+
+        For tcp_force and tcp_position replay with targets rebuilt ahead of
+        time, so no delta is composed with the live pose. tcp_position streams
+        the target to servoL without reading the robot; tcp_force still reads
+        the TCP pose and speed the PD wrench needs.
+        """
+        if not self.is_connected:
+            raise DeviceNotConnectedError(f"{self} is not connected.")
+        if self.config.control_space not in ("tcp_force", "tcp_position"):
+            raise ValueError(f"send_target_pose needs control_space tcp_force or tcp_position, got {self.config.control_space}.")
+
+        if not self.config.debug:
+            t_start = self._arm["rtde_c"].initPeriod()
+            if self.config.control_space == "tcp_position":
+                self._arm["rtde_c"].servoL(
+                    target_pose,
+                    self.config.tcp_position_speed,
+                    self.config.tcp_position_acceleration,
+                    self.config.tcp_position_servo_time,
+                    self.config.tcp_position_lookahead_time,
+                    self.config.tcp_position_gain,
+                )
+            else:
+                curr_pose = self._arm["rtde_r"].getActualTCPPose()
+                curr_vel = self._arm["rtde_r"].getActualTCPSpeed()
+                ft_target = self._calculate_force(target_pose, curr_pose, curr_vel)
+                self._arm["rtde_c"].forceMode(self.task_frame,self.config.select_vector,ft_target,self.type,self.config.force_limit)
+            self._arm["rtde_c"].waitPeriod(t_start)
+
+        if gripper_position is not None:
+            self._gripper_position = float(gripper_position)
+
     def get_observation(self) -> dict[str, Any]:
         if not self.is_connected:
             raise DeviceNotConnectedError(f"{self} is not connected.")
-        
+
+        self.get_state_observation()
+
+        # Capture images from cameras
+        for cam_key, cam in self.cameras.items():
+            start = time.perf_counter()
+            self.obs_dict[cam_key] = cam.read()
+            dt_ms = (time.perf_counter() - start) * 1e3
+            logger.debug(f"{self} read {cam_key}: {dt_ms:.1f}ms")
+
+        return self.obs_dict
+
+    def get_state_observation(self) -> dict[str, Any]:
+        """Read arm and gripper state only, without waiting on any camera."""
+        if not self.is_connected:
+            raise DeviceNotConnectedError(f"{self} is not connected.")
+
         # Read joint positions
         joint_position = self._arm["rtde_r"].getActualQ()
             
@@ -398,6 +479,9 @@ class UR5e(Robot):
 
         # Read tcp speed
         tcp_speed = self._arm["rtde_r"].getActualTCPSpeed()
+        self._tcp_state[:6] = ee_pose
+        self._tcp_state[6:] = tcp_speed
+        self._tcp_state_fresh = True
 
         # Read tcp acceleration
         tcp_acceleration = self._arm["rtde_r"].getActualToolAccelerometer()
@@ -430,13 +514,6 @@ class UR5e(Robot):
             self.obs_dict["gripper_action_bin"] = None
             self.obs_dict["gripper_raw_bin"] = None
 
-        # Capture images from cameras
-        for cam_key, cam in self.cameras.items():
-            start = time.perf_counter()
-            self.obs_dict[cam_key] = cam.read()
-            dt_ms = (time.perf_counter() - start) * 1e3
-            logger.debug(f"{self} read {cam_key}: {dt_ms:.1f}ms")
-
         self._prev_observation = self.obs_dict
 
         return self.obs_dict
@@ -488,15 +565,38 @@ class UR5e(Robot):
     
     def stop_force(self):
         self._arm["rtde_c"].forceMode(self.task_frame,[0, 0, 0, 0, 0, 0],np.array([0, 0, 0, 0, 0, 0]),self.type,self.config.force_limit)
+
+    def stop_motion(self) -> None:
+        """End the active force or servo command so the arm holds its pose."""
+        if not self.is_connected:
+            raise DeviceNotConnectedError(f"{self} is not connected.")
+        if self.config.debug:
+            return
+        if self.config.control_space in ("joint_to_tcp_force", "tcp_force"):
+            self.stop_force()
+            self._arm["rtde_c"].forceModeStop()
+        else:
+            self._arm["rtde_c"].servoStop()
+
+    def move_to_joints(self, joint_positions: list[float], speed: float = 0.3, acceleration: float = 0.5) -> None:
+        """Stop the current control mode and move to `joint_positions` with a blocking moveJ."""
+        if not self.is_connected:
+            raise DeviceNotConnectedError(f"{self} is not connected.")
+        joint_positions = [float(q) for q in joint_positions]
+        if self.config.debug:
+            logger.info(f"[DEBUG] Skipping move to joints {joint_positions}")
+            return
+        self.stop_motion()
+        logger.info(f"[INFO] Moving to joints {[round(q, 4) for q in joint_positions]}")
+        self._arm["rtde_c"].moveJ(joint_positions, speed, acceleration)
         
     def disconnect(self) -> None:
         if not self.is_connected:
             return
 
-        if self._arm is not None:
+        if self._arm:
             self._arm["rtde_c"].forceMode(self.task_frame,[0, 0, 0, 0, 0, 0],np.array([0, 0, 0, 0, 0, 0]),self.type,self.config.force_limit)
-            self._arm["rtde_c"].disconnect()
-            self._arm["rtde_r"].disconnect()
+            self.disconnect_arm()
 
         for cam in self.cameras.values():
             cam.disconnect()
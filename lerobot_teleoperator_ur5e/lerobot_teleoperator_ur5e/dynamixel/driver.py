@@ -102,6 +102,10 @@ class DynamixelDriverProtocol(Protocol):
         """Get joint positions (rad) and velocities (rad/s)."""
         ...
 
+    def get_read_timing(self) -> Tuple[float, float]:
+        """Get the perf_counter stamp of the latest completed read and its duration (s)."""
+        ...
+
     def close(self):
         """Close the driver."""
 
@@ -155,6 +159,9 @@ class FakeDynamixelDriver(DynamixelDriverProtocol):
     def get_positions(self) -> np.ndarray:
         return self.get_joints()
 
+    def get_read_timing(self) -> Tuple[float, float]:
+        return time.perf_counter(), 0.0
+
     def close(self):
         pass
 
@@ -182,6 +189,8 @@ class DynamixelDriver(DynamixelDriverProtocol):
         self._ids = ids
         self._joint_angles = None
         self._velocities = None
+        self._read_stamp = None
+        self._read_duration = 0.0
         self._lock = Lock()
         self._port = port
         self._baudrate = baudrate
@@ -453,6 +462,7 @@ class DynamixelDriver(DynamixelDriverProtocol):
         while not self._stop_thread.is_set():
             time.sleep(0.001)
             with self._lock:
+                read_start = time.perf_counter()
                 _joint_angles = np.zeros(len(self._ids), dtype=int)
                 _velocities = np.zeros(len(self._ids), dtype=int)
                 dxl_comm_result = self._groupSyncRead.txRxPacket()
@@ -492,6 +502,8 @@ class DynamixelDriver(DynamixelDriverProtocol):
                         )
                 self._joint_angles = _joint_angles
                 self._velocities = _velocities
+                self._read_stamp = time.perf_counter()
+                self._read_duration = self._read_stamp - read_start
             # self._groupSyncRead.clearParam()
 
     def get_positions_and_velocities(self) -> Tuple[np.ndarray, np.ndarray]:
@@ -513,6 +525,11 @@ class DynamixelDriver(DynamixelDriverProtocol):
         _j = self._joint_angles.copy()
         return _j / 2048.0 * np.pi
 
+    def get_read_timing(self) -> Tuple[float, float]:
+        if self._is_fake or self._read_stamp is None:
+            return time.perf_counter(), 0.0
+        return self._read_stamp, self._read_duration
+
     def get_joints_deg(self):
         return np.degrees(self.get_joints())    
     
@@ -68,6 +68,11 @@ class DynamixelRobot(Robot):
         self._alpha = 1.0
         self.record_time = 0
         
+    @property
+    def driver(self):
+        """The underlying Dynamixel driver, e.g. to reuse its connection for offset checks."""
+        return self._driver
+
     def num_dofs(self) -> int:
         return len(self._joint_ids)
 
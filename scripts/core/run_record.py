@@ -1,12 +1,12 @@
 import yaml
 from pathlib import Path
 from typing import Dict, Any
+from functools import partial
 from scripts.utils.dataset_utils import generate_dataset_name, update_dataset_info
 from lerobot_robot_ur5e import UR5eConfig, UR5e
 from lerobot_teleoperator_ur5e import UR5eTeleopConfig, UR5eTeleop
 from lerobot.cameras.configs import ColorMode, Cv2Rotation
 from lerobot.cameras.realsense.camera_realsense import RealSenseCameraConfig
-from lerobot.scripts.lerobot_record import record_loop
 from lerobot.processor import make_default_processors
 from lerobot.utils.visualization_utils import init_rerun
 from lerobot.utils.control_utils import init_keyboard_listener
@@ -16,6 +16,12 @@ import time as time_module
 from send2trash import send2trash
 from lerobot.utils.constants import HF_LEROBOT_HOME
 from scripts.utils.teleop_joint_offsets import get_start_joints, compute_joint_offsets
+from scripts.utils.device_startup import DeviceStartup
+from scripts.utils.record_loop import RecordPipeline
+from scripts.utils.frame_health import FRAME_VALID, FRAME_VALID_FEATURE
+from scripts.utils.loop_timing import LoopTiming, write_episode_timing
+from scripts.utils.episode_saver import AsyncEpisodeSaver
+from scripts.utils.recording_dataset import RecordingDataset
 from lerobot.datasets.lerobot_dataset import LeRobotDataset
 from lerobot.datasets.utils import hw_to_dataset_features
 from lerobot.utils.control_utils import sanity_check_dataset_robot_compatibility
@@ -23,12 +29,22 @@ import logging
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 
+# Per-device connection timeouts in seconds, overridable in record.startup.timeouts
+DEFAULT_STARTUP_TIMEOUTS = {"robot": 20.0, "gripper": 15.0, "camera": 15.0, "teleop": 30.0, "offset_check": 10.0}
+
 class RecordConfig:
     def __init__(self, cfg: Dict[str, Any]):
         storage = cfg["storage"]
         task = cfg["task"]
         time = cfg["time"]
         cam = cfg["cameras"]
+        startup = cfg.get("startup") or {}
+        pipeline = cfg.get("pipeline") or {}
+        video = cfg.get("video") or {}
+        journal = cfg.get("journal") or {}
+        display = cfg.get("display") or {}
+        frames = cfg.get("frames") or {}
+        stats = cfg.get("stats") or {}
         robot = cfg["robot"]
         teleop = cfg["teleop"]
         dxl_cfg = teleop["dynamixel_config"]
@@ -118,17 +134,115 @@ class RecordConfig:
         # storage config
         self.push_to_hub: bool = storage.get("push_to_hub", False)
 
-def check_joint_offsets(record_cfg: RecordConfig):
-    """Check the joint_offsets is set and correct."""
+        # pipeline config
+        self.writer_queue_size: int = pipeline.get("writer_queue_size", 30)
+        self.camera_timeout_s: float = pipeline.get("camera_timeout_s", 1.0)
+        self.max_pending_saves: int = pipeline.get("max_pending_saves", 2)
+        self.spill_rows: int = pipeline.get("spill_rows", 1800)
+
+        # video config
+        self.stream_video: bool = video.get("streaming", True)
+        self.vcodec: str = video.get("vcodec", "libsvtav1")
+        self.pix_fmt: str = video.get("pix_fmt", "yuv420p")
+        self.video_gop: int = video.get("g", 2)
+        self.video_crf: int = video.get("crf", 30)
+        self.encoder_queue_size: int = video.get("encoder_queue_size", 60)
+        self.stats_stride: int = video.get("stats_stride", 5)
+        self.encoder_processes: int = video.get("num_processes", 2)
+        self.encoder_threads: int = video.get("encoder_threads", 0)
+
+        # display config
+        self.display_cfg: Dict[str, Any] = {
+            "preview_width": display.get("preview_width", 320),
+            "image_hz": display.get("image_hz", 5),
+            "scalar_hz": display.get("scalar_hz", 5),
+            "jpeg_quality": display.get("jpeg_quality", 75),
+        }
+
+        # stats config
+        self.running_stats: bool = stats.get("running", True)
+        self.stats_image_stride: int = stats.get("image_stride", 5)
+
+        # frame check config
+        self.frame_policy: str = frames.get("policy", "warn")
+        self.max_bad_frames: int = frames.get("max_bad_frames", 15)
+
+        # journal config
+        self.use_journal: bool = journal.get("enabled", False)
+        self.journal_sync_interval_s: float = journal.get("sync_interval_s", 0.5)
+
+        # startup config
+        self.parallel_startup: bool = startup.get("parallel", True)
+        self.startup_timeouts: Dict[str, float] = {**DEFAULT_STARTUP_TIMEOUTS, **(startup.get("timeouts") or {})}
+
+def make_teleop_config(record_cfg: RecordConfig) -> UR5eTeleopConfig:
+    return UR5eTeleopConfig(
+        port=record_cfg.port,
+        use_gripper=record_cfg.use_gripper,
+        hardware_offsets=record_cfg.hardware_offsets,
+        joint_ids=record_cfg.joint_ids,
+        joint_offsets=record_cfg.joint_offsets,
+        joint_signs=record_cfg.joint_signs,
+        gripper_config=record_cfg.gripper_config,
+        control_mode=record_cfg.control_mode,
+        control_space=record_cfg.control_space,
+        tcp_force_reference_frame=record_cfg.tcp_force_reference_frame,
+        tcp_position_reference_frame=record_cfg.tcp_position_reference_frame,
+        robot_urdf_path=record_cfg.robot_urdf_path)
+
+
+def make_robot_config(record_cfg: RecordConfig, camera_config: Dict[str, Any]) -> UR5eConfig:
+    return UR5eConfig(
+        robot_ip=record_cfg.robot_ip,
+        gripper_port=record_cfg.gripper_port,
+        cameras=camera_config,
+        debug=record_cfg.debug,
+        close_threshold=record_cfg.close_threshold,
+        use_gripper=record_cfg.use_gripper,
+        gripper_reverse=record_cfg.gripper_reverse,
+        gripper_bin_threshold=record_cfg.gripper_bin_threshold,
+        gripper_force=record_cfg.gripper_force,
+        gripper_speed=record_cfg.gripper_speed,
+        control_space=record_cfg.control_space,
+        tcp_force_reference_frame=record_cfg.tcp_force_reference_frame,
+        tcp_position_reference_frame=record_cfg.tcp_position_reference_frame,
+        robot_urdf_path=record_cfg.robot_urdf_path,
+        tcp_position_speed=record_cfg.tcp_position_speed,
+        tcp_position_acceleration=record_cfg.tcp_position_acceleration,
+        tcp_position_servo_time=record_cfg.tcp_position_servo_time,
+        tcp_position_lookahead_time=record_cfg.tcp_position_lookahead_time,
+        tcp_position_gain=record_cfg.tcp_position_gain,
+        kp=record_cfg.kp,
+        kd=record_cfg.kd,
+        kp_rot=record_cfg.kp_rot,
+        kd_rot=record_cfg.kd_rot,
+        rtde_freq=record_cfg.rtde_freq,
+        select_vector=record_cfg.select_vector,
+        force_limit=record_cfg.force_limit,
+        look_ahead_time=record_cfg.look_ahead_time,
+        dt=record_cfg.dt,
+        gain=record_cfg.gain,
+        pos_delta=record_cfg.pos_delta,
+        vel_delta=record_cfg.vel_delta,
+        gain_scale=record_cfg.gain_scale
+    )
+
+
+def check_joint_offsets(record_cfg: RecordConfig, start_joints=None, driver=None):
+    """Check the joint_offsets is set and correct.
+
+    `start_joints` and `driver` let the check reuse connections that are already open.
+    """
 
     if record_cfg.joint_offsets is None:
         raise ValueError("joint_offsets is None. Please check teleop_joint_offsets.py output.")
 
-    start_joints = get_start_joints(record_cfg)
+    if start_joints is None:
+        start_joints = get_start_joints(record_cfg)
     if start_joints is None:
         raise RuntimeError("Failed to retrieve start joints from UR5e robot.")
 
-    joint_offsets = compute_joint_offsets(record_cfg, start_joints)
+    joint_offsets = compute_joint_offsets(record_cfg, start_joints, driver=driver)
 
     if joint_offsets != record_cfg.joint_offsets:
         raise ValueError(
@@ -137,6 +251,44 @@ def check_joint_offsets(record_cfg: RecordConfig):
         )
     logging.info("Joint offsets verified successfully.")
 
+def connect_devices(record_cfg: RecordConfig, robot: UR5e, teleop: UR5eTeleop) -> None:
+    """Connect the robot arm, gripper, cameras and teleop, concurrently unless disabled in cfg.
+
+    The joint offset check reuses the arm and Dynamixel connections instead of opening its own.
+    """
+    if not record_cfg.parallel_startup:
+        if not record_cfg.debug:
+            check_joint_offsets(record_cfg)
+        robot.connect()
+        teleop.connect()
+        return
+
+    robot.validate_config()
+    timeouts = record_cfg.startup_timeouts
+    startup = DeviceStartup()
+    startup.add("robot", robot.connect_arm, timeouts["robot"], close_fn=robot.disconnect_arm)
+    startup.add("kinematics", robot.init_kinematics, timeouts["robot"])
+    if robot.config.use_gripper:
+        startup.add("gripper", robot.connect_gripper, timeouts["gripper"])
+    for cam_name, cam in robot.cameras.items():
+        startup.add(f"camera:{cam_name}", partial(robot.connect_camera, cam_name), timeouts["camera"], close_fn=cam.disconnect)
+    startup.add("teleop", teleop.connect, timeouts["teleop"], close_fn=teleop.disconnect)
+    if not record_cfg.debug:
+        startup.add(
+            "offset_check",
+            lambda: check_joint_offsets(record_cfg, robot.get_joint_positions(), teleop.dynamixel_robot.driver),
+            timeouts["offset_check"],
+            deps=("robot", "teleop"),
+        )
+
+    try:
+        startup.run()
+    except KeyboardInterrupt:
+        startup.close()
+        raise
+    robot.is_connected = True
+    logging.info(f"[INFO] {robot.name} env initialization completed successfully.\n")
+
 def handle_incomplete_dataset(dataset_path) -> bool:
     if dataset_path.exists():
         print(f"====== [WARNING] Detected an incomplete dataset folder: {dataset_path} ======")
@@ -199,6 +351,10 @@ def discard_unsaved_episode(dataset: LeRobotDataset | None) -> None:
     if get_episode_buffer_size(dataset) <= 0:
         return
 
+    if getattr(dataset, "journaling", False):
+        # Keep the partial episode; finalize() closes its journal for tools-recover-episode
+        return
+
     try:
         dataset.clear_episode_buffer(delete_images=len(dataset.meta.image_keys) > 0)
         logging.info("====== [INFO] Discarded unsaved episode buffer. ======")
@@ -227,6 +383,8 @@ def wait_for_enter(prompt: str) -> None:
 def run_record(record_cfg: RecordConfig):
     robot = None
     teleop = None
+    pipeline = None
+    saver = None
     dataset = None
     dataset_name = None
     data_version = None
@@ -234,14 +392,11 @@ def run_record(record_cfg: RecordConfig):
     record_loop_time_s = 0.0
     record_loop_count = 0
     dataset_info_updated = False
+    session_timing = LoopTiming(record_cfg.fps)
 
     try:
         dataset_name, data_version = generate_dataset_name(record_cfg)
 
-        # Check joint offsets
-        if not record_cfg.debug:
-            check_joint_offsets(record_cfg)        
-        
         # Create RealSenseCamera configurations
         wrist_image_cfg = RealSenseCameraConfig(serial_number_or_name=record_cfg.wrist_cam_serial,
                                         fps=record_cfg.fps,
@@ -261,67 +416,26 @@ def run_record(record_cfg: RecordConfig):
 
         # Create the robot and teleoperator configurations
         camera_config = {"wrist_image": wrist_image_cfg, "exterior_image": exterior_image_cfg}
-        teleop_config = UR5eTeleopConfig(        
-            port=record_cfg.port,
-            use_gripper=record_cfg.use_gripper,
-            hardware_offsets=record_cfg.hardware_offsets,
-            joint_ids=record_cfg.joint_ids,
-            joint_offsets=record_cfg.joint_offsets,
-            joint_signs=record_cfg.joint_signs,
-            gripper_config=record_cfg.gripper_config,
-            control_mode=record_cfg.control_mode,
-            control_space=record_cfg.control_space,
-            tcp_force_reference_frame=record_cfg.tcp_force_reference_frame,
-            tcp_position_reference_frame=record_cfg.tcp_position_reference_frame,
-            robot_urdf_path=record_cfg.robot_urdf_path)
-        
-        robot_config = UR5eConfig(
-            robot_ip=record_cfg.robot_ip,
-            gripper_port=record_cfg.gripper_port,
-            cameras=camera_config,
-            debug=record_cfg.debug,
-            close_threshold=record_cfg.close_threshold,
-            use_gripper=record_cfg.use_gripper,
-            gripper_reverse=record_cfg.gripper_reverse,
-            gripper_bin_threshold=record_cfg.gripper_bin_threshold,
-            gripper_force=record_cfg.gripper_force,
-            gripper_speed=record_cfg.gripper_speed,
-            control_space=record_cfg.control_space,
-            tcp_force_reference_frame=record_cfg.tcp_force_reference_frame,
-            tcp_position_reference_frame=record_cfg.tcp_position_reference_frame,
-            robot_urdf_path=record_cfg.robot_urdf_path,
-            tcp_position_speed=record_cfg.tcp_position_speed,
-            tcp_position_acceleration=record_cfg.tcp_position_acceleration,
-            tcp_position_servo_time=record_cfg.tcp_position_servo_time,
-            tcp_position_lookahead_time=record_cfg.tcp_position_lookahead_time,
-            tcp_position_gain=record_cfg.tcp_position_gain,
-            kp=record_cfg.kp,
-            kd=record_cfg.kd, 
-            kp_rot=record_cfg.kp_rot, 
-            kd_rot=record_cfg.kd_rot, 
-            rtde_freq=record_cfg.rtde_freq, 
-            select_vector=record_cfg.select_vector, 
-            force_limit=record_cfg.force_limit, 
-            look_ahead_time=record_cfg.look_ahead_time, 
-            dt=record_cfg.dt,
-            gain=record_cfg.gain,
-            pos_delta=record_cfg.pos_delta,
-            vel_delta=record_cfg.vel_delta,
-            gain_scale=record_cfg.gain_scale
-        )
-        
+        teleop_config = make_teleop_config(record_cfg)
+        robot_config = make_robot_config(record_cfg, camera_config)
+
         # Initialize the robot and teleoperator
         robot = UR5e(robot_config)
         teleop = UR5eTeleop(teleop_config)
         teleop.set_robot(robot)
 
+        # Connect all devices and verify the joint offsets
+        connect_devices(record_cfg, robot, teleop)
+
         # Configure the dataset features
         action_features = hw_to_dataset_features(robot.action_features, "action")
         obs_features = hw_to_dataset_features(robot.observation_features, "observation", use_video=True)
         dataset_features = {**action_features, **obs_features}
+        if record_cfg.frame_policy == "mark":
+            dataset_features[FRAME_VALID] = FRAME_VALID_FEATURE
 
         if record_cfg.resume:
-            dataset = LeRobotDataset(
+            dataset = RecordingDataset(
                 dataset_name,
             )
 
@@ -330,7 +444,7 @@ def run_record(record_cfg: RecordConfig):
             sanity_check_dataset_robot_compatibility(dataset, robot, record_cfg.fps, dataset_features)
         else:
             # # Create the dataset
-            dataset = LeRobotDataset.create(
+            dataset = RecordingDataset.create(
                 repo_id=dataset_name,
                 fps=record_cfg.fps,
                 features=dataset_features,
@@ -338,6 +452,27 @@ def run_record(record_cfg: RecordConfig):
                 use_videos=True,
                 image_writer_threads=4,
             )
+        if record_cfg.stream_video:
+            # Encode camera frames during the episode instead of writing every frame as PNG
+            dataset.start_streaming(
+                vcodec=record_cfg.vcodec,
+                pix_fmt=record_cfg.pix_fmt,
+                g=record_cfg.video_gop,
+                crf=record_cfg.video_crf,
+                encoder_queue_size=record_cfg.encoder_queue_size,
+                stats_stride=record_cfg.stats_stride,
+                num_processes=record_cfg.encoder_processes,
+                encoder_threads=record_cfg.encoder_threads,
+            )
+        if record_cfg.running_stats:
+            # Update episode stats in the writer stage instead of recomputing them at save
+            dataset.start_running_stats(record_cfg.stats_image_stride)
+        if record_cfg.use_journal:
+            # Log every frame so a crashed episode can be rebuilt with tools-recover-episode
+            dataset.start_journal(record_cfg.journal_sync_interval_s)
+        if record_cfg.spill_rows > 0:
+            # Keep long episodes from growing the in-memory buffer
+            dataset.start_spilling(record_cfg.spill_rows)
         # Set the episode metadata buffer size to 1, so that each episode is saved immediately
         dataset.meta.metadata_buffer_size = record_cfg.save_mera_period
 
@@ -348,27 +483,38 @@ def run_record(record_cfg: RecordConfig):
         # Create processor
         teleop_action_processor, robot_action_processor, robot_observation_processor = make_default_processors()
 
-        robot.connect()
-        teleop.connect()
+        # Start the camera, dataset writer and display stages
+        pipeline = RecordPipeline(
+            robot=robot,
+            teleop=teleop,
+            fps=record_cfg.fps,
+            teleop_action_processor=teleop_action_processor,
+            robot_action_processor=robot_action_processor,
+            robot_observation_processor=robot_observation_processor,
+            writer_queue_size=record_cfg.writer_queue_size,
+            camera_timeout_s=record_cfg.camera_timeout_s,
+            display_cfg=record_cfg.display_cfg,
+            frame_policy=record_cfg.frame_policy,
+            max_bad_frames=record_cfg.max_bad_frames,
+        )
+
+        # Save episodes in the background so encoding overlaps the reset and the next episode
+        saver = AsyncEpisodeSaver(dataset, max_pending=record_cfg.max_pending_saves)
 
         episode_idx = 0
         record_start_time = time_module.perf_counter()
 
         while episode_idx < record_cfg.num_episodes and not events["stop_recording"]:
+            # Surface a failed background save before recording on top of it
+            saver.check()
             events["exit_early"] = False
             events["rerecord_episode"] = False
             robot.set_episode_reference_pose()
             logging.info(f"====== [RECORD] Recording episode {episode_idx + 1} of {record_cfg.num_episodes} ======")
             episode_record_start = time_module.perf_counter()
             try:
-                record_loop(
-                    robot=robot,
+                pipeline.run(
                     events=events,
-                    fps=record_cfg.fps,
-                    teleop=teleop,
-                    teleop_action_processor=teleop_action_processor,
-                    robot_action_processor=robot_action_processor,
-                    robot_observation_processor=robot_observation_processor,
                     dataset=dataset,
                     control_time_s=record_cfg.episode_time_sec,
                     single_task=record_cfg.task_description,
@@ -379,10 +525,11 @@ def run_record(record_cfg: RecordConfig):
                 record_loop_count += 1
 
             if events["rerecord_episode"]:
+                logging.info(f"====== [FRAMES] {pipeline.health.one_line()} ======")
                 logging.info("Re-recording episode")
                 events["rerecord_episode"] = False
                 events["exit_early"] = False
-                dataset.clear_episode_buffer()
+                saver.discard_current()
                 continue
             
             robot.stop_force()
@@ -395,21 +542,21 @@ def run_record(record_cfg: RecordConfig):
                     break
                 continue
 
-            dataset.save_episode()
+            saved_episode_index = saver.submit()
+
+            # Keep the loop timing of the saved episode next to its metadata
+            write_episode_timing(dataset.root, saved_episode_index, pipeline.timing, pipeline.health.summary())
+            session_timing.merge(pipeline.timing)
+            logging.info(f"====== [TIMING] Episode {saved_episode_index}: {pipeline.timing.one_line()} ======")
+            logging.info(f"====== [FRAMES] Episode {saved_episode_index}: {pipeline.health.one_line()} ======")
 
             # Reset the environment if not stopping or re-recording
             if not events["stop_recording"] and (episode_idx < record_cfg.num_episodes - 1 or events["rerecord_episode"]):
                 wait_for_enter("====== [WAIT] Press Enter to reset the environment ======")
 
                 logging.info("====== [RESET] Resetting the environment ======")
-                record_loop(
-                    robot=robot,
+                pipeline.run(
                     events=events,
-                    fps=record_cfg.fps,
-                    teleop=teleop,
-                    teleop_action_processor=teleop_action_processor,
-                    robot_action_processor=robot_action_processor,
-                    robot_observation_processor=robot_observation_processor,
                     control_time_s=record_cfg.reset_time_sec,
                     single_task=record_cfg.task_description,
                     display_data=record_cfg.display,
@@ -421,8 +568,10 @@ def run_record(record_cfg: RecordConfig):
 
         # Clean up
         logging.info("Stop recording")
+        pipeline.close()
         robot.disconnect()
         teleop.disconnect()
+        saver.close()
         dataset.finalize()
 
         total_time_s = time_module.perf_counter() - record_start_time
@@ -438,6 +587,7 @@ def run_record(record_cfg: RecordConfig):
         logging.info(f"====== [INFO] Total recording time: {total_duration} ======")
         logging.info(f"====== [INFO] Average record loop time: {avg_record_duration} ======")
         logging.info(f"====== [INFO] Average reset/non-record time: {avg_reset_duration} ======")
+        session_timing.log_summary("Record loop timing over saved episodes")
         append_record_times(
             record_cfg,
             record_duration,
@@ -467,6 +617,7 @@ def run_record(record_cfg: RecordConfig):
             logging.info(f"====== [INFO] Total recording time: {total_duration} ======")
             logging.info(f"====== [INFO] Average record loop time: {avg_record_duration} ======")
             logging.info(f"====== [INFO] Average reset/non-record time: {avg_reset_duration} ======")
+            session_timing.log_summary("Record loop timing over saved episodes")
             append_record_times(
                 record_cfg,
                 record_duration,
@@ -475,10 +626,14 @@ def run_record(record_cfg: RecordConfig):
                 avg_record_duration,
                 avg_reset_duration,
             )
+        if pipeline is not None:
+            pipeline.close()
         if robot is not None:
             robot.disconnect()
         if teleop is not None:
             teleop.disconnect()
+        if saver is not None:
+            saver.close(raise_errors=False)
         discard_unsaved_episode(dataset)
         finalize_dataset_safely(dataset)
         if dataset_name is not None:
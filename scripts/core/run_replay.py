@@ -1,13 +1,23 @@
 import time
 import yaml
 import logging
-logging.basicConfig(level=logging.WARNING, format="%(message)s")
+import numpy as np
+logging.basicConfig(level=logging.INFO, format="%(message)s")
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Tuple
 from lerobot_robot_ur5e import UR5eConfig, UR5e
-from lerobot.datasets.lerobot_dataset import LeRobotDataset
-from lerobot.utils.robot_utils import busy_wait
-from lerobot.utils.utils import log_say
+from scripts.utils.replay_utils import (
+    BETWEEN_EPISODES,
+    TARGET_MODES,
+    EpisodeLoader,
+    EpisodePrefetcher,
+    ReplayEpisode,
+    ReplayScheduler,
+    absolute_tcp_targets,
+    pose_distance,
+    write_replay_report,
+)
+from scripts.utils.tracking_report import TrackingRecorder, compare_tracking, log_tracking, write_tracking_report
 
 class ReplayConfig:
     def __init__(self, cfg: Dict[str, Any]):
@@ -17,40 +27,188 @@ class ReplayConfig:
         self.dataset_name: str = cfg["dataset_name"]
         self.episode_idx: str = cfg.get("episode_idx", 0)
         self.debug: bool = cfg.get("debug", False)
+        self.speed: float = cfg.get("speed", 1.0)
+        self.late_policy: str = cfg.get("late_policy", "catch_up")
+        self.timing_report: str | None = cfg.get("timing_report") or None
+        self.tracking_report: str | None = cfg.get("tracking_report") or None
+        self.tracking_max_lag_frames: int = cfg.get("tracking_max_lag_frames", 10)
+
+        # playlist config
+        self.playlist: List[Dict[str, Any]] = cfg.get("playlist") or []
+        self.between_episodes: str = cfg.get("between_episodes", "settle")
+        self.settle_time_s: float = cfg.get("settle_time_s", 2.0)
+        self.home_joints: List[float] | None = cfg.get("home_joints") or None
+        self.home_speed: float = cfg.get("home_speed", 0.3)
+        self.home_acceleration: float = cfg.get("home_acceleration", 0.5)
 
         # robot config
         self.robot_ip: str = robot["ip"]
         self.use_gripper: bool = robot["use_gripper"]
         self.gripper_port: str = robot["gripper_port"]
         self.gripper_reverse: bool = robot["gripper_reverse"]
+        self.control_space: str = robot.get("control_space", "joint_to_tcp_force")
+        self.tcp_targets: str = cfg.get("tcp_targets", "live")
+        self.start_tolerance_m: float = cfg.get("start_tolerance_m", 0.02)
+        self.start_tolerance_rad: float = cfg.get("start_tolerance_rad", 0.1)
+        tcp_force_cfg = robot.get("tcp_force") or {}
+        tcp_position_cfg = robot.get("tcp_position") or {}
+        self.tcp_force_reference_frame: str = tcp_force_cfg.get("reference_frame", "base")
+        self.tcp_position_reference_frame: str = tcp_position_cfg.get("reference_frame", "base")
+        self.tcp_position_speed: float = tcp_position_cfg.get("speed", 0.5)
+        self.tcp_position_acceleration: float = tcp_position_cfg.get("acceleration", 0.5)
+        self.tcp_position_servo_time: float = tcp_position_cfg.get("servo_time", 0.1)
+        self.tcp_position_lookahead_time: float = tcp_position_cfg.get("lookahead_time", 0.1)
+        self.tcp_position_gain: int = tcp_position_cfg.get("gain", 300)
 
-def run_replay(replay_cfg: ReplayConfig):
-    episode_idx = replay_cfg.episode_idx
+        if self.tcp_targets not in TARGET_MODES:
+            raise ValueError(f"Unknown tcp_targets {self.tcp_targets!r}, expected one of {TARGET_MODES}")
+        if self.tcp_targets == "precomputed" and self.control_space not in ("tcp_force", "tcp_position"):
+            raise ValueError("tcp_targets 'precomputed' needs control_space tcp_force or tcp_position")
+        if self.between_episodes not in BETWEEN_EPISODES:
+            raise ValueError(f"Unknown between_episodes {self.between_episodes!r}, expected one of {BETWEEN_EPISODES}")
+
+    def playlist_entries(self) -> List[Tuple[str, Any]]:
+        """(dataset_name, episode spec) pairs; without a playlist this is the single configured episode."""
+        if not self.playlist:
+            return [(self.dataset_name, self.episode_idx)]
+        return [(entry.get("dataset") or self.dataset_name, entry.get("episodes", "all")) for entry in self.playlist]
+
+def prepare_episode(robot: UR5e, replay_cfg: ReplayConfig, episode, first: bool) -> None:
+    """Settle or home the arm before an episode starts."""
+    if replay_cfg.between_episodes == "home":
+        target = replay_cfg.home_joints if replay_cfg.home_joints is not None else episode.start_joints
+        if target is None:
+            logging.warning("No home_joints set and the dataset has no joint state; settling instead of homing")
+        else:
+            robot.move_to_joints(target, replay_cfg.home_speed, replay_cfg.home_acceleration)
+    elif replay_cfg.between_episodes == "settle" and not first:
+        robot.stop_motion()
+    if replay_cfg.between_episodes != "none" and not first:
+        time.sleep(replay_cfg.settle_time_s)
+    robot.set_episode_reference_pose()
+
+def precompute_targets(robot: UR5e, replay_cfg: ReplayConfig, episode: ReplayEpisode) -> Tuple[List[List[float]], List[float] | None]:
+    """Absolute TCP targets and gripper commands for the whole episode, anchored at the current reference pose."""
+    if episode.states is None:
+        raise ValueError(f"{episode.dataset_name} has no observation.state to rebuild TCP targets from")
+    reference_frame = (
+        replay_cfg.tcp_force_reference_frame
+        if replay_cfg.control_space == "tcp_force"
+        else replay_cfg.tcp_position_reference_frame
+    )
+    targets = absolute_tcp_targets(
+        episode.states, episode.state_names, episode.actions, episode.action_names,
+        reference_frame, robot.get_tcp_offset(), robot.episode_reference_ee_pose,
+    )
+    gripper = None
+    if "gripper_position" in episode.action_names:
+        gripper = episode.actions[:, episode.action_names.index("gripper_position")].tolist()
+    return targets.tolist(), gripper
 
+def check_start_pose(robot: UR5e, replay_cfg: ReplayConfig, first_target: List[float], title: str) -> None:
+    """Refuse to stream precomputed targets that start away from the arm.
+
+    Base-frame targets are the recorded absolute poses, so unlike live
+    deltas they do not follow the arm; a large first step would be handed
+    straight to servoL or the force-mode PD.
+    """
+    distance_m, angle_rad = pose_distance(robot.get_tcp_pose(), first_target)
+    if distance_m <= replay_cfg.start_tolerance_m and angle_rad <= replay_cfg.start_tolerance_rad:
+        return
+    message = (
+        f"{title} starts {distance_m * 1e3:.0f} mm / {np.degrees(angle_rad):.1f} deg from the current TCP pose "
+        f"(tolerance {replay_cfg.start_tolerance_m * 1e3:.0f} mm / {np.degrees(replay_cfg.start_tolerance_rad):.1f} deg). "
+        "Use between_episodes \"home\" with an empty home_joints to start each episode at its recorded joints, "
+        "or tcp_targets \"live\"."
+    )
+    if replay_cfg.debug:
+        logging.warning(f"====== [WARNING] {message} ======")
+        return
+    raise ValueError(message)
+
+def run_replay(replay_cfg: ReplayConfig):
     robot_config = UR5eConfig(
         robot_ip=replay_cfg.robot_ip,
         gripper_port=replay_cfg.gripper_port,
         debug=replay_cfg.debug,
         use_gripper=replay_cfg.use_gripper,
         gripper_reverse=replay_cfg.gripper_reverse,
+        control_space=replay_cfg.control_space,
+        tcp_force_reference_frame=replay_cfg.tcp_force_reference_frame,
+        tcp_position_reference_frame=replay_cfg.tcp_position_reference_frame,
+        tcp_position_speed=replay_cfg.tcp_position_speed,
+        tcp_position_acceleration=replay_cfg.tcp_position_acceleration,
+        tcp_position_servo_time=replay_cfg.tcp_position_servo_time,
+        tcp_position_lookahead_time=replay_cfg.tcp_position_lookahead_time,
+        tcp_position_gain=replay_cfg.tcp_position_gain,
     )
 
+    # Episode actions are read as arrays; the next one loads in the background while the current one plays
+    loader = EpisodeLoader()
+    playlist = loader.expand(replay_cfg.playlist_entries())
+    if not playlist:
+        raise ValueError("The replay playlist is empty")
+    prefetcher = EpisodePrefetcher(loader, playlist)
+    logging.info(f"====== [REPLAY] {len(playlist)} episode(s) in the playlist ======")
+
     robot = UR5e(robot_config)
     robot.connect()
-    dataset = LeRobotDataset(replay_cfg.dataset_name, episodes=[episode_idx])
-    actions = dataset.hf_dataset.select_columns("action")
-    logging.info(f"Replaying episode {episode_idx}")
-    for idx in range(dataset.num_frames):
-        t0 = time.perf_counter()
-
-        action = {
-            name: float(actions[idx]["action"][i]) for i, name in enumerate(dataset.features["action"]["names"])
-        }
-        robot.send_action(action)
-
-        busy_wait(1.0 / dataset.fps - (time.perf_counter() - t0))
+    force_limit = robot_config.force_limit if robot_config.control_space in ("joint_to_tcp_force", "tcp_force") else None
+    reports = []
+    tracking = []
+    try:
+        for position, episode in enumerate(prefetcher):
+            title = f"{episode.dataset_name} episode {episode.episode_index}"
+            logging.info(
+                f"====== [REPLAY] {position + 1}/{len(playlist)}: {title}, {len(episode.frames)} frames "
+                f"(loaded in {episode.load_s * 1e3:.1f} ms, waited {prefetcher.wait_s[-1] * 1e3:.1f} ms) ======"
+            )
+            prepare_episode(robot, replay_cfg, episode, first=position == 0)
+            targets = gripper = None
+            if replay_cfg.tcp_targets == "precomputed":
+                t_targets = time.perf_counter()
+                targets, gripper = precompute_targets(robot, replay_cfg, episode)
+                logging.info(f"Rebuilt {len(targets)} TCP targets in {(time.perf_counter() - t_targets) * 1e3:.1f} ms")
+                check_start_pose(robot, replay_cfg, targets[0], title)
 
-    robot.disconnect()
+            # The achieved state is read before each action, as the recorded observations were
+            recorder = None
+            if replay_cfg.tracking_report and episode.states is not None:
+                recorder = TrackingRecorder(episode.state_names, len(episode.frames))
+            scheduler = ReplayScheduler(episode.fps, speed=replay_cfg.speed, late_policy=replay_cfg.late_policy)
+            for idx in scheduler.frames(len(episode.frames)):
+                if recorder is not None:
+                    recorder.add(idx, robot.get_state_observation())
+                if targets is not None:
+                    robot.send_target_pose(targets[idx], gripper[idx] if gripper is not None else None)
+                else:
+                    robot.send_action(episode.frames[idx])
+            report = scheduler.log_report(title)
+            if recorder is not None:
+                comparison = compare_tracking(
+                    episode.states, recorder.achieved, episode.state_names, scheduler.period_s,
+                    max_lag_frames=replay_cfg.tracking_max_lag_frames, force_limit=force_limit,
+                    select_vector=robot_config.select_vector,
+                )
+                log_tracking(title, comparison)
+                tracking.append({"dataset": episode.dataset_name, "episode_index": episode.episode_index, **comparison})
+            reports.append({
+                "dataset": episode.dataset_name,
+                "episode_index": episode.episode_index,
+                "load_ms": round(episode.load_s * 1e3, 3),
+                "load_wait_ms": round(prefetcher.wait_s[-1] * 1e3, 3),
+                **report,
+            })
+    except KeyboardInterrupt:
+        logging.info(f"====== [REPLAY] Stopped after {len(reports)} of {len(playlist)} episode(s) ======")
+    finally:
+        robot.disconnect()
+        if replay_cfg.timing_report and reports:
+            path = write_replay_report(replay_cfg.timing_report, {"episodes": reports})
+            logging.info(f"Timing report written to {path}")
+        if replay_cfg.tracking_report and tracking:
+            path = write_tracking_report(replay_cfg.tracking_report, tracking)
+            logging.info(f"Tracking report written to {path}")
 
 def main():
     parent_path = Path(__file__).resolve().parent
@@ -1,4 +1,7 @@
+from __future__ import annotations
+
 import argparse
+import base64
 import gc
 import json
 import logging
@@ -7,29 +10,36 @@ import time
 import webbrowser
 from pathlib import Path
 from collections.abc import Iterator
+from typing import TYPE_CHECKING
 
 import numpy as np
 import rerun as rr
-import torch
-import torch.utils.data
-import tqdm
 import yaml
 
-from lerobot.datasets.lerobot_dataset import LeRobotDataset
-from lerobot.utils.constants import ACTION, DONE, OBS_STATE, REWARD
+from lerobot.utils.constants import ACTION, OBS_STATE
+from scripts.utils.episode_arrays import (
+    ensure_local_dataset,
+    get_feature_names,
+    load_dataset_info,
+    load_episodes_table,
+    parse_episode_spec,
+    read_episode_columns,
+)
+from scripts.utils.episode_compare import ALIGN_MODES, align_episodes, band_stats, load_episode_arrays
+from scripts.utils.rerun_columns import FLAG_KEYS, log_episode_comparison, log_episode_scalars, log_video_asset
+
+if TYPE_CHECKING:
+    import torch
 
+    from lerobot.datasets.lerobot_dataset import LeRobotDataset
 
-def get_feature_names(features: dict, key: str) -> list[str]:
-    names = features[key]["names"]
-    if isinstance(names, dict):
-        if all(isinstance(name, int) for name in names):
-            return [names[index] for index in sorted(names)]
-        return [name for name, _ in sorted(names.items(), key=lambda item: item[1])]
-    return list(names)
+VIDEO_MODES = ("decode", "asset")
 
 
-def tensor_row_to_named_dict(row: torch.Tensor, names: list[str]) -> dict[str, float]:
-    return {name: float(row[idx].item()) for idx, name in enumerate(names)}
+def rows_to_named_dicts(values: np.ndarray | None, names: list[str], num_frames: int) -> list[dict[str, float]]:
+    if values is None:
+        return [{} for _ in range(num_frames)]
+    return [dict(zip(names, row)) for row in values.tolist()]
 
 
 def obs_group_name(name: str) -> str:
@@ -54,41 +64,20 @@ def green(text: str) -> str:
     return f"\033[32m{text}\033[0m"
 
 
-def write_data_window_html(
-    repo_id: str,
-    episode_index: int,
-    rows: list[dict],
-    obs_names: list[str],
-    default_obs_group: str | None = None,
-    output_dir: Path | None = None,
-) -> Path:
-    if output_dir is None:
-        output_dir = Path(tempfile.gettempdir()) / "ur5e_isoteleop_visualize"
-    output_dir.mkdir(parents=True, exist_ok=True)
+def encode_column(values: np.ndarray, dtype: str) -> str:
+    """Little-endian bytes of `values` as base64, read back in the page as a typed array."""
+    return base64.b64encode(np.ascontiguousarray(values, dtype=dtype).tobytes()).decode("ascii")
 
-    html_path = output_dir / f"{repo_id.replace('/', '_')}_episode_{episode_index}_data.html"
-    payload = {
-        "repo_id": repo_id,
-        "episode_index": episode_index,
-        "obs_names": obs_names,
-        "default_obs_group": default_obs_group,
-        "rows": rows,
-    }
-    data_json = json.dumps(payload)
-    html = f"""<!doctype html>
-<html lang="en">
-<head>
-  <meta charset="utf-8">
-  <title>UR5e Episode Data</title>
-  <style>
-    * {{ box-sizing: border-box; }}
-    body {{
+
+# Shared by the episode data window and the comparison window
+DATA_WINDOW_STYLE = """    * { box-sizing: border-box; }
+    body {
       margin: 0;
       font-family: Arial, sans-serif;
       background: #eef3f1;
       color: #17201d;
-    }}
-    header {{
+    }
+    header {
       padding: 14px 18px;
       background: #173c35;
       color: white;
@@ -96,171 +85,233 @@ def write_data_window_html(
       justify-content: space-between;
       gap: 16px;
       align-items: center;
-    }}
-    header h1 {{
+    }
+    header h1 {
       margin: 0;
       font-size: 17px;
       font-weight: 600;
-    }}
-    header span {{
+    }
+    header span {
       font-size: 13px;
       color: #cfe6de;
-    }}
-    .layout {{
+    }
+    .layout {
       display: grid;
       grid-template-columns: 430px 1fr;
       height: calc(100vh - 54px);
       min-height: 520px;
-    }}
-    aside {{
+    }
+    aside {
       border-right: 1px solid #c9d7d2;
       background: #fbfdfc;
       overflow: hidden;
       display: flex;
       flex-direction: column;
-    }}
-    .controls {{
+    }
+    .controls {
       padding: 12px;
       border-bottom: 1px solid #d8e3df;
       display: grid;
       gap: 10px;
-    }}
-    .field {{
+    }
+    .field {
       display: grid;
       gap: 5px;
-    }}
-    .field label {{
+    }
+    .field label {
       font-size: 11px;
       font-weight: 700;
       color: #56635f;
       text-transform: uppercase;
-    }}
-    input[type="search"], input[type="range"], select {{
+    }
+    input[type="search"], input[type="range"], select {
       width: 100%;
-    }}
-    input[type="search"], select {{
+    }
+    input[type="search"], select {
       height: 32px;
       padding: 0 9px;
       border: 1px solid #b9ccc5;
       border-radius: 5px;
       font-size: 13px;
       background: white;
-    }}
-    select {{
+    }
+    select {
       border-color: #9db5ca;
       color: #1e466f;
       font-weight: 700;
       background: #f7fbff;
-    }}
-    .list {{
+    }
+    .list {
       overflow: auto;
       font-size: 12px;
-    }}
-    .row {{
+      flex: 1;
+    }
+    .list-spacer {
+      position: relative;
+    }
+    .row {
+      position: absolute;
+      left: 0;
+      right: 0;
+      height: 62px;
       padding: 8px 10px;
       border-bottom: 1px solid #edf3f1;
       cursor: pointer;
       display: grid;
       gap: 3px;
-    }}
-    .row:hover, .row.active {{
+      overflow: hidden;
+    }
+    .row:hover, .row.active {
       background: #eef1f6;
-    }}
-    .row-title {{
+    }
+    .row-title {
       font-weight: 700;
       color: #111827;
-    }}
-    .row-sub {{
+    }
+    .row-sub {
       white-space: nowrap;
       overflow: hidden;
       text-overflow: ellipsis;
       color: #53625e;
-    }}
-    main {{
+    }
+    main {
       overflow: auto;
       padding: 18px;
-    }}
-    .summary {{
+    }
+    .summary {
       display: grid;
       grid-template-columns: repeat(3, minmax(120px, 1fr));
       gap: 10px;
       margin-bottom: 16px;
-    }}
-    .metric {{
+    }
+    .metric {
       background: #f8fafc;
       border: 1px solid #c8d2df;
       border-radius: 6px;
       padding: 10px;
-    }}
-    .metric:nth-child(1) {{
+    }
+    .metric:nth-child(1) {
       border-left: 4px solid #9aa9bd;
-    }}
-    .metric:nth-child(2) {{
+    }
+    .metric:nth-child(2) {
       border-left: 4px solid #8fb3c9;
-    }}
-    .metric:nth-child(3) {{
+    }
+    .metric:nth-child(3) {
       border-left: 4px solid #8bbba7;
-    }}
-    .metric label {{
+    }
+    .metric label {
       display: block;
       color: #66736f;
       font-size: 12px;
       margin-bottom: 5px;
-    }}
-    .metric div {{
+    }
+    .metric div {
       font-weight: 700;
       font-size: 16px;
-    }}
-    section {{
+    }
+    section {
       background: #fbfdfc;
       border: 1px solid #d2dfda;
       border-radius: 6px;
       margin-bottom: 14px;
       overflow: hidden;
-    }}
-    section.obs-section {{
+    }
+    section.obs-section {
       border-color: #7ab59f;
-    }}
-    section.action-section {{
+    }
+    section.action-section {
       border-color: #8aa9d6;
-    }}
-    section h2 {{
+    }
+    section h2 {
       margin: 0;
       padding: 10px 12px;
       font-size: 14px;
       border-bottom: 1px solid #d2dfda;
-    }}
-    .obs-section h2 {{
+    }
+    .obs-section h2 {
       background: #e0f2ea;
       color: #17533f;
-    }}
-    .action-section h2 {{
+    }
+    .action-section h2 {
       background: #e6eefb;
       color: #214f88;
-    }}
-    table {{
+    }
+    table {
       width: 100%;
       border-collapse: collapse;
       font-size: 13px;
-    }}
-    th, td {{
+    }
+    th, td {
       padding: 7px 10px;
       border-bottom: 1px solid #edf3f1;
       text-align: left;
       font-variant-numeric: tabular-nums;
-    }}
-    th {{
+    }
+    th {
       width: 240px;
       color: #4f5f5a;
       font-weight: 600;
       background: #f7faf9;
-    }}
-    .empty {{
+    }
+    .empty {
       padding: 12px;
       color: #15803d;
       font-weight: 600;
-    }}
-  </style>
+    }
+"""
+
+
+def write_data_window_html(
+    repo_id: str,
+    episode_index: int,
+    frame_index: np.ndarray,
+    timestamp: np.ndarray,
+    actions: np.ndarray | None,
+    action_names: list[str],
+    obs: np.ndarray | None,
+    obs_names: list[str],
+    default_obs_group: str | None = None,
+    output_dir: Path | None = None,
+) -> Path:
+    """Write the episode data window.
+
+    Values are embedded column-wise: names once, then each column as a
+    base64 typed array (int32 frame_index, float64 timestamp, float32
+    row-major action and observation.state), which keeps the page a single
+    file that opens from disk. The list only renders the rows in view.
+    """
+    num_frames = len(frame_index)
+    if actions is None:
+        actions, action_names = np.zeros((num_frames, 0)), []
+    if obs is None:
+        obs, obs_names = np.zeros((num_frames, 0)), []
+    if output_dir is None:
+        output_dir = Path(tempfile.gettempdir()) / "ur5e_isoteleop_visualize"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    html_path = output_dir / f"{repo_id.replace('/', '_')}_episode_{episode_index}_data.html"
+    payload = {
+        "repo_id": repo_id,
+        "episode_index": episode_index,
+        "num_frames": num_frames,
+        "action_names": list(action_names),
+        "obs_names": list(obs_names),
+        "default_obs_group": default_obs_group,
+        "columns": {
+            "frame_index": encode_column(frame_index, "<i4"),
+            "timestamp": encode_column(timestamp, "<f8"),
+            "action": encode_column(actions, "<f4"),
+            "obs": encode_column(obs, "<f4"),
+        },
+    }
+    data_json = json.dumps(payload)
+    html = f"""<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>UR5e Episode Data</title>
+  <style>
+{DATA_WINDOW_STYLE}  </style>
 </head>
 <body>
   <header>
@@ -283,7 +334,7 @@ def write_data_window_html(
           <input id="slider" type="range" min="0" max="0" value="0">
         </div>
       </div>
-      <div id="list" class="list"></div>
+      <div id="list" class="list"><div id="listSpacer" class="list-spacer"></div></div>
     </aside>
     <main>
       <div class="summary">
@@ -304,45 +355,122 @@ def write_data_window_html(
   </div>
   <script>
     const data = {data_json};
-    const rows = data.rows || [];
-    const obsGroups = [...new Set((data.obs_names || []).map((name) => name.split(".")[0]))];
-    let filtered = rows.map((_, index) => index);
+    const ROW_HEIGHT = 62;
+    const OVERSCAN = 10;
+    const SEARCH_DELAY_MS = 200;
+
+    function decodeColumn(b64, ArrayType) {{
+      const binary = atob(b64);
+      const bytes = new Uint8Array(binary.length);
+      for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+      return new ArrayType(bytes.buffer);
+    }}
+
+    const numFrames = data.num_frames;
+    const actionNames = data.action_names || [];
+    const obsNames = data.obs_names || [];
+    const frameIndex = decodeColumn(data.columns.frame_index, Int32Array);
+    const timestamps = decodeColumn(data.columns.timestamp, Float64Array);
+    const actions = decodeColumn(data.columns.action, Float32Array);
+    const obs = decodeColumn(data.columns.obs, Float32Array);
+    const obsGroups = [...new Set(obsNames.map((name) => name.split(".")[0]))];
+    const allRows = Int32Array.from({{ length: numFrames }}, (_, index) => index);
+    let filtered = allRows;
     let selectedIndex = 0;
     let selectedObsGroup = data.default_obs_group && obsGroups.includes(data.default_obs_group)
       ? data.default_obs_group
       : "";
+    let obsColumns = [];
+    const TEXT_CHUNK = 2000;
+    const searchTexts = new Map();
+    let searchTimer = null;
+    let renderPending = false;
 
     const meta = document.getElementById("meta");
     const list = document.getElementById("list");
+    const listSpacer = document.getElementById("listSpacer");
     const search = document.getElementById("search");
     const slider = document.getElementById("slider");
     const obsGroup = document.getElementById("obsGroup");
 
-    meta.textContent = `${{data.repo_id}} | episode ${{data.episode_index}} | ${{rows.length}} frames`;
-    slider.max = Math.max(rows.length - 1, 0);
+    meta.textContent = `${{data.repo_id}} | episode ${{data.episode_index}} | ${{numFrames}} frames`;
+    slider.max = Math.max(numFrames - 1, 0);
     obsGroup.innerHTML = `<option value="">None</option>` + obsGroups.map((group) => `<option value="${{group}}">${{group}}</option>`).join("");
     obsGroup.value = selectedObsGroup;
 
+    function escapeHtml(text) {{
+      return text.replace(/[&<>"]/g, (c) => ({{ "&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;" }})[c]);
+    }}
+
     function valueText(value) {{
       return Number.isFinite(value) ? value.toFixed(6) : String(value);
     }}
 
-    function dictSummary(values) {{
-      return Object.entries(values || {{}})
-        .map(([key, value]) => `${{key}}=${{valueText(value)}}`)
-        .join(", ");
+    function groupColumns(group) {{
+      if (!group) return [];
+      return obsNames
+        .map((name, col) => [name, col])
+        .filter(([name]) => name === group || name.startsWith(`${{group}}.`))
+        .map(([, col]) => col);
+    }}
+
+    function actionEntries(rowIndex) {{
+      const base = rowIndex * actionNames.length;
+      return actionNames.map((name, col) => [name, actions[base + col]]);
+    }}
+
+    function obsEntries(rowIndex) {{
+      const base = rowIndex * obsNames.length;
+      return obsColumns.map((col) => [obsNames[col], obs[base + col]]);
+    }}
+
+    function summary(entries) {{
+      return entries.map(([key, value]) => `${{key}}=${{valueText(value)}}`).join(", ");
+    }}
+
+    // Lower-case whole-row search strings (frame, timestamp, action and the group's obs), one set per
+    // obs group, so a query may span columns. They are built in chunks while the page is idle; a search
+    // finishes whatever is left first.
+    function buildTexts(group, upTo) {{
+      if (!searchTexts.has(group)) searchTexts.set(group, {{ texts: new Array(numFrames), built: 0 }});
+      const entry = searchTexts.get(group);
+      const cols = groupColumns(group);
+      for (; entry.built < upTo; entry.built++) {{
+        const i = entry.built;
+        const obsText = summary(cols.map((col) => [obsNames[col], obs[i * obsNames.length + col]]));
+        entry.texts[i] = `${{frameIndex[i]}} ${{timestamps[i]}} ${{summary(actionEntries(i))}} ${{obsText}}`.toLowerCase();
+      }}
+      return entry.texts;
+    }}
+
+    function prebuildTexts(group) {{
+      const entry = searchTexts.get(group);
+      const built = entry ? entry.built : 0;
+      if (built >= numFrames) return;
+      buildTexts(group, Math.min(numFrames, built + TEXT_CHUNK));
+      setTimeout(() => prebuildTexts(group), 0);
     }}
 
-    function selectedObs(values) {{
-      return Object.fromEntries(
-        Object.entries(values || {{}}).filter(([key]) => key === selectedObsGroup || key.startsWith(`${{selectedObsGroup}}.`))
-      );
+    function applySearch() {{
+      const q = search.value.toLowerCase().trim();
+      if (!q) {{
+        filtered = allRows;
+      }} else {{
+        const texts = buildTexts(selectedObsGroup, numFrames);
+        const matches = [];
+        for (let i = 0; i < numFrames; i++) {{
+          if (texts[i].includes(q)) matches.push(i);
+        }}
+        filtered = Int32Array.from(matches);
+      }}
+      list.scrollTop = 0;
+      renderList();
     }}
 
-    function renderTable(tableId, values) {{
+    function renderTable(tableId, entries) {{
       const table = document.getElementById(tableId);
       table.innerHTML = "";
-      for (const [key, value] of Object.entries(values || {{}})) {{
+      for (const [key, value] of entries) {{
         const tr = document.createElement("tr");
         const th = document.createElement("th");
         const td = document.createElement("td");
@@ -354,67 +482,350 @@ def write_data_window_html(
       }}
     }}
 
+    function renderVisible() {{
+      renderPending = false;
+      listSpacer.style.height = `${{filtered.length * ROW_HEIGHT}}px`;
+      const first = Math.max(0, Math.floor(list.scrollTop / ROW_HEIGHT) - OVERSCAN);
+      const last = Math.min(filtered.length, Math.ceil((list.scrollTop + list.clientHeight) / ROW_HEIGHT) + OVERSCAN);
+      const obsLabel = escapeHtml(selectedObsGroup || "obs");
+      let html = "";
+      for (let position = first; position < last; position++) {{
+        const rowIndex = filtered[position];
+        const active = rowIndex === selectedIndex ? " active" : "";
+        html += `<div class="row${{active}}" data-index="${{rowIndex}}" style="top: ${{position * ROW_HEIGHT}}px">
+          <div class="row-title">Frame ${{frameIndex[rowIndex]}} | t=${{timestamps[rowIndex].toFixed(3)}}</div>
+          <div class="row-sub">action: ${{escapeHtml(summary(actionEntries(rowIndex)))}}</div>
+          <div class="row-sub">${{obsLabel}}: ${{escapeHtml(summary(obsEntries(rowIndex)))}}</div>
+        </div>`;
+      }}
+      listSpacer.innerHTML = html;
+    }}
+
+    function scheduleRender() {{
+      if (renderPending) return;
+      renderPending = true;
+      requestAnimationFrame(renderVisible);
+    }}
+
     function renderDetail(rowIndex) {{
-      if (!rows.length) return;
-      selectedIndex = Math.max(0, Math.min(rowIndex, rows.length - 1));
-      const row = rows[selectedIndex];
-      const obs = selectedObs(row.obs);
-      document.getElementById("frameValue").textContent = row.frame_index;
-      document.getElementById("timeValue").textContent = row.timestamp.toFixed(3);
-      document.getElementById("obsCount").textContent = Object.keys(obs).length;
-      renderTable("actionTable", row.action);
-      renderTable("obsTable", obs);
-      document.getElementById("obsEmpty").hidden = Object.keys(obs).length > 0;
+      if (!numFrames) return;
+      selectedIndex = Math.max(0, Math.min(rowIndex, numFrames - 1));
+      const obsValues = obsEntries(selectedIndex);
+      document.getElementById("frameValue").textContent = frameIndex[selectedIndex];
+      document.getElementById("timeValue").textContent = timestamps[selectedIndex].toFixed(3);
+      document.getElementById("obsCount").textContent = obsValues.length;
+      renderTable("actionTable", actionEntries(selectedIndex));
+      renderTable("obsTable", obsValues);
+      document.getElementById("obsEmpty").hidden = obsValues.length > 0;
       slider.value = selectedIndex;
-      document.querySelectorAll(".row").forEach((el) => {{
-        el.classList.toggle("active", Number(el.dataset.index) === selectedIndex);
-      }});
+      scheduleRender();
     }}
 
-    function renderList() {{
-      list.innerHTML = "";
-      for (const rowIndex of filtered) {{
-        const row = rows[rowIndex];
-        const item = document.createElement("div");
-        item.className = "row";
-        item.dataset.index = rowIndex;
-        item.innerHTML = `
-          <div class="row-title">Frame ${{row.frame_index}} | t=${{row.timestamp.toFixed(3)}}</div>
-          <div class="row-sub">action: ${{dictSummary(row.action)}}</div>
-          <div class="row-sub">${{selectedObsGroup || "obs"}}: ${{dictSummary(selectedObs(row.obs))}}</div>
-        `;
-        item.addEventListener("click", () => renderDetail(rowIndex));
-        list.appendChild(item);
+    function scrollToRow(rowIndex) {{
+      // filtered is sorted, so the row's position is found by bisection
+      let lo = 0;
+      let hi = filtered.length;
+      while (lo < hi) {{
+        const mid = (lo + hi) >> 1;
+        if (filtered[mid] < rowIndex) lo = mid + 1; else hi = mid;
       }}
+      if (filtered[lo] !== rowIndex) return;
+      const top = lo * ROW_HEIGHT;
+      if (top < list.scrollTop || top + ROW_HEIGHT > list.scrollTop + list.clientHeight) {{
+        list.scrollTop = top - list.clientHeight / 2;
+      }}
+    }}
+
+    function renderList() {{
+      obsColumns = groupColumns(selectedObsGroup);
+      renderVisible();
       renderDetail(filtered[0] ?? 0);
     }}
 
     search.addEventListener("input", () => {{
-      const q = search.value.toLowerCase().trim();
-      filtered = rows
-        .map((row, index) => [row, index])
-        .filter(([row]) => {{
-          if (!q) return true;
-          return `${{row.frame_index}} ${{row.timestamp}} ${{dictSummary(row.action)}} ${{dictSummary(selectedObs(row.obs))}}`
-            .toLowerCase()
-            .includes(q);
-        }})
-        .map(([, index]) => index);
-      renderList();
+      clearTimeout(searchTimer);
+      searchTimer = setTimeout(applySearch, SEARCH_DELAY_MS);
     }});
 
     obsGroup.addEventListener("change", () => {{
       selectedObsGroup = obsGroup.value;
-      renderList();
+      prebuildTexts(selectedObsGroup);
+      if (search.value.trim()) {{
+        applySearch();
+      }} else {{
+        renderList();
+      }}
+    }});
+    list.addEventListener("scroll", scheduleRender);
+    list.addEventListener("click", (event) => {{
+      const row = event.target.closest(".row");
+      if (row) renderDetail(Number(row.dataset.index));
+    }});
+    slider.addEventListener("input", () => {{
+      renderDetail(Number(slider.value));
+      scrollToRow(selectedIndex);
     }});
-    slider.addEventListener("input", () => renderDetail(Number(slider.value)));
     slider.addEventListener("wheel", (event) => {{
       event.preventDefault();
       const direction = event.deltaY > 0 || event.deltaX > 0 ? 1 : -1;
-      const nextIndex = Math.max(0, Math.min(rows.length - 1, Number(slider.value) + direction));
+      const nextIndex = Math.max(0, Math.min(numFrames - 1, Number(slider.value) + direction));
       renderDetail(nextIndex);
+      scrollToRow(selectedIndex);
     }}, {{ passive: false }});
+    window.addEventListener("resize", scheduleRender);
     renderList();
+    prebuildTexts(selectedObsGroup);
+  </script>
+</body>
+</html>
+"""
+    html_path.write_text(html, encoding="utf-8")
+    return html_path
+
+
+def comparison_name(repo_id: str, episode_indices: list[int], align_mode: str) -> str:
+    """Recording name of a comparison; the .rrd and the comparison window are named after it."""
+    episodes_str = "_".join(str(index) for index in episode_indices[:8])
+    if len(episode_indices) > 8:
+        episodes_str += f"_and_{len(episode_indices) - 8}_more"
+    return f"{repo_id}/compare_{episodes_str}_{align_mode}"
+
+
+def write_comparison_window_html(
+    repo_id: str,
+    episode_indices: list[int],
+    align_mode: str,
+    reference: int | None,
+    features: dict[str, tuple[list[str], np.ndarray, np.ndarray, np.ndarray]],
+    output_dir: Path | None = None,
+) -> Path:
+    """Write the multi-episode comparison window.
+
+    `features` maps a feature key to (names, aligned, mean, std), with
+    aligned (num_episodes, num_points, D) and mean/std (num_points, D).
+    Arrays are embedded as base64 float32 like the episode data window; the
+    page plots every episode of the selected dimension over the mean ± std
+    band and lists the values at the selected step.
+    """
+    if output_dir is None:
+        output_dir = Path(tempfile.gettempdir()) / "ur5e_isoteleop_visualize"
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    html_path = output_dir / f"{comparison_name(repo_id, episode_indices, align_mode).replace('/', '_')}.html"
+    num_points = next(iter(features.values()))[1].shape[1] if features else 0
+    payload = {
+        "repo_id": repo_id,
+        "episodes": [int(index) for index in episode_indices],
+        "align": align_mode,
+        "reference": reference,
+        "num_points": num_points,
+        "features": [
+            {
+                "key": key,
+                "names": list(names),
+                "aligned": encode_column(aligned, "<f4"),
+                "mean": encode_column(mean, "<f4"),
+                "std": encode_column(std, "<f4"),
+            }
+            for key, (names, aligned, mean, std) in features.items()
+        ],
+    }
+    data_json = json.dumps(payload)
+    html = f"""<!doctype html>
+<html lang="en">
+<head>
+  <meta charset="utf-8">
+  <title>UR5e Episode Comparison</title>
+  <style>
+{DATA_WINDOW_STYLE}    .plot {{
+      padding: 10px 12px;
+    }}
+    canvas {{
+      width: 100%;
+      height: 360px;
+      display: block;
+    }}
+    td.reference {{
+      color: #214f88;
+      font-weight: 700;
+    }}
+  </style>
+</head>
+<body>
+  <header>
+    <h1>UR5e Episode Comparison</h1>
+    <span id="meta"></span>
+  </header>
+  <div class="layout">
+    <aside>
+      <div class="controls">
+        <div class="field">
+          <label for="feature">Feature</label>
+          <select id="feature"></select>
+        </div>
+        <div class="field">
+          <label for="slider">Step</label>
+          <input id="slider" type="range" min="0" max="0" value="0">
+        </div>
+      </div>
+      <div class="list">
+        <table id="valueTable"></table>
+      </div>
+    </aside>
+    <main>
+      <div class="summary">
+        <div class="metric"><label>Progress</label><div id="progressValue">-</div></div>
+        <div class="metric"><label>Mean</label><div id="meanValue">-</div></div>
+        <div class="metric"><label>Std</label><div id="stdValue">-</div></div>
+      </div>
+      <section class="action-section">
+        <h2 id="plotTitle">Episodes</h2>
+        <div class="plot"><canvas id="plot"></canvas></div>
+      </section>
+    </main>
+  </div>
+  <script>
+    const data = {data_json};
+    const BAND_COLOR = "rgba(230, 120, 40, 0.22)";
+    const EPISODE_COLOR = "rgba(120, 150, 190, 0.55)";
+    const REFERENCE_COLOR = "rgba(33, 79, 136, 0.9)";
+    const MEAN_COLOR = "#143c78";
+
+    function decodeColumn(b64, ArrayType) {{
+      const binary = atob(b64);
+      const bytes = new Uint8Array(binary.length);
+      for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+      return new ArrayType(bytes.buffer);
+    }}
+
+    const numPoints = data.num_points;
+    const numEpisodes = data.episodes.length;
+    const features = data.features.map((feature) => ({{
+      key: feature.key,
+      names: feature.names,
+      aligned: decodeColumn(feature.aligned, Float32Array),
+      mean: decodeColumn(feature.mean, Float32Array),
+      std: decodeColumn(feature.std, Float32Array),
+    }}));
+    const options = features.flatMap((feature, f) => feature.names.map((name, dim) => ({{ f, dim, label: `${{feature.key}} / ${{name}}` }})));
+    let selected = options[0];
+    let step = 0;
+
+    const canvas = document.getElementById("plot");
+    const slider = document.getElementById("slider");
+    const featureSelect = document.getElementById("feature");
+    const reference = data.reference === null ? "" : ` | reference episode ${{data.episodes[data.reference]}}`;
+    document.getElementById("meta").textContent =
+      `${{data.repo_id}} | ${{numEpisodes}} episodes | ${{data.align}} alignment | ${{numPoints}} points${{reference}}`;
+    featureSelect.innerHTML = options.map((option, i) => `<option value="${{i}}">${{option.label}}</option>`).join("");
+    slider.max = Math.max(numPoints - 1, 0);
+
+    // Values of one dimension, as series over the aligned steps
+    function series(option) {{
+      const feature = features[option.f];
+      const dims = feature.names.length;
+      const episodes = [];
+      for (let e = 0; e < numEpisodes; e++) {{
+        const values = new Float32Array(numPoints);
+        const base = e * numPoints * dims;
+        for (let p = 0; p < numPoints; p++) values[p] = feature.aligned[base + p * dims + option.dim];
+        episodes.push(values);
+      }}
+      const mean = new Float32Array(numPoints);
+      const std = new Float32Array(numPoints);
+      for (let p = 0; p < numPoints; p++) {{
+        mean[p] = feature.mean[p * dims + option.dim];
+        std[p] = feature.std[p * dims + option.dim];
+      }}
+      return {{ episodes, mean, std }};
+    }}
+
+    function valueText(value) {{
+      return Number.isFinite(value) ? value.toFixed(6) : String(value);
+    }}
+
+    function drawPlot(current) {{
+      const ratio = window.devicePixelRatio || 1;
+      const width = canvas.clientWidth;
+      const height = canvas.clientHeight;
+      canvas.width = width * ratio;
+      canvas.height = height * ratio;
+      const ctx = canvas.getContext("2d");
+      ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+      ctx.clearRect(0, 0, width, height);
+
+      let lo = Infinity;
+      let hi = -Infinity;
+      for (const values of current.episodes) for (const v of values) {{ if (v < lo) lo = v; if (v > hi) hi = v; }}
+      for (let p = 0; p < numPoints; p++) {{
+        lo = Math.min(lo, current.mean[p] - current.std[p]);
+        hi = Math.max(hi, current.mean[p] + current.std[p]);
+      }}
+      if (!(hi > lo)) {{ lo -= 1; hi += 1; }}
+      const pad = 8;
+      const x = (p) => pad + (p / Math.max(numPoints - 1, 1)) * (width - 2 * pad);
+      const y = (v) => height - pad - ((v - lo) / (hi - lo)) * (height - 2 * pad);
+
+      ctx.fillStyle = BAND_COLOR;
+      ctx.beginPath();
+      for (let p = 0; p < numPoints; p++) ctx.lineTo(x(p), y(current.mean[p] + current.std[p]));
+      for (let p = numPoints - 1; p >= 0; p--) ctx.lineTo(x(p), y(current.mean[p] - current.std[p]));
+      ctx.closePath();
+      ctx.fill();
+
+      function line(values, color, lineWidth) {{
+        ctx.strokeStyle = color;
+        ctx.lineWidth = lineWidth;
+        ctx.beginPath();
+        for (let p = 0; p < numPoints; p++) ctx.lineTo(x(p), y(values[p]));
+        ctx.stroke();
+      }}
+      current.episodes.forEach((values, e) => line(values, e === data.reference ? REFERENCE_COLOR : EPISODE_COLOR, 1));
+      line(current.mean, MEAN_COLOR, 2.5);
+
+      ctx.strokeStyle = "#17201d";
+      ctx.lineWidth = 1;
+      ctx.beginPath();
+      ctx.moveTo(x(step), pad);
+      ctx.lineTo(x(step), height - pad);
+      ctx.stroke();
+    }}
+
+    function renderTable(current) {{
+      const rows = current.episodes.map((values, e) => {{
+        const cls = e === data.reference ? ` class="reference"` : "";
+        return `<tr><th>episode ${{data.episodes[e]}}</th><td${{cls}}>${{valueText(values[step])}}</td></tr>`;
+      }});
+      document.getElementById("valueTable").innerHTML = rows.join("");
+    }}
+
+    function render() {{
+      const current = series(selected);
+      document.getElementById("plotTitle").textContent = selected.label;
+      document.getElementById("progressValue").textContent = `${{(100 * step / Math.max(numPoints - 1, 1)).toFixed(1)}}%`;
+      document.getElementById("meanValue").textContent = valueText(current.mean[step]);
+      document.getElementById("stdValue").textContent = valueText(current.std[step]);
+      renderTable(current);
+      drawPlot(current);
+    }}
+
+    featureSelect.addEventListener("change", () => {{
+      selected = options[Number(featureSelect.value)];
+      render();
+    }});
+    slider.addEventListener("input", () => {{
+      step = Number(slider.value);
+      render();
+    }});
+    canvas.addEventListener("click", (event) => {{
+      const rect = canvas.getBoundingClientRect();
+      step = Math.round(((event.clientX - rect.left) / rect.width) * (numPoints - 1));
+      step = Math.max(0, Math.min(numPoints - 1, step));
+      slider.value = step;
+      render();
+    }});
+    window.addEventListener("resize", render);
+    if (selected) render();
   </script>
 </body>
 </html>
@@ -423,7 +834,9 @@ def write_data_window_html(
     return html_path
 
 
-class EpisodeSampler(torch.utils.data.Sampler):
+class EpisodeSampler:
+    """Dataset indices of one episode; DataLoader takes any sized iterable as its sampler."""
+
     def __init__(self, dataset: LeRobotDataset, episode_index: int):
         from_idx = dataset.meta.episodes["dataset_from_index"][episode_index]
         to_idx = dataset.meta.episodes["dataset_to_index"][episode_index]
@@ -437,6 +850,8 @@ class EpisodeSampler(torch.utils.data.Sampler):
 
 
 def to_hwc_uint8_numpy(chw_float32_torch: torch.Tensor) -> np.ndarray:
+    import torch
+
     assert chw_float32_torch.dtype == torch.float32
     assert chw_float32_torch.ndim == 3
     c, h, w = chw_float32_torch.shape
@@ -445,6 +860,142 @@ def to_hwc_uint8_numpy(chw_float32_torch: torch.Tensor) -> np.ndarray:
     return hwc_uint8_numpy
 
 
+def log_episode_videos(dataset: LeRobotDataset, episode_index: int, arrays: dict[str, np.ndarray]) -> None:
+    from scripts.utils.video_encoder import remux_video_span
+
+    episode = dataset.meta.episodes[episode_index]
+    clip_dir = Path(tempfile.gettempdir()) / "ur5e_isoteleop_visualize" / "videos"
+    for key in dataset.meta.video_keys:
+        video_path = dataset.root / dataset.meta.get_video_file_path(episode_index, key)
+        from_timestamp = float(episode[f"videos/{key}/from_timestamp"])
+        to_timestamp = float(episode[f"videos/{key}/to_timestamp"])
+        # A chunk mp4 holds many episodes; only this episode's packets are copied out and embedded
+        clip_path = clip_dir / f"{dataset.repo_id.replace('/', '_')}_episode_{episode_index}_{key}.mp4"
+        clip_from = remux_video_span(video_path, clip_path, from_timestamp, to_timestamp)
+        log_video_asset(key, clip_path, arrays["frame_index"], arrays["timestamp"], clip_from)
+        logging.info(
+            f"Logged {key} as a video asset, {from_timestamp:.3f}-{to_timestamp:.3f} s of {video_path.name} "
+            f"({clip_path.stat().st_size / 1e6:.1f} of {video_path.stat().st_size / 1e6:.1f} MB)"
+        )
+
+    if "task_index" in arrays and dataset.meta.tasks is not None:
+        # Log the task only where it changes, as the per-frame loop would have shown it
+        tasks = {int(task_index): task for task, task_index in dataset.meta.tasks["task_index"].items()}
+        task_index = arrays["task_index"]
+        changes = np.flatnonzero(np.r_[True, task_index[1:] != task_index[:-1]])
+        for i in changes:
+            rr.set_time("frame_index", sequence=int(arrays["frame_index"][i]))
+            rr.set_time("timestamp", timestamp=float(arrays["timestamp"][i]))
+            rr.log("task", rr.TextLog(tasks.get(int(task_index[i]), str(task_index[i]))))
+
+
+def read_scalar_arrays(root: Path, episode_index: int, info: dict, extra_keys: list[str] | None = None) -> dict[str, np.ndarray]:
+    """The episode's action, observation.state and flag columns, read from parquet without torch."""
+    features = info["features"]
+    t_read = time.perf_counter()
+    scalar_keys = [key for key in (ACTION, OBS_STATE, *FLAG_KEYS, *(extra_keys or [])) if key in features]
+    arrays = read_episode_columns(root, episode_index, [*scalar_keys, "timestamp"], info=info)
+    logging.info(f"Read {len(arrays['frame_index'])} frames of scalars in {(time.perf_counter() - t_read) * 1e3:.1f} ms")
+    return arrays
+
+
+def start_rerun(recording_name: str, mode: str, web_port: int, ws_port: int, save: bool, output_dir: Path | None) -> None:
+    if save:
+        assert output_dir is not None, (
+            "Set an output directory where to write .rrd files with `--output-dir path/to/directory`."
+        )
+    if mode not in ["local", "distant"]:
+        raise ValueError(mode)
+
+    logging.info("Starting Rerun")
+    spawn_local_viewer = mode == "local" and not save
+    rr.init(recording_name, spawn=spawn_local_viewer)
+
+    # Manually call python garbage collector after `rr.init` to avoid hanging in a blocking flush
+    # when iterating on a dataloader with `num_workers` > 0
+    # TODO(rcadene): remove `gc.collect` when rerun version 0.16 is out, which includes a fix
+    gc.collect()
+
+    if mode == "distant":
+        rr.serve(open_browser=False, web_port=web_port, ws_port=ws_port)
+
+
+def log_scalars(arrays: dict[str, np.ndarray], action_names: list[str], obs_state_names: list[str]) -> None:
+    logging.info("Logging to Rerun")
+    t_log = time.perf_counter()
+    calls = log_episode_scalars(arrays, {ACTION: action_names, OBS_STATE: obs_state_names})
+    logging.info(f"Logged scalars in {calls} calls, {(time.perf_counter() - t_log) * 1e3:.1f} ms")
+
+
+def show_episode_data(
+    repo_id: str,
+    episode_index: int,
+    arrays: dict[str, np.ndarray],
+    action_names: list[str],
+    obs_state_names: list[str],
+    default_obs_group: str | None,
+    data_window: bool,
+    print_to_terminal: bool,
+    output_dir: Path | None,
+) -> None:
+    """Terminal output and the data window, both fed from the episode arrays."""
+    obs_groups = list(dict.fromkeys(obs_group_name(name) for name in obs_state_names))
+    if default_obs_group and default_obs_group not in obs_groups:
+        print(green(f"Observation group '{default_obs_group}' was not found. Observation display is disabled by default."))
+        default_obs_group = None
+    active_obs_group = default_obs_group
+    num_frames = len(arrays["frame_index"])
+
+    if print_to_terminal:
+        action_rows = rows_to_named_dicts(arrays.get(ACTION), action_names, num_frames)
+        obs_rows = rows_to_named_dicts(arrays.get(OBS_STATE), obs_state_names, num_frames)
+        frames = zip(arrays["frame_index"].tolist(), arrays["timestamp"].tolist(), action_rows, obs_rows)
+        for frame_index, timestamp, action_values, obs_values in frames:
+            selected_obs = select_obs_group(obs_values, active_obs_group)
+            line = (
+                f"[EP {episode_index} | frame {frame_index} | t={timestamp:.3f}] "
+                f"action: {format_named_values(action_values)}"
+            )
+            if selected_obs:
+                line += f" | obs: {format_named_values(selected_obs)}"
+            print(line)
+
+    if data_window:
+        html_path = write_data_window_html(
+            repo_id=repo_id,
+            episode_index=episode_index,
+            frame_index=arrays["frame_index"],
+            timestamp=arrays["timestamp"],
+            actions=arrays.get(ACTION),
+            action_names=action_names,
+            obs=arrays.get(OBS_STATE),
+            obs_names=obs_state_names,
+            default_obs_group=active_obs_group,
+            output_dir=output_dir,
+        )
+        print(green(f"Episode data window: {html_path}"))
+        webbrowser.open(html_path.as_uri())
+
+
+def finish_rerun(recording_name: str, mode: str, save: bool, output_dir: Path | None) -> Path | None:
+    if mode == "local" and save:
+        # save .rrd locally
+        output_dir = Path(output_dir)
+        output_dir.mkdir(parents=True, exist_ok=True)
+        rrd_path = output_dir / f"{recording_name.replace('/', '_')}.rrd"
+        rr.save(rrd_path)
+        return rrd_path
+
+    elif mode == "distant":
+        # stop the process from exiting since it is serving the websocket connection
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print("Ctrl-C received. Exiting.")
+    return None
+
+
 def visualize_dataset(
     dataset: LeRobotDataset,
     episode_index: int,
@@ -458,22 +1009,23 @@ def visualize_dataset(
     default_obs_group: str | None = None,
     data_window: bool = True,
     print_to_terminal: bool = False,
+    video_mode: str = "decode",
 ) -> Path | None:
-    if save:
-        assert output_dir is not None, (
-            "Set an output directory where to write .rrd files with `--output-dir path/to/directory`."
-        )
+    import torch.utils.data
+    import tqdm
+
+    if video_mode not in VIDEO_MODES:
+        raise ValueError(f"Unknown video mode {video_mode!r}, expected one of {VIDEO_MODES}")
 
     repo_id = dataset.repo_id
     features = dataset.meta.features
     action_names = get_feature_names(features, "action") if "action" in features else []
     obs_state_names = get_feature_names(features, "observation.state") if "observation.state" in features else []
-    obs_groups = list(dict.fromkeys(obs_group_name(name) for name in obs_state_names))
-    if default_obs_group and default_obs_group not in obs_groups:
-        print(green(f"Observation group '{default_obs_group}' was not found. Observation display is disabled by default."))
-        default_obs_group = None
-    active_obs_group = default_obs_group
-    data_rows = []
+
+    # Scalar series come straight from the episode's parquet columns; the dataloader below only serves images
+    extra_keys = ["task_index"] if video_mode == "asset" else []
+    arrays = read_scalar_arrays(dataset.root, episode_index, dataset.meta.info, extra_keys)
+
     logging.info("Loading dataloader")
     episode_sampler = EpisodeSampler(dataset, episode_index)
     dataloader = torch.utils.data.DataLoader(
@@ -483,30 +1035,22 @@ def visualize_dataset(
         sampler=episode_sampler,
     )
 
-    logging.info("Starting Rerun")
+    start_rerun(f"{repo_id}/episode_{episode_index}", mode, web_port, ws_port, save, output_dir)
+    log_scalars(arrays, action_names, obs_state_names)
 
-    if mode not in ["local", "distant"]:
-        raise ValueError(mode)
-
-    spawn_local_viewer = mode == "local" and not save
-    rr.init(f"{repo_id}/episode_{episode_index}", spawn=spawn_local_viewer)
-
-    # Manually call python garbage collector after `rr.init` to avoid hanging in a blocking flush
-    # when iterating on a dataloader with `num_workers` > 0
-    # TODO(rcadene): remove `gc.collect` when rerun version 0.16 is out, which includes a fix
-    gc.collect()
-
-    if mode == "distant":
-        rr.serve(open_browser=False, web_port=web_port, ws_port=ws_port)
-
-    logging.info("Logging to Rerun")
+    if video_mode == "asset":
+        # Each camera's mp4 is handed to the viewer as is; the dataloader, which would decode every frame, is skipped
+        log_episode_videos(dataset, episode_index, arrays)
+        dataloader = []
+        if dataset.meta.image_keys:
+            print(green(f"Image features {dataset.meta.image_keys} are not stored as video and are not shown in asset mode."))
 
     for batch in tqdm.tqdm(dataloader, total=len(dataloader)):
         # iterate over the batch
         for i in range(len(batch["index"])):
             rr.set_time("frame_index", sequence=batch["frame_index"][i].item())
             rr.set_time("timestamp", timestamp=batch["timestamp"][i].item())
-        
+
             # display each camera image
             for key in dataset.meta.camera_keys:
                 # TODO(rcadene): add `.compress()`? is it lossless?
@@ -515,78 +1059,117 @@ def visualize_dataset(
             # display task description
             if 'task' in batch:
                 rr.log("task", rr.TextLog(batch['task'][i]))
-                
-            # display each dimension of action space (e.g. actuators command)
-            if ACTION in batch:
-                for dim_idx, val in enumerate(batch[ACTION][i]):
-                    rr.log(f"{ACTION}/{action_names[dim_idx]}", rr.Scalars(val.item()))
-
-            # display each dimension of observed state space (e.g. agent position in joint space)
-            if OBS_STATE in batch:
-                for dim_idx, val in enumerate(batch[OBS_STATE][i]):
-                    rr.log(f"observation.state/{obs_state_names[dim_idx]}", rr.Scalars(val.item()))
-
-            frame_index = int(batch["frame_index"][i].item())
-            timestamp = float(batch["timestamp"][i].item())
-            action_values = tensor_row_to_named_dict(batch[ACTION][i], action_names) if ACTION in batch else {}
-            obs_values = tensor_row_to_named_dict(batch[OBS_STATE][i], obs_state_names) if OBS_STATE in batch else {}
-            if data_window:
-                data_rows.append(
-                    {
-                        "frame_index": frame_index,
-                        "timestamp": timestamp,
-                        "action": action_values,
-                        "obs": obs_values,
-                    }
-                )
-
-            if print_to_terminal:
-                selected_obs = select_obs_group(obs_values, active_obs_group)
-                line = (
-                    f"[EP {episode_index} | frame {frame_index} | t={timestamp:.3f}] "
-                    f"action: {format_named_values(action_values)}"
-                )
-                if selected_obs:
-                    line += f" | obs: {format_named_values(selected_obs)}"
-                print(line)
-
-            if DONE in batch:
-                rr.log(DONE, rr.Scalars(batch[DONE][i].item()))
-
-            if REWARD in batch:
-                rr.log(REWARD, rr.Scalars(batch[REWARD][i].item()))
-
-            if "next.success" in batch:
-                rr.log("next.success", rr.Scalars(batch["next.success"][i].item()))
+
+    show_episode_data(
+        repo_id, episode_index, arrays, action_names, obs_state_names,
+        default_obs_group, data_window, print_to_terminal, output_dir,
+    )
+    return finish_rerun(f"{repo_id}/episode_{episode_index}", mode, save, output_dir)
+
+
+def visualize_episode_scalars(
+    dataset_name: str,
+    episode_index: int,
+    root: Path | None = None,
+    mode: str = "local",
+    web_port: int = 9090,
+    ws_port: int = 9087,
+    save: bool = False,
+    output_dir: Path | None = None,
+    default_obs_group: str | None = None,
+    data_window: bool = True,
+    print_to_terminal: bool = False,
+) -> Path | None:
+    """Show only actions and observation.state, read from the episode's parquet into numpy.
+
+    Neither torch nor LeRobotDataset is loaded and no video is decoded;
+    the dataset is only fetched through lerobot when it is not on disk.
+    """
+    t_start = time.perf_counter()
+    dataset_root = ensure_local_dataset(dataset_name, root, [episode_index])
+    info = load_dataset_info(dataset_root)
+    features = info["features"]
+    action_names = get_feature_names(features, "action") if "action" in features else []
+    obs_state_names = get_feature_names(features, "observation.state") if "observation.state" in features else []
+    arrays = read_scalar_arrays(dataset_root, episode_index, info)
+
+    start_rerun(f"{dataset_name}/episode_{episode_index}", mode, web_port, ws_port, save, output_dir)
+    log_scalars(arrays, action_names, obs_state_names)
+    show_episode_data(
+        dataset_name, episode_index, arrays, action_names, obs_state_names,
+        default_obs_group, data_window, print_to_terminal, output_dir,
+    )
+    logging.info(f"Episode ready in {time.perf_counter() - t_start:.2f} s")
+    return finish_rerun(f"{dataset_name}/episode_{episode_index}", mode, save, output_dir)
+
+
+def visualize_episode_comparison(
+    dataset_name: str,
+    episodes: list[int] | None,
+    root: Path | None = None,
+    align: str = "normalized",
+    num_points: int = 200,
+    dtw_window: float | None = 0.2,
+    mode: str = "local",
+    web_port: int = 9090,
+    ws_port: int = 9087,
+    save: bool = False,
+    output_dir: Path | None = None,
+    data_window: bool = True,
+) -> Path | None:
+    """Overlay several episodes' action and observation.state on a common time axis.
+
+    The episodes are read from parquet in parallel, aligned by normalized
+    time or dynamic time warping, and shown in rerun and the comparison
+    window together with the per-feature mean ± std band. `episodes=None`
+    compares every episode in the dataset.
+    """
+    t_start = time.perf_counter()
+    if align not in ALIGN_MODES:
+        raise ValueError(f"Unknown alignment {align!r}, expected one of {ALIGN_MODES}")
+    dataset_root = ensure_local_dataset(dataset_name, root, episodes)
+    info = load_dataset_info(dataset_root)
+    if episodes is None:
+        episodes = load_episodes_table(dataset_root)["episode_index"].astype(int).tolist()
+    if not episodes:
+        raise ValueError("No episodes to compare")
+
+    features = info["features"]
+    keys = [key for key in (OBS_STATE, ACTION) if key in features]
+    names = {key: get_feature_names(features, key) for key in keys}
+    arrays = load_episode_arrays(dataset_root, episodes, keys, info)
+    lengths = [len(ep["frame_index"]) for ep in arrays]
+    logging.info(
+        f"Read {len(episodes)} episodes ({min(lengths)}-{max(lengths)} frames) "
+        f"in {(time.perf_counter() - t_start) * 1e3:.1f} ms"
+    )
+
+    t_align = time.perf_counter()
+    aligned, reference = align_episodes(arrays, keys, align, num_points, align_key=keys[0], dtw_window=dtw_window)
+    bands = {key: band_stats(values) for key, values in aligned.items()}
+    logging.info(f"Aligned by {align} in {(time.perf_counter() - t_align) * 1e3:.1f} ms")
+    if reference is not None:
+        logging.info(f"Reference episode {episodes[reference]}, the closest to the mean")
+
+    recording_name = comparison_name(dataset_name, episodes, align)
+    start_rerun(recording_name, mode, web_port, ws_port, save, output_dir)
+    labels = [f"episode {index}" for index in episodes]
+    calls = sum(log_episode_comparison(key, names[key], aligned[key], *bands[key], labels) for key in keys)
+    logging.info(f"Logged the comparison in {calls} calls")
 
     if data_window:
-        html_path = write_data_window_html(
-            repo_id=repo_id,
-            episode_index=episode_index,
-            rows=data_rows,
-            obs_names=obs_state_names,
-            default_obs_group=active_obs_group,
+        html_path = write_comparison_window_html(
+            dataset_name,
+            episodes,
+            align,
+            reference,
+            {key: (names[key], aligned[key], *bands[key]) for key in keys},
             output_dir=output_dir,
         )
-        print(green(f"Episode data window: {html_path}"))
+        print(green(f"Episode comparison window: {html_path}"))
         webbrowser.open(html_path.as_uri())
-
-    if mode == "local" and save:
-        # save .rrd locally
-        output_dir = Path(output_dir)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        repo_id_str = repo_id.replace("/", "_")
-        rrd_path = output_dir / f"{repo_id_str}_episode_{episode_index}.rrd"
-        rr.save(rrd_path)
-        return rrd_path
-
-    elif mode == "distant":
-        # stop the process from exiting since it is serving the websocket connection
-        try:
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
-            print("Ctrl-C received. Exiting.")
+    logging.info(f"Comparison ready in {time.perf_counter() - t_start:.2f} s")
+    return finish_rerun(recording_name, mode, save, output_dir)
 
 
 def main():
@@ -690,12 +1273,59 @@ def main():
         default=int(visualize_cfg.get("data_window", True)),
         help="Generate and open a local HTML window for per-frame action and selected observation data.",
     )
+    parser.add_argument(
+        "--video-mode",
+        type=str,
+        choices=VIDEO_MODES,
+        default=visualize_cfg.get("video_mode", "decode"),
+        help=(
+            "'decode' decodes every camera frame through the dataloader and logs it as an image. "
+            "'asset' logs each camera's mp4 as a video asset with per-frame timestamps, so the viewer decodes on demand."
+        ),
+    )
     parser.add_argument(
         "--print-to-terminal",
         type=int,
         default=int(visualize_cfg.get("print_to_terminal", False)),
         help="Print per-frame action and selected observation data to the terminal.",
     )
+    parser.add_argument(
+        "--scalars-only",
+        type=int,
+        default=int(visualize_cfg.get("scalars_only", False)),
+        help=(
+            "Show only action and observation.state, read from the episode's parquet into numpy. "
+            "Skips torch, the DataLoader and video decoding."
+        ),
+    )
+    parser.add_argument(
+        "--compare-episodes",
+        nargs="+",
+        default=visualize_cfg.get("compare_episodes") or None,
+        help=(
+            "Overlay several episodes instead of showing --episode-index, e.g. `0 1 2`, `0-9` or `all`. "
+            "Only action and observation.state are read."
+        ),
+    )
+    parser.add_argument(
+        "--align",
+        type=str,
+        choices=ALIGN_MODES,
+        default=visualize_cfg.get("align", "normalized"),
+        help="How compared episodes share a time axis: 'normalized' time or 'dtw' (dynamic time warping).",
+    )
+    parser.add_argument(
+        "--num-points",
+        type=int,
+        default=visualize_cfg.get("num_points", 200),
+        help="Samples on the common time axis of compared episodes.",
+    )
+    parser.add_argument(
+        "--dtw-window",
+        type=float,
+        default=visualize_cfg.get("dtw_window", 0.2),
+        help="Largest shift dynamic time warping may apply, as a fraction of the episode; 0 disables the limit.",
+    )
 
     args = parser.parse_args()
     args.data_window = bool(args.data_window)
@@ -705,6 +1335,29 @@ def main():
     root = kwargs.pop("root")
     tolerance_s = kwargs.pop("tolerance_s")
 
+    compare_episodes = kwargs.pop("compare_episodes")
+    align, num_points, dtw_window = kwargs.pop("align"), kwargs.pop("num_points"), kwargs.pop("dtw_window")
+    if compare_episodes:
+        spec = compare_episodes if isinstance(compare_episodes, (list, tuple)) else [compare_episodes]
+        visualize_episode_comparison(
+            dataset_name,
+            parse_episode_spec(spec[0] if len(spec) == 1 else spec),
+            root=root,
+            align=align,
+            num_points=num_points,
+            dtw_window=dtw_window or None,
+            **{key: kwargs[key] for key in ("mode", "web_port", "ws_port", "save", "output_dir", "data_window")},
+        )
+        return
+
+    if kwargs.pop("scalars_only"):
+        for key in ("batch_size", "num_workers", "video_mode"):
+            kwargs.pop(key)
+        visualize_episode_scalars(dataset_name, root=root, **kwargs)
+        return
+
+    from lerobot.datasets.lerobot_dataset import LeRobotDataset
+
     logging.info("Loading dataset")
     dataset = LeRobotDataset(dataset_name, episodes=[args.episode_index], root=root, tolerance_s=tolerance_s)
 
@@ -12,12 +12,15 @@ Core Commands:
 Utility Commands:
   utils-hardware-offsets  Compute hardware offsets between raw UR5e and Dynamixel joints
   utils-joint-offsets   Compute joint offsets for teleoperation
+  utils-fit-calibration Fit teleop calibration from recorded joint-space episodes
+  utils-teleop-latency  Measure leader-to-follower teleop latency
 
 Tool Commands:
   tools-check-dataset   Check local dataset integrity
   tools-check-info      Check local dataset information
   tools-check-rs        Retrieve connected RealSense camera serial numbers
   tools-prune-dataset   Prune episodes from dataset by Episode ID
+  tools-recover-episode Rebuild episodes left in the journal after a crash
           
 Shell Tools:
   map_gripper.sh        Map Gripper Serial Port
@@ -25,6 +28,11 @@ Shell Tools:
 
 Test Commands:
   test-gripper-ctrl     Run gripper control command (operate the gripper)
+  test-bench-force-control  Benchmark the force-mode wrench computation
+  test-bench-video-encoding  Benchmark episode video encoding (threads vs process pool)
+  test-bench-frame-journal  Benchmark the per-frame cost of the recording journal
+  test-bench-visualize-load  Benchmark loading episode scalars into rerun (columnar vs per frame)
+  test-bench-tracking-report  Check the replay tracking lag estimate against synthetic known lags
 
 --------------------------------------------------
  Tip: Use 'ur5e-help' anytime to see this summary.
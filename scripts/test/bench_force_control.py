@@ -0,0 +1,74 @@
+from pathlib import Path
+from types import SimpleNamespace
+import argparse
+import time
+
+import numpy as np
+import yaml
+
+from lerobot_robot_ur5e.force_control import ForceController
+
+
+def legacy_force(config, target_pos, curr_pos, curr_vel):
+    """The previous UR5e._calculate_force, kept here as the reference."""
+    import pinocchio as pin
+
+    diff_p = np.clip(np.array(target_pos[:3]) - np.array(curr_pos[:3]), -config.pos_delta, config.pos_delta)
+    diff_d = np.clip(-np.array(curr_vel[:3]), -config.vel_delta, config.vel_delta)
+    force_pos = config.kp * diff_p + config.kd * diff_d
+
+    R_target = pin.exp3(np.array(target_pos[3:]))
+    R_curr = pin.exp3(np.array(curr_pos[3:]))
+    rot_err = pin.log3(R_target @ R_curr.T)
+    torque = (config.kp_rot * rot_err - config.kd_rot * np.array(curr_vel[3:])) / config.rtde_freq
+
+    return np.concatenate((force_pos, torque))
+
+
+def make_samples(num: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    curr = rng.uniform(-1.0, 1.0, (num, 6))
+    target = curr + rng.normal(0.0, 0.05, (num, 6))
+    vel = rng.normal(0.0, 0.1, (num, 6))
+    return target.tolist(), curr.tolist(), vel.tolist()
+
+
+def time_per_call(fn, target, curr, vel) -> float:
+    t0 = time.perf_counter()
+    for t, c, v in zip(target, curr, vel):
+        fn(t, c, v)
+    return (time.perf_counter() - t0) / len(target) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the force-mode wrench computation")
+    parser.add_argument("--ticks", type=int, default=20000, help="Number of control ticks to time")
+    args = parser.parse_args()
+
+    cfg_path = Path(__file__).resolve().parent.parent / "config" / "cfg.yaml"
+    with open(cfg_path, "r") as f:
+        cfg = yaml.safe_load(f)
+    config = SimpleNamespace(**cfg["record"]["robot"]["force_mode"])
+    controller = ForceController(config)
+    target, curr, vel = make_samples(args.ticks)
+
+    new_us = time_per_call(controller.compute, target, curr, vel)
+    print(f"ForceController.compute: {new_us:.2f} us/tick")
+
+    try:
+        import pinocchio  # noqa: F401
+    except ImportError:
+        print("pinocchio not installed, skipping the legacy reference")
+        return
+
+    legacy_us = time_per_call(lambda t, c, v: legacy_force(config, t, c, v), target, curr, vel)
+    max_err = max(
+        float(np.max(np.abs(controller.compute(t, c, v) - legacy_force(config, t, c, v))))
+        for t, c, v in zip(target[:1000], curr[:1000], vel[:1000])
+    )
+    print(f"legacy pinocchio path:   {legacy_us:.2f} us/tick ({legacy_us / new_us:.1f}x)")
+    print(f"max wrench difference:   {max_err:.3e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+from pathlib import Path
+import argparse
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from scripts.utils.frame_journal import FrameJournal, read_journal
+
+# Roughly the recorded features: joints, tcp pose/force and gripper in the state, joints plus gripper in the action
+COLUMNS = [("observation.state", "float32", (26,)), ("action", "float32", (7,))]
+
+
+def run(directory: Path, num_frames: int, fps: int, sync_interval_s: float, realtime: bool) -> dict:
+    rng = np.random.default_rng(0)
+    state = rng.normal(size=(num_frames, 26)).astype(np.float32)
+    action = rng.normal(size=(num_frames, 7)).astype(np.float32)
+    journal = FrameJournal(directory, 0, fps, COLUMNS, sync_interval_s)
+    durations = np.empty(num_frames)
+    period = 1.0 / fps
+    start = time.perf_counter()
+    for i in range(num_frames):
+        t0 = time.perf_counter()
+        journal.append(i, i / fps, "bench task", {"observation.state": state[i], "action": action[i]})
+        durations[i] = time.perf_counter() - t0
+        if realtime:
+            sleep = start + (i + 1) * period - time.perf_counter()
+            if sleep > 0:
+                time.sleep(sleep)
+    journal.close()
+    _, records = read_journal(directory)
+    assert len(records) == num_frames and np.array_equal(records["action"], action)
+    return {
+        "mean_us": durations.mean() * 1e6,
+        "p99_us": np.percentile(durations, 99) * 1e6,
+        "max_us": durations.max() * 1e6,
+        "bytes_per_frame": (directory / "frames.bin").stat().st_size / num_frames,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the per-frame cost of the recording journal")
+    parser.add_argument("--frames", type=int, default=3000, help="Frames to append per run")
+    parser.add_argument("--fps", type=int, default=15)
+    parser.add_argument("--sync", type=float, nargs="+", default=[0.0, 0.1, 0.5, 1e9],
+                        help="fsync intervals in seconds to compare; 0 syncs every frame")
+    parser.add_argument("--dir", type=str, default=None, help="Directory on the disk datasets are written to")
+    parser.add_argument("--realtime", action="store_true", help="Append at fps instead of as fast as possible")
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="bench_journal_", dir=args.dir))
+    print(f"{args.frames} frames, {'real-time' if args.realtime else 'back to back'}, journal in {root}")
+    print(f"{'fsync every':>12}  {'mean':>9}  {'p99':>9}  {'max':>9}  bytes/frame")
+    try:
+        for interval in args.sync:
+            result = run(root / f"sync_{interval}", args.frames, args.fps, interval, args.realtime)
+            label = "frame" if interval == 0 else ("never" if interval >= 1e6 else f"{interval:g} s")
+            print(
+                f"{label:>12}  {result['mean_us']:>6.1f} us  {result['p99_us']:>6.1f} us  "
+                f"{result['max_us']:>6.0f} us  {result['bytes_per_frame']:.0f}"
+            )
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
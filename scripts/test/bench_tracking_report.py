@@ -0,0 +1,74 @@
+import argparse
+import time
+
+import numpy as np
+
+from scripts.utils.signal_utils import estimate_lag_xcorr
+from scripts.utils.tracking_report import JOINT_NAMES, compare_tracking
+
+SIGNALS = ("smooth", "random_walk")
+
+
+def make_recording(kind: str, num_frames: int, rng: np.random.Generator) -> np.ndarray:
+    """Six joint trajectories, either a sum of slow sines or a random walk."""
+    if kind == "smooth":
+        t = np.arange(num_frames)[:, None] / num_frames
+        freq = rng.uniform(1.0, 4.0, (3, 6))
+        phase = rng.uniform(0, 2 * np.pi, (3, 6))
+        return 0.5 * np.sin(2 * np.pi * freq[None, 0] * t + phase[None, 0]) + 0.2 * np.sin(
+            2 * np.pi * freq[None, 1] * 3 * t + phase[None, 1]
+        )
+    return np.cumsum(rng.normal(0, 0.01, (num_frames, 6)), axis=0)
+
+
+def replay(recorded: np.ndarray, lag: int, drop: float, rng: np.random.Generator) -> np.ndarray:
+    """The recording delayed by `lag` frames, with tracking noise and a fraction of skipped (NaN) frames."""
+    achieved = np.empty_like(recorded)
+    achieved[lag:] = recorded[: len(recorded) - lag]
+    achieved[:lag] = recorded[0]
+    achieved += rng.normal(0, 1e-4, achieved.shape)
+    achieved[rng.random(len(achieved)) < drop] = np.nan
+    return achieved
+
+
+def previous_lag(recorded: np.ndarray, achieved: np.ndarray, max_lag: int) -> float:
+    """The earlier estimate: raw positions, skipped frames dropped and the rest concatenated."""
+    valid = np.all(np.isfinite(achieved), axis=1)
+    lag, _ = estimate_lag_xcorr(recorded[valid], achieved[valid], max_lag)
+    return float(np.median(lag))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the replay tracking lag estimate against known lags")
+    parser.add_argument("--frames", type=int, default=3000, help="Frames per synthetic episode")
+    parser.add_argument("--lags", type=int, nargs="+", default=[0, 2, 3, 5], help="True lags to inject, in frames")
+    parser.add_argument("--drop", type=float, default=0.02, help="Fraction of replayed frames skipped")
+    parser.add_argument("--max-lag", type=int, default=10, help="Largest lag searched, in frames")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed error of the estimate, in frames")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{args.frames} frames, {args.drop:.0%} skipped, lags searched up to {args.max_lag}")
+    print(f"{'signal':>12}  {'true':>4}  {'estimate':>8}  {'previous':>8}  {'time':>8}")
+    failures = 0
+    for kind in SIGNALS:
+        for lag in args.lags:
+            recorded = make_recording(kind, args.frames, rng)
+            achieved = replay(recorded, lag, args.drop, rng)
+            t0 = time.perf_counter()
+            report = compare_tracking(recorded, achieved, JOINT_NAMES, 1 / 15, max_lag_frames=args.max_lag)
+            elapsed_ms = (time.perf_counter() - t0) * 1e3
+            estimate = float(np.median([report["channels"][name]["lag_frames"] for name in JOINT_NAMES]))
+            ok = abs(estimate - lag) <= args.tolerance
+            failures += not ok
+            print(
+                f"{kind:>12}  {lag:>4}  {estimate:>8.2f}  {previous_lag(recorded, achieved, args.max_lag):>8.2f}  "
+                f"{elapsed_ms:>5.1f} ms  {'ok' if ok else 'FAIL'}"
+            )
+    if failures:
+        raise SystemExit(f"{failures} lag estimate(s) outside ±{args.tolerance} frames")
+    print("All lag estimates within tolerance")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+from pathlib import Path
+import argparse
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from scripts.utils.video_encoder import EncoderPool, StreamEncoder, VideoSink, make_codec_options
+
+CAMERAS = ("wrist_image", "exterior_image")
+
+
+def make_frames(num: int, width: int, height: int, seed: int = 0) -> np.ndarray:
+    """A moving gradient with sensor-like noise, closer to camera footage than pure noise."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frames = np.empty((num, height, width, 3), dtype=np.uint8)
+    for i in range(num):
+        base = (x + y + 4 * i) % 256
+        noise = rng.normal(0.0, 6.0, (height, width))
+        for c in range(3):
+            frames[i, :, :, c] = np.clip(base * (0.6 + 0.2 * c) + noise, 0, 255)
+    return frames
+
+
+def feed(encoders, frames: np.ndarray, num_frames: int, fps: int, realtime: bool) -> None:
+    period = 1.0 / fps
+    start = time.perf_counter()
+    for i in range(num_frames):
+        image = frames[i % len(frames)]
+        for encoder in encoders:
+            encoder.put(i, image)
+        if realtime:
+            sleep = start + (i + 1) * period - time.perf_counter()
+            if sleep > 0:
+                time.sleep(sleep)
+
+
+def run_after_episode(out_dir: Path, frames, num_frames, fps, realtime, codec) -> dict:
+    """Encode each camera after the episode, one after the other, as lerobot does at save."""
+    t0 = time.perf_counter()
+    if realtime:
+        time.sleep(num_frames / fps)
+    t_end = time.perf_counter()
+    for cam in CAMERAS:
+        sink = VideoSink(out_dir / f"{cam}.mp4", fps, codec["vcodec"], codec["pix_fmt"],
+                         make_codec_options(codec["vcodec"], codec["g"], codec["crf"], codec["threads"]))
+        for i in range(num_frames):
+            sink.write(i, frames[i % len(frames)])
+        sink.close()
+    t_done = time.perf_counter()
+    return {"record_s": t_end - t0, "save_s": t_done - t_end}
+
+
+def run_streaming(out_dir: Path, frames, num_frames, fps, realtime, codec, pool=None) -> dict:
+    if pool is None:
+        encoders = [StreamEncoder(out_dir / f"{cam}.mp4", fps, max_queue=60, **codec) for cam in CAMERAS]
+    else:
+        encoders = [pool.open_stream(out_dir / f"{cam}.mp4", fps, **codec) for cam in CAMERAS]
+    t0 = time.perf_counter()
+    feed(encoders, frames, num_frames, fps, realtime)
+    t_end = time.perf_counter()
+    for encoder in encoders:
+        encoder.finish()
+    t_done = time.perf_counter()
+    return {"record_s": t_end - t0, "save_s": t_done - t_end}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark episode video encoding: after the episode, threads, process pool")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Episode length in seconds")
+    parser.add_argument("--fps", type=int, nargs="+", default=[15, 30], help="Frame rates to test")
+    parser.add_argument("--width", type=int, default=640)
+    parser.add_argument("--height", type=int, default=480)
+    parser.add_argument("--processes", type=int, default=2, help="Encoder pool size")
+    parser.add_argument("--threads", type=int, default=0, help="Threads per encoder, 0 lets the codec decide")
+    parser.add_argument("--vcodec", default="libsvtav1", help="libsvtav1, h264 or hevc")
+    parser.add_argument("--crf", type=int, default=30)
+    parser.add_argument("--no-realtime", action="store_true", help="Feed frames as fast as possible instead of at fps")
+    args = parser.parse_args()
+
+    realtime = not args.no_realtime
+    codec = {"vcodec": args.vcodec, "pix_fmt": "yuv420p", "g": 2, "crf": args.crf, "threads": args.threads}
+    frames = make_frames(60, args.width, args.height)
+    pool = EncoderPool(num_workers=args.processes, ring_slots=60)
+    root = Path(tempfile.mkdtemp(prefix="bench_video_"))
+
+    print(f"{len(CAMERAS)} cameras, {args.width}x{args.height}, {args.seconds:.0f} s episodes, "
+          f"{args.vcodec} crf {args.crf}, {'real-time' if realtime else 'as fast as possible'} feed")
+    print(f"{'fps':>4}  {'mode':<16}  {'record':>8}  {'save':>8}  {'total':>8}")
+    try:
+        for fps in args.fps:
+            num_frames = int(args.seconds * fps)
+            modes = [
+                ("after episode", lambda d: run_after_episode(d, frames, num_frames, fps, realtime, codec)),
+                ("thread stream", lambda d: run_streaming(d, frames, num_frames, fps, realtime, codec)),
+                (f"process pool x{args.processes}", lambda d: run_streaming(d, frames, num_frames, fps, realtime, codec, pool)),
+            ]
+            for name, fn in modes:
+                out_dir = root / f"{fps}_{name.replace(' ', '_')}"
+                result = fn(out_dir)
+                total = result["record_s"] + result["save_s"]
+                print(f"{fps:>4}  {name:<16}  {result['record_s']:>6.2f} s  {result['save_s']:>6.2f} s  {total:>6.2f} s")
+                shutil.rmtree(out_dir, ignore_errors=True)
+    finally:
+        pool.close()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
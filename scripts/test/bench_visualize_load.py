@@ -0,0 +1,105 @@
+from pathlib import Path
+import argparse
+import json
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import rerun as rr
+
+from scripts.utils.episode_arrays import read_episode_columns
+from scripts.utils.rerun_columns import log_episode_scalars
+
+DATA_PATH = "data/chunk-{chunk_index:03d}/file-{file_index:03d}.parquet"
+
+
+def write_episode(root: Path, num_frames: int, fps: int, state_dim: int, action_dim: int) -> dict:
+    """A single-episode dataset in the v3 parquet layout, with only the scalar columns."""
+    rng = np.random.default_rng(0)
+    names = {
+        "observation.state": [f"state_{i}" for i in range(state_dim)],
+        "action": [f"action_{i}" for i in range(action_dim)],
+    }
+    info = {
+        "fps": fps,
+        "data_path": DATA_PATH,
+        "features": {key: {"dtype": "float32", "shape": [len(n)], "names": n} for key, n in names.items()},
+    }
+    (root / "meta" / "episodes" / "chunk-000").mkdir(parents=True)
+    (root / "data" / "chunk-000").mkdir(parents=True)
+    with open(root / "meta" / "info.json", "w") as f:
+        json.dump(info, f)
+
+    columns = {
+        "episode_index": pa.array(np.zeros(num_frames, dtype=np.int64)),
+        "frame_index": pa.array(np.arange(num_frames, dtype=np.int64)),
+        "timestamp": pa.array(np.arange(num_frames, dtype=np.float32) / fps),
+    }
+    for key, key_names in names.items():
+        values = np.cumsum(rng.normal(0, 0.01, (num_frames, len(key_names))), axis=0).astype(np.float32)
+        columns[key] = pa.FixedSizeListArray.from_arrays(pa.array(values.ravel()), len(key_names))
+    pq.write_table(pa.table(columns), root / DATA_PATH.format(chunk_index=0, file_index=0))
+    pq.write_table(
+        pa.table({"episode_index": [0], "data/chunk_index": [0], "data/file_index": [0], "length": [num_frames]}),
+        root / "meta" / "episodes" / "chunk-000" / "file-000.parquet",
+    )
+    return names
+
+
+def log_per_frame(arrays: dict, names: dict, num_frames: int) -> None:
+    """The previous layout: set the timelines and log one scalar per dimension, frame by frame."""
+    for i in range(num_frames):
+        rr.set_time("frame_index", sequence=int(arrays["frame_index"][i]))
+        rr.set_time("timestamp", timestamp=float(arrays["timestamp"][i]))
+        for key, key_names in names.items():
+            for dim, value in enumerate(arrays[key][i]):
+                rr.log(f"{key}/{key_names[dim]}", rr.Scalars(value.item()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark loading an episode's scalar series into rerun")
+    parser.add_argument("--frames", type=int, nargs="+", default=[9000, 27000, 90000], help="Episode lengths to compare")
+    parser.add_argument("--fps", type=int, default=15)
+    parser.add_argument("--state-dim", type=int, default=40)
+    parser.add_argument("--action-dim", type=int, default=7)
+    parser.add_argument("--per-frame-limit", type=int, default=3000,
+                        help="Frames logged one by one for the old path; longer episodes are extrapolated")
+    args = parser.parse_args()
+
+    rr.init("bench_visualize_load", spawn=False)
+    memory = rr.memory_recording()  # keep logged data in memory, no viewer
+    tmp = Path(tempfile.mkdtemp(prefix="bench_visualize_"))
+    print(f"state {args.state_dim} + action {args.action_dim} dims, {args.fps} fps")
+    print(f"{'frames':>8}  {'read':>9}  {'columnar':>10}  {'per frame':>11}  speed-up")
+    try:
+        for num_frames in args.frames:
+            root = tmp / f"episode_{num_frames}"
+            names = write_episode(root, num_frames, args.fps, args.state_dim, args.action_dim)
+
+            t0 = time.perf_counter()
+            arrays = read_episode_columns(root, 0, [*names, "timestamp"])
+            read_s = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            log_episode_scalars(arrays, names)
+            columnar_s = time.perf_counter() - t0
+
+            sampled = min(num_frames, args.per_frame_limit)
+            t0 = time.perf_counter()
+            log_per_frame(arrays, names, sampled)
+            per_frame_s = (time.perf_counter() - t0) * num_frames / sampled
+            estimate = "~" if sampled < num_frames else " "
+
+            print(
+                f"{num_frames:>8}  {read_s * 1e3:>6.1f} ms  {columnar_s * 1e3:>7.1f} ms  "
+                f"{estimate}{per_frame_s:>8.2f} s  {per_frame_s / columnar_s:>6.0f}x"
+            )
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+import argparse
+import logging
+import shutil
+
+import av
+import numpy as np
+import yaml
+from PIL import Image
+
+from lerobot.datasets.lerobot_dataset import LeRobotDataset
+from lerobot.utils.constants import HF_LEROBOT_HOME
+
+from scripts.utils.frame_journal import list_journals, read_journal
+
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+
+def iter_video_frames(path: Path) -> Iterator[np.ndarray]:
+    """Decode a (possibly unfinished) fragmented mp4 up to its last complete fragment."""
+    try:
+        with av.open(str(path)) as container:
+            for frame in container.decode(video=0):
+                yield frame.to_ndarray(format="rgb24")
+    except av.error.FFmpegError as e:
+        logger.info(f"====== [WARNING] {path.name} ends early: {e} ======")
+
+
+def iter_image_frames(directory: Path) -> Iterator[np.ndarray]:
+    frame_index = 0
+    while True:
+        path = directory / f"frame-{frame_index:06d}.png"
+        if not path.exists():
+            return
+        with Image.open(path) as image:
+            yield np.asarray(image.convert("RGB"))
+        frame_index += 1
+
+
+def open_camera_frames(media: Dict[str, Any], image_dir: Path, staging: Path, key: str) -> Iterator[np.ndarray]:
+    """image_dir is where add_frame() writes this camera's PNGs if the episode keeps its old index."""
+    path = Path(media["path"])
+    if media["kind"] == "video":
+        # Only stats PNGs were written while streaming; they must not mix with the rebuilt episode
+        shutil.rmtree(image_dir, ignore_errors=True)
+        return iter_video_frames(path)
+    # Move the recorded PNGs out of the way of add_frame()
+    staged = staging / key
+    if path.is_dir() and not staged.exists():
+        shutil.move(str(path), str(staged))
+    return iter_image_frames(staged)
+
+
+def recover_journal(dataset: LeRobotDataset, journal: Path) -> int:
+    """Add the frames of one journal to the dataset as a new episode; returns the frame count."""
+    meta, records = read_journal(journal)
+    missing = [key for key in dataset.meta.camera_keys if key not in meta["media"]]
+    if missing:
+        raise ValueError(f"Journal {journal.name} has no frames for cameras {missing}")
+
+    staging = journal / "media"
+    staging.mkdir(exist_ok=True)
+    old_index = meta["episode_index"]
+    cameras = {
+        key: open_camera_frames(meta["media"][key], dataset._get_image_file_dir(old_index, key), staging, key)
+        for key in dataset.meta.camera_keys
+    }
+    columns = [key for key, _, _ in meta["columns"]]
+    tasks: List[str] = meta["tasks"]
+
+    num_frames = 0
+    for record in records:
+        images = {}
+        for key, frames in cameras.items():
+            image = next(frames, None)
+            if image is None:
+                break
+            images[key] = image
+        if len(images) < len(cameras):
+            break  # a camera ran out; keep only frames every stream has
+        frame = {key: record[key] for key in columns}
+        frame.update(images)
+        frame["task"] = tasks[int(record["task_index"])]
+        dataset.add_frame(frame)
+        num_frames += 1
+
+    if num_frames == 0:
+        dataset.clear_episode_buffer()
+        return 0
+    dataset.save_episode()
+    return num_frames
+
+
+def cleanup_journal(journal: Path) -> None:
+    meta, _ = read_journal(journal)
+    for media in meta["media"].values():
+        if media["kind"] == "video":
+            shutil.rmtree(Path(media["path"]).parent, ignore_errors=True)
+    shutil.rmtree(journal, ignore_errors=True)
+
+
+def recover_episodes(repo_id: str) -> None:
+    dataset_root = Path(HF_LEROBOT_HOME) / repo_id
+    journals = sorted(list_journals(dataset_root), key=lambda path: read_journal(path)[0]["created"])
+    if not journals:
+        logger.info(f"====== [RECOVER] No journals found in {dataset_root} ======")
+        return
+
+    dataset = LeRobotDataset(repo_id)
+    dataset.start_image_writer(num_threads=4)
+    try:
+        for journal in journals:
+            new_index = dataset.meta.total_episodes
+            logger.info(f"====== [RECOVER] Rebuilding {journal.name} as episode {new_index} ======")
+            num_frames = recover_journal(dataset, journal)
+            if num_frames == 0:
+                logger.info(f"====== [WARNING] {journal.name} has no complete frames, kept for inspection ======")
+                continue
+            cleanup_journal(journal)
+            logger.info(f"====== [RECOVER] Episode {new_index} saved with {num_frames} frames ======")
+    finally:
+        dataset.finalize()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild episodes left in a dataset's journal after a crash")
+    parser.add_argument("--dataset", type=str, default=None, help="Dataset repo id, defaults to recover_episode.dataset_name")
+    args = parser.parse_args()
+
+    parent_path = Path(__file__).resolve().parent
+    cfg_path = parent_path.parent / "config" / "cfg.yaml"
+    with open(cfg_path, "r") as f:
+        cfg = yaml.safe_load(f)
+
+    repo_id = args.dataset or cfg["recover_episode"]["dataset_name"]
+    if repo_id is None:
+        print("Error: dataset name is not defined in the config. Aborting.")
+        return
+    recover_episodes(repo_id)
+
+
+if __name__ == "__main__":
+    main()
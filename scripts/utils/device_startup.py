@@ -0,0 +1,211 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# ------------------------ Logging Setup ------------------------ #
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+
+# ------------------------ Device Task ------------------------ #
+class DeviceTask:
+    """One connection step, run in its own thread once its dependencies are up."""
+
+    def __init__(
+        self,
+        name: str,
+        connect_fn: Callable[[], Any],
+        timeout_s: float,
+        deps: Sequence[str] = (),
+        close_fn: Optional[Callable[[], None]] = None,
+    ):
+        self.name = name
+        self.connect_fn = connect_fn
+        self.timeout_s = float(timeout_s)
+        self.deps = tuple(deps)
+        self.close_fn = close_fn
+        self.status = "pending"  # pending, running, ok, failed, timeout, skipped
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.done = threading.Event()
+
+
+# ------------------------ Orchestrator ------------------------ #
+class DeviceStartup:
+    """Bring devices up concurrently with per-device timeouts.
+
+    Tasks start as soon as their dependencies have connected. A task that
+    fails or overruns its timeout cancels every task still waiting, and all
+    devices that did connect are closed again before the error is raised.
+    Threads are daemons, so a driver stuck in a blocking call cannot keep
+    the process alive.
+    """
+
+    def __init__(self, poll_interval_s: float = 0.02):
+        self._tasks: Dict[str, DeviceTask] = {}
+        self._lock = threading.Lock()
+        self._abort = threading.Event()
+        self._poll_interval_s = poll_interval_s
+        self._t0: Optional[float] = None
+        self._handed_over = False
+        self._closed = False
+
+    def add(
+        self,
+        name: str,
+        connect_fn: Callable[[], Any],
+        timeout_s: float,
+        deps: Sequence[str] = (),
+        close_fn: Optional[Callable[[], None]] = None,
+    ) -> None:
+        if self._t0 is not None:
+            raise RuntimeError("Cannot add devices after startup has begun.")
+        if name in self._tasks:
+            raise ValueError(f"Duplicate startup task '{name}'.")
+        for dep in deps:
+            if dep not in self._tasks:
+                raise ValueError(f"Startup task '{name}' depends on unknown task '{dep}'.")
+        self._tasks[name] = DeviceTask(name, connect_fn, timeout_s, deps, close_fn)
+
+    def start(self) -> None:
+        """Launch all tasks without waiting for them."""
+        self._t0 = time.perf_counter()
+        for task in self._tasks.values():
+            threading.Thread(target=self._run_task, args=(task,), name=f"startup-{task.name}", daemon=True).start()
+
+    def wait(self) -> Dict[str, Any]:
+        """Block until every device is up; return the per-task results.
+
+        Raises RuntimeError after closing the connected devices if any task failed.
+        """
+        if self._t0 is None:
+            self.start()
+        self._wait_all()
+        self.log_report()
+
+        failed = [task for task in self._tasks.values() if task.status != "ok"]
+        if failed:
+            self.close()
+            details = "; ".join(f"{task.name}: {task.status} ({task.error})" for task in failed)
+            raise RuntimeError(f"Device startup failed: {details}")
+
+        # From here on the devices belong to their owners' regular disconnect().
+        self._handed_over = True
+        return {name: task.result for name, task in self._tasks.items()}
+
+    def run(self) -> Dict[str, Any]:
+        self.start()
+        return self.wait()
+
+    def close(self) -> None:
+        """Close every device this startup connected, unless startup already succeeded."""
+        if self._handed_over or self._closed or self._t0 is None:
+            return
+        self._abort.set()
+        self._wait_all()
+        self._closed = True
+        for task in reversed(list(self._tasks.values())):
+            if task.status == "ok" and task.close_fn is not None:
+                self._safe_close(task)
+
+    # ------------------------ Internals ------------------------ #
+    def _run_task(self, task: DeviceTask) -> None:
+        for dep_name in task.deps:
+            dep = self._tasks[dep_name]
+            while not dep.done.wait(self._poll_interval_s):
+                if self._abort.is_set():
+                    self._finish(task, "skipped", RuntimeError("startup aborted"))
+                    return
+            if dep.status != "ok":
+                self._finish(task, "skipped", RuntimeError(f"dependency '{dep_name}' {dep.status}"))
+                return
+        if self._abort.is_set():
+            self._finish(task, "skipped", RuntimeError("startup aborted"))
+            return
+
+        with self._lock:
+            task.started_at = time.perf_counter()
+            task.status = "running"
+        try:
+            result = task.connect_fn()
+        except Exception as e:
+            self._finish(task, "failed", e)
+            self._abort.set()
+            return
+
+        with self._lock:
+            late = task.done.is_set()  # already marked as timed out
+            if not late:
+                task.result = result
+                task.status = "ok"
+                task.finished_at = time.perf_counter()
+                task.done.set()
+        if late:
+            # The caller has given up on this device; release it instead of leaking it.
+            logger.info(f"[STARTUP] {task.name} connected after its timeout, closing it.")
+            if task.close_fn is not None:
+                self._safe_close(task)
+
+    def _finish(self, task: DeviceTask, status: str, error: Optional[BaseException]) -> None:
+        with self._lock:
+            if task.done.is_set():
+                return
+            task.status = status
+            task.error = error
+            task.finished_at = time.perf_counter()
+            task.done.set()
+
+    def _wait_all(self) -> None:
+        while True:
+            now = time.perf_counter()
+            pending = False
+            with self._lock:
+                for task in self._tasks.values():
+                    if task.done.is_set():
+                        continue
+                    if task.status == "running" and now - task.started_at > task.timeout_s:
+                        task.status = "timeout"
+                        task.error = TimeoutError(f"no response within {task.timeout_s:.1f} s")
+                        task.finished_at = now
+                        task.done.set()
+                        self._abort.set()
+                        continue
+                    pending = True
+            if not pending:
+                return
+            time.sleep(self._poll_interval_s)
+
+    def _safe_close(self, task: DeviceTask) -> None:
+        try:
+            task.close_fn()
+        except Exception as e:
+            logger.info(f"[STARTUP] Failed to close {task.name}: {e}")
+
+    # ------------------------ Report ------------------------ #
+    def timings(self) -> List[Dict[str, Any]]:
+        rows = []
+        for task in self._tasks.values():
+            start = task.started_at - self._t0 if task.started_at is not None else None
+            duration = (
+                task.finished_at - task.started_at
+                if task.started_at is not None and task.finished_at is not None
+                else None
+            )
+            rows.append({"name": task.name, "start_s": start, "duration_s": duration, "status": task.status})
+        return rows
+
+    def log_report(self) -> None:
+        rows = self.timings()
+        finished = [task.finished_at for task in self._tasks.values() if task.finished_at is not None]
+        wall = (max(finished) - self._t0) if finished else 0.0
+        serial = sum(row["duration_s"] or 0.0 for row in rows)
+        width = max((len(row["name"]) for row in rows), default=0)
+
+        logger.info(f"\n====== [STARTUP] Device startup took {wall:.2f} s (sequential sum {serial:.2f} s) ======")
+        for row in rows:
+            start = f"{row['start_s']:6.2f} s" if row["start_s"] is not None else f"{'-':>6}  "
+            duration = f"{row['duration_s']:6.2f} s" if row["duration_s"] is not None else f"{'-':>6}  "
+            logger.info(f"  {row['name']:<{width}}  start {start}  took {duration}  {row['status']}")
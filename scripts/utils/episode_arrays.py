@@ -0,0 +1,167 @@
+import json
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from lerobot.utils.constants import HF_LEROBOT_HOME
+
+
+# ------------------------ Metadata ------------------------ #
+def resolve_dataset_root(dataset_name: str, root: Path | str | None = None) -> Path:
+    """Return the local folder of a dataset, defaulting to the lerobot cache."""
+    return Path(root) if root is not None else Path(HF_LEROBOT_HOME) / dataset_name
+
+
+def ensure_local_dataset(
+    dataset_name: str, root: Path | str | None = None, episodes: Optional[List[int]] = None
+) -> Path:
+    """The dataset folder on disk, fetched through lerobot only when it is not there yet."""
+    dataset_root = resolve_dataset_root(dataset_name, root)
+    if not (dataset_root / "meta" / "info.json").exists():
+        from lerobot.datasets.lerobot_dataset import LeRobotDataset
+
+        LeRobotDataset(dataset_name, episodes=episodes, root=root)  # fetch the dataset from the hub
+    return dataset_root
+
+
+def load_dataset_info(root: Path) -> dict:
+    with open(Path(root) / "meta" / "info.json", "r") as f:
+        return json.load(f)
+
+
+def get_feature_names(features: dict, key: str) -> list[str]:
+    names = features[key]["names"]
+    if isinstance(names, dict):
+        if all(isinstance(name, int) for name in names):
+            return [names[index] for index in sorted(names)]
+        return [name for name, _ in sorted(names.items(), key=lambda item: item[1])]
+    return list(names)
+
+
+def parse_episode_spec(spec: Any) -> Optional[List[int]]:
+    """Turn 3, "3", "0-5" (inclusive), "all" or a list of these into episode indices; "all" gives None."""
+    if spec is None or spec == "all":
+        return None
+    if isinstance(spec, (list, tuple)):
+        indices = []
+        for item in spec:
+            parsed = parse_episode_spec(item)
+            if parsed is None:
+                raise ValueError(f"'all' cannot be combined with other episodes in {spec!r}")
+            indices.extend(parsed)
+        return indices
+    if isinstance(spec, str) and "-" in spec.strip()[1:]:
+        first, last = spec.split("-", 1)
+        first, last = int(first), int(last)
+        if last < first:
+            raise ValueError(f"Episode range {spec!r} ends before it starts")
+        return list(range(first, last + 1))
+    return [int(spec)]
+
+
+def load_episodes_table(root: Path) -> Dict[str, np.ndarray]:
+    """Read meta/episodes into column arrays indexed by episode_index."""
+    files = sorted((Path(root) / "meta" / "episodes").glob("chunk-*/file-*.parquet"))
+    if not files:
+        raise FileNotFoundError(f"No episode metadata found under {root}/meta/episodes")
+    table = pa.concat_tables([pq.read_table(path) for path in files])
+    table = table.select([name for name in table.column_names if not name.startswith("stats/")])
+    columns = {name: table.column(name).to_numpy(zero_copy_only=False) for name in table.column_names}
+    order = np.argsort(columns["episode_index"])
+    return {name: values[order] for name, values in columns.items()}
+
+
+# ------------------------ Column Reading ------------------------ #
+def column_to_numpy(column: pa.ChunkedArray) -> np.ndarray:
+    """Convert an arrow column to numpy, stacking list columns into (N, D)."""
+    array = column.combine_chunks() if isinstance(column, pa.ChunkedArray) else column
+    if pa.types.is_list(array.type) or pa.types.is_fixed_size_list(array.type) or pa.types.is_large_list(array.type):
+        num_rows = len(array)
+        values = array.flatten().to_numpy(zero_copy_only=False)
+        return values.reshape(num_rows, -1) if num_rows else values.reshape(0, 0)
+    return array.to_numpy(zero_copy_only=False)
+
+
+def episode_data_files(root: Path, info: dict, episodes: Dict[str, np.ndarray], episode_index: int) -> List[Path]:
+    row = int(np.searchsorted(episodes["episode_index"], episode_index))
+    if row >= len(episodes["episode_index"]) or episodes["episode_index"][row] != episode_index:
+        raise IndexError(f"Episode {episode_index} not found in {root}")
+    data_path = info["data_path"].format(
+        chunk_index=int(episodes["data/chunk_index"][row]),
+        file_index=int(episodes["data/file_index"][row]),
+    )
+    return [Path(root) / data_path]
+
+
+def read_episode_columns(
+    root: Path,
+    episode_index: int,
+    columns: Sequence[str],
+    info: dict | None = None,
+    episodes: Dict[str, np.ndarray] | None = None,
+) -> Dict[str, np.ndarray]:
+    """Read selected columns of one episode from its data parquet as numpy arrays.
+
+    No torch or video decoding is involved; list features such as `action`
+    come back as contiguous (num_frames, dim) arrays ordered by frame_index.
+    """
+    root = Path(root)
+    info = info if info is not None else load_dataset_info(root)
+    episodes = episodes if episodes is not None else load_episodes_table(root)
+    wanted = list(dict.fromkeys([*columns, "frame_index"]))
+
+    tables = [
+        pq.read_table(path, columns=wanted, filters=[("episode_index", "=", int(episode_index))])
+        for path in episode_data_files(root, info, episodes, episode_index)
+    ]
+    table = pa.concat_tables(tables)
+    frame_index = column_to_numpy(table.column("frame_index"))
+    order = np.argsort(frame_index, kind="stable")
+
+    arrays = {}
+    for name in wanted:
+        values = column_to_numpy(table.column(name))
+        arrays[name] = np.ascontiguousarray(values[order])
+    return arrays
+
+
+# ------------------------ Action Frames ------------------------ #
+class ActionFrameView(Mapping):
+    """Read-only dict view of one row of an action array, keyed by feature name.
+
+    Lets code written against per-frame action dicts (robot.send_action) read
+    straight from a preloaded (num_frames, dim) array without building a dict.
+    """
+
+    __slots__ = ("_index", "_row")
+
+    def __init__(self, index: Dict[str, int], row: np.ndarray):
+        self._index = index
+        self._row = row
+
+    def __getitem__(self, key: str):
+        return self._row[self._index[key]]
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return f"ActionFrameView({dict(self.items())})"
+
+
+def action_frames(actions: np.ndarray, names: Sequence[str]) -> List[ActionFrameView]:
+    """One ActionFrameView per row, sharing a single name-to-column layout."""
+    if actions.shape[1] != len(names):
+        raise ValueError(f"Action array has {actions.shape[1]} columns but {len(names)} names")
+    index = {name: i for i, name in enumerate(names)}
+    return [ActionFrameView(index, row) for row in actions]
@@ -0,0 +1,124 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scripts.utils.episode_arrays import load_episodes_table, read_episode_columns
+
+ALIGN_MODES = ("normalized", "dtw")
+
+
+# ------------------------ Loading ------------------------ #
+def load_episode_arrays(
+    root: Path,
+    episode_indices: Sequence[int],
+    columns: Sequence[str],
+    info: dict,
+    max_workers: int = 8,
+) -> List[Dict[str, np.ndarray]]:
+    """Read the same columns of several episodes in parallel, in the order given.
+
+    The parquet reads release the GIL, so a thread per episode overlaps the
+    file I/O and decoding; the episodes table is read once and shared.
+    """
+    episodes = load_episodes_table(root)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(episode_indices)))) as pool:
+        return list(pool.map(
+            lambda episode_index: read_episode_columns(root, episode_index, columns, info=info, episodes=episodes),
+            episode_indices,
+        ))
+
+
+# ------------------------ Alignment ------------------------ #
+def resample_normalized(values: np.ndarray, num_points: int) -> np.ndarray:
+    """Linearly resample a (T, D) array onto `num_points` evenly spaced points of normalized time [0, 1]."""
+    values = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+    if len(values) == 1:
+        return np.repeat(values, num_points, axis=0)
+    position = np.linspace(0.0, len(values) - 1, num_points)
+    lo = np.minimum(position.astype(np.int64), len(values) - 2)
+    weight = (position - lo)[:, None]
+    return values[lo] * (1.0 - weight) + values[lo + 1] * weight
+
+
+def dtw_path(reference: np.ndarray, query: np.ndarray, window: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Dynamic time warping between two (T, F) feature arrays; returns matched (reference, query) indices.
+
+    The cumulative cost is filled one anti-diagonal at a time, since every
+    cell on a diagonal only depends on the two before it. `window` is a
+    Sakoe-Chiba band as a fraction of the length: matches further apart in
+    normalized time than that are not allowed.
+    """
+    n, m = len(reference), len(query)
+    cost = np.sqrt(((reference[:, None, :] - query[None, :, :]) ** 2).sum(axis=-1))
+    if window is not None:
+        i, j = np.indices((n, m))
+        band = max(window, 1.0 / min(n, m))
+        cost[np.abs(i / max(n - 1, 1) - j / max(m - 1, 1)) > band] = np.inf
+
+    acc = np.full((n + 1, m + 1), np.inf)
+    acc[0, 0] = 0.0
+    for k in range(2, n + m + 1):
+        i = np.arange(max(1, k - m), min(n, k - 1) + 1)
+        j = k - i
+        acc[i, j] = cost[i - 1, j - 1] + np.minimum(np.minimum(acc[i - 1, j - 1], acc[i - 1, j]), acc[i, j - 1])
+
+    path_i, path_j = [n - 1], [m - 1]
+    i, j = n, m
+    while i > 1 or j > 1:
+        step = np.argmin((acc[i - 1, j - 1], acc[i - 1, j], acc[i, j - 1]))
+        i, j = (i - 1, j - 1) if step == 0 else (i - 1, j) if step == 1 else (i, j - 1)
+        path_i.append(i - 1)
+        path_j.append(j - 1)
+    return np.array(path_i[::-1]), np.array(path_j[::-1])
+
+
+def warp_to_reference(values: np.ndarray, path_ref: np.ndarray, path_query: np.ndarray, num_points: int) -> np.ndarray:
+    """Put a (T, D) query on the reference's grid, averaging the query samples matched to each reference point."""
+    sums = np.zeros((num_points, values.shape[1]))
+    np.add.at(sums, path_ref, values[path_query])
+    return sums / np.bincount(path_ref, minlength=num_points)[:, None]
+
+
+def align_episodes(
+    episodes: List[Dict[str, np.ndarray]],
+    keys: Sequence[str],
+    mode: str = "normalized",
+    num_points: int = 200,
+    align_key: Optional[str] = None,
+    dtw_window: Optional[float] = 0.2,
+) -> Tuple[Dict[str, np.ndarray], Optional[int]]:
+    """Bring every episode's `keys` onto a common grid of `num_points` samples.
+
+    Returns {key: (num_episodes, num_points, D)} and, for "dtw", the position
+    of the reference episode. Episodes are first resampled on normalized
+    time; with "dtw" each one is then warped onto the episode closest to
+    the mean, matching on the z-scored `align_key` columns (pooled over all
+    episodes so no feature dominates by its units).
+    """
+    if mode not in ALIGN_MODES:
+        raise ValueError(f"Unknown alignment {mode!r}, expected one of {ALIGN_MODES}")
+    aligned = {key: np.stack([resample_normalized(ep[key], num_points) for ep in episodes]) for key in keys}
+    if mode == "normalized" or len(episodes) < 2:
+        return aligned, None
+
+    align_key = align_key or keys[0]
+    signal = aligned[align_key]
+    mean = signal.mean(axis=(0, 1))
+    std = signal.std(axis=(0, 1))
+    signal = (signal - mean) / np.where(std > 0, std, 1.0)
+    reference = int(np.argmin(((signal - signal.mean(axis=0)) ** 2).sum(axis=(1, 2))))
+
+    for n in range(len(episodes)):
+        if n == reference:
+            continue
+        path_ref, path_query = dtw_path(signal[reference], signal[n], dtw_window)
+        for key in keys:
+            aligned[key][n] = warp_to_reference(aligned[key][n], path_ref, path_query, num_points)
+    return aligned, reference
+
+
+def band_stats(aligned: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-feature mean and standard deviation across episodes of a (N, num_points, D) array."""
+    return aligned.mean(axis=0), aligned.std(axis=0)
@@ -0,0 +1,122 @@
+import logging
+import queue
+import threading
+import time
+from typing import List, Optional
+
+from lerobot.datasets.lerobot_dataset import LeRobotDataset
+
+# ------------------------ Logging Setup ------------------------ #
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class AsyncEpisodeSaver:
+    """Saves finished episodes in a background thread while recording goes on.
+
+    submit() detaches the current episode buffer and gives the dataset a new
+    one for the next episode index, so the reset phase and the next episode
+    can start right away while videos are encoded and stats are computed.
+
+    Episodes are saved one at a time in submission order, which keeps episode
+    indices consistent with the dataset metadata. At most `max_pending`
+    episodes may wait; submit() blocks beyond that. A failed save is raised at
+    the next submit()/check() and at close(); episodes queued behind it are not
+    saved, because their indices would no longer line up.
+    """
+
+    def __init__(self, dataset: LeRobotDataset, max_pending: int = 2):
+        self.dataset = dataset
+        self._slots = threading.Semaphore(max_pending)
+        self._queue: queue.Queue = queue.Queue()
+        self._error: Optional[BaseException] = None
+        self._failed_index: Optional[int] = None
+        self._skipped: List[int] = []
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="episode-saver", daemon=True)
+        self._thread.start()
+
+    # ------------------------ Recording Side ------------------------ #
+    def submit(self) -> int:
+        """Queue the current episode buffer for saving; returns its episode index."""
+        self.check()
+        buffer = self.dataset.episode_buffer
+        episode_index = int(buffer["episode_index"])
+
+        # The episode's images must be on disk before the buffer changes hands.
+        if self.dataset.image_writer is not None:
+            self.dataset.image_writer.wait_until_done()
+
+        if not self._slots.acquire(blocking=False):
+            logger.info("====== [SAVE] Waiting for a previous episode to finish saving ======")
+            start = time.perf_counter()
+            self._slots.acquire()
+            logger.info(f"====== [SAVE] Waited {time.perf_counter() - start:.1f} s ======")
+
+        self.dataset.episode_buffer = self.dataset.create_episode_buffer(episode_index=episode_index + 1)
+        self._queue.put((episode_index, buffer))
+        logger.info(f"====== [SAVE] Episode {episode_index} queued for saving ({self.pending} pending) ======")
+        return episode_index
+
+    def discard_current(self) -> None:
+        """Drop the episode being recorded, keeping the index it was recorded under."""
+        episode_index = int(self.dataset.episode_buffer["episode_index"])
+        self.dataset.clear_episode_buffer()
+        # clear_episode_buffer() numbers the new buffer from saved episodes only,
+        # which is too low while saves are pending.
+        self.dataset.episode_buffer = self.dataset.create_episode_buffer(episode_index=episode_index)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def check(self) -> None:
+        """Raise the error of a failed background save, if any."""
+        if self._error is not None:
+            skipped = f"; episodes {self._skipped} were not saved" if self._skipped else ""
+            raise RuntimeError(
+                f"Saving episode {self._failed_index} failed: {self._error}{skipped}"
+            ) from self._error
+
+    def wait(self) -> None:
+        """Block until every submitted episode has been saved."""
+        self._queue.join()
+        self.check()
+
+    def close(self, raise_errors: bool = True) -> None:
+        """Wait for pending saves and stop the worker; must run before dataset.finalize()."""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._thread.join()
+        if raise_errors:
+            self.check()
+        elif self._error is not None:
+            logger.info(f"====== [WARNING] Saving episode {self._failed_index} failed: {self._error} ======")
+
+    # ------------------------ Worker Side ------------------------ #
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                episode_index, buffer = item
+                if self._error is not None:
+                    self._skipped.append(episode_index)
+                    continue
+                start = time.perf_counter()
+                try:
+                    self.dataset.save_episode(episode_data=buffer)
+                except Exception as e:
+                    self._error = e
+                    self._failed_index = episode_index
+                    logger.info(f"====== [ERROR] Saving episode {episode_index} failed: {e} ======")
+                    continue
+                logger.info(f"====== [SAVE] Episode {episode_index} saved in {time.perf_counter() - start:.1f} s ======")
+            finally:
+                if item is not _STOP:
+                    self._slots.release()
+                self._queue.task_done()
@@ -0,0 +1,251 @@
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from lerobot.datasets import lerobot_dataset
+from lerobot.datasets.compute_stats import DEFAULT_QUANTILES, auto_downsample_height_width
+from lerobot.datasets.utils import DEFAULT_FEATURES
+
+NUM_BINS = 5000
+CHUNK_ROWS = 32  # rows buffered before they are added to the histograms
+RANGE_MARGIN = 0.25  # histogram range grows by this fraction of the span, so rebinning stays rare
+
+
+# ------------------------ Running Stats ------------------------ #
+class RunningStats:
+    """Streaming per-dimension stats of a sequence of vectors.
+
+    Mean and variance use Welford's update (Chan's form for batches), min and
+    max are exact, and quantiles come from a fixed-size histogram per
+    dimension, interpolated within the bin like lerobot's RunningQuantileStats.
+    Rows reach the histograms in chunks of CHUNK_ROWS.
+    """
+
+    def __init__(self, quantiles: Optional[List[float]] = None, num_bins: int = NUM_BINS):
+        self.quantiles = list(DEFAULT_QUANTILES if quantiles is None else quantiles)
+        self.num_bins = num_bins
+        self.count = 0
+        self._mean: Optional[np.ndarray] = None
+        self._m2: Optional[np.ndarray] = None
+        self._min: Optional[np.ndarray] = None
+        self._max: Optional[np.ndarray] = None
+        self._hist: Optional[np.ndarray] = None
+        self._lo: Optional[np.ndarray] = None
+        self._hi: Optional[np.ndarray] = None
+        self._pending: List[np.ndarray] = []
+        self._pending_rows = 0
+
+    def update(self, batch: np.ndarray) -> None:
+        """Add rows of shape (n, d)."""
+        batch = np.asarray(batch, dtype=np.float64).reshape(-1, np.shape(batch)[-1])
+        n = len(batch)
+        if n == 0:
+            return
+        batch_mean = batch.mean(axis=0)
+        batch_m2 = ((batch - batch_mean) ** 2).sum(axis=0) if n > 1 else np.zeros_like(batch_mean)
+        if self.count == 0:
+            self._mean, self._m2 = batch_mean, batch_m2
+            self._min, self._max = batch.min(axis=0), batch.max(axis=0)
+        else:
+            total = self.count + n
+            delta = batch_mean - self._mean
+            self._mean = self._mean + delta * (n / total)
+            self._m2 = self._m2 + batch_m2 + delta**2 * (self.count * n / total)
+            self._min = np.minimum(self._min, batch.min(axis=0))
+            self._max = np.maximum(self._max, batch.max(axis=0))
+        self.count += n
+
+        self._pending.append(batch)
+        self._pending_rows += n
+        if self._pending_rows >= CHUNK_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._pending:
+            return
+        rows = np.concatenate(self._pending)
+        self._pending, self._pending_rows = [], 0
+        lo, hi = rows.min(axis=0), rows.max(axis=0)
+        if self._hist is None:
+            self._hist = np.zeros((rows.shape[1], self.num_bins))
+            self._lo, self._hi = self._padded(lo, hi)
+        elif np.any(lo < self._lo) or np.any(hi > self._hi):
+            self._rebin(np.minimum(lo, self._lo), np.maximum(hi, self._hi))
+
+        flat = self._bin_of(rows) + np.arange(rows.shape[1]) * self.num_bins
+        self._hist += np.bincount(flat.ravel(), minlength=self._hist.size).reshape(self._hist.shape)
+
+    def _padded(self, lo: np.ndarray, hi: np.ndarray):
+        margin = np.maximum((hi - lo) * RANGE_MARGIN, 1e-6)
+        return lo - margin, hi + margin
+
+    def _bin_of(self, values: np.ndarray) -> np.ndarray:
+        scaled = (values - self._lo) / (self._hi - self._lo) * self.num_bins
+        return np.clip(scaled.astype(np.int64), 0, self.num_bins - 1)
+
+    def _rebin(self, lo: np.ndarray, hi: np.ndarray) -> None:
+        """Move the counts of each old bin centre into the bins of the wider range."""
+        step = (self._hi - self._lo) / self.num_bins
+        centers = self._lo[:, None] + (np.arange(self.num_bins) + 0.5) * step[:, None]
+        self._lo, self._hi = self._padded(lo, hi)
+        flat = self._bin_of(centers.T).T + np.arange(len(self._hist))[:, None] * self.num_bins
+        hist = np.bincount(flat.ravel(), weights=self._hist.ravel(), minlength=self._hist.size)
+        self._hist = hist.reshape(self._hist.shape)
+
+    def _quantile(self, q: float) -> np.ndarray:
+        cumsum = np.cumsum(self._hist, axis=1)
+        target = q * self.count
+        step = (self._hi - self._lo) / self.num_bins
+        values = np.empty(len(cumsum))
+        for dim, row in enumerate(cumsum):
+            idx = int(np.searchsorted(row, target))
+            if idx >= self.num_bins:
+                values[dim] = self._hi[dim]
+                continue
+            before = row[idx - 1] if idx > 0 else 0.0
+            in_bin = row[idx] - before
+            fraction = (target - before) / in_bin if in_bin > 0 else 0.0
+            values[dim] = self._lo[dim] + (idx + fraction) * step[dim]
+        # Bins are wider than the data range; keep quantiles inside what was seen
+        return np.clip(values, self._min, self._max)
+
+    def get_statistics(self) -> Dict[str, np.ndarray]:
+        if self.count == 0:
+            raise ValueError("No samples to compute statistics from")
+        self._flush()
+        stats = {
+            "min": self._min.copy(),
+            "max": self._max.copy(),
+            "mean": self._mean.copy(),
+            "std": np.sqrt(np.maximum(self._m2 / self.count, 0.0)),
+            "count": np.array([self.count]),
+        }
+        for q in self.quantiles:
+            stats[f"q{int(q * 100):02d}"] = self._quantile(q) if self.count > 1 else self._mean.copy()
+        return stats
+
+
+class PixelStats:
+    """Exact per-channel stats of uint8 images from one 256-bin histogram per channel, reported in [0, 1]."""
+
+    def __init__(self, quantiles: Optional[List[float]] = None):
+        self.quantiles = list(DEFAULT_QUANTILES if quantiles is None else quantiles)
+        self.count = 0
+        self._hist: Optional[np.ndarray] = None
+
+    def update(self, image: np.ndarray) -> None:
+        """Add a channel-first uint8 image."""
+        channels = image.shape[0]
+        if self._hist is None:
+            self._hist = np.zeros((channels, 256), dtype=np.int64)
+        flat = image.reshape(channels, -1).astype(np.int64) + (np.arange(channels) * 256)[:, None]
+        self._hist += np.bincount(flat.ravel(), minlength=channels * 256).reshape(channels, 256)
+        self.count += 1
+
+    def get_statistics(self) -> Dict[str, np.ndarray]:
+        if self.count == 0:
+            raise ValueError("No samples to compute statistics from")
+        values = np.arange(256) / 255.0
+        pixels = self._hist.sum(axis=1)
+        mean = self._hist @ values / pixels
+        var = self._hist @ values**2 / pixels - mean**2
+        seen = self._hist > 0
+        cumsum = np.cumsum(self._hist, axis=1)
+        stats = {
+            "min": values[seen.argmax(axis=1)],
+            "max": values[255 - seen[:, ::-1].argmax(axis=1)],
+            "mean": mean,
+            "std": np.sqrt(np.maximum(var, 0.0)),
+        }
+        for q in self.quantiles:
+            index = [np.searchsorted(row, q * total) for row, total in zip(cumsum, pixels)]
+            stats[f"q{int(q * 100):02d}"] = values[np.minimum(index, 255)]
+        stats = {key: value.reshape(-1, 1, 1) for key, value in stats.items()}
+        stats["count"] = np.array([self.count])
+        return stats
+
+
+# ------------------------ Episode Stats ------------------------ #
+class EpisodeStats:
+    """Stats of one episode, updated frame by frame from add_frame().
+
+    Numeric features update a RunningStats per frame. Camera features sample
+    every `image_stride`-th frame, downsampled like lerobot's sample_images,
+    into PixelStats; their count is the number of sampled images, as in
+    compute_episode_stats. The DEFAULT_FEATURES columns only exist at save
+    time and are left to lerobot.
+    """
+
+    def __init__(self, features: Dict[str, Dict[str, Any]], image_stride: int = 5):
+        self.image_stride = max(1, int(image_stride))
+        self.frames = 0
+        self._vectors: Dict[str, RunningStats] = {}
+        self._images: Dict[str, PixelStats] = {}
+        for key, ft in features.items():
+            if key in DEFAULT_FEATURES or ft["dtype"] == "string":
+                continue
+            if ft["dtype"] in ("image", "video"):
+                self._images[key] = PixelStats()
+            else:
+                self._vectors[key] = RunningStats()
+
+    def add(self, frame: Dict[str, Any]) -> None:
+        for key, stats in self._vectors.items():
+            stats.update(np.asarray(frame[key]).reshape(1, -1))
+        if self.frames % self.image_stride == 0:
+            for key, stats in self._images.items():
+                image = np.asarray(frame[key])
+                if image.ndim == 3 and image.shape[-1] in (1, 3, 4) and image.shape[0] not in (1, 3, 4):
+                    image = np.transpose(image, (2, 0, 1))
+                if image.dtype != np.uint8:
+                    image = np.clip(image * 255.0, 0, 255).astype(np.uint8)  # float images are in [0, 1]
+                stats.update(auto_downsample_height_width(image))
+        self.frames += 1
+
+    def get_statistics(self) -> Dict[str, Dict[str, np.ndarray]]:
+        """Stats in compute_episode_stats' layout for every feature seen so far."""
+        stats = {**self._vectors, **self._images}
+        return {key: s.get_statistics() for key, s in stats.items() if s.count}
+
+
+# ------------------------ Save Hook ------------------------ #
+_precomputed = threading.local()
+_compute_episode_stats = lerobot_dataset.compute_episode_stats
+_hook_lock = threading.Lock()
+_hook_users = 0
+
+
+def _compute_remaining_episode_stats(episode_data: Dict[str, Any], features: Dict, *args, **kwargs) -> Dict:
+    stats = getattr(_precomputed, "stats", None)
+    if stats is None:
+        return _compute_episode_stats(episode_data, features, *args, **kwargs)
+    remaining = {key: value for key, value in episode_data.items() if key not in stats}
+    return {**_compute_episode_stats(remaining, features, *args, **kwargs), **stats}
+
+
+@contextmanager
+def use_episode_stats(stats: Dict[str, Dict[str, np.ndarray]]) -> Iterator[None]:
+    """save_episode() on this thread takes `stats` instead of recomputing those features.
+
+    lerobot computes episode stats inside save_episode() through the module
+    level compute_episode_stats, so that name is replaced by a hook while any
+    thread is inside this context, and restored when the last one leaves.
+    The hook only uses `stats` on the thread that passed them; other threads
+    saving at the same time get the original computation.
+    """
+    global _hook_users
+    with _hook_lock:
+        if _hook_users == 0:
+            lerobot_dataset.compute_episode_stats = _compute_remaining_episode_stats
+        _hook_users += 1
+    _precomputed.stats = stats
+    try:
+        yield
+    finally:
+        _precomputed.stats = None
+        with _hook_lock:
+            _hook_users -= 1
+            if _hook_users == 0:
+                lerobot_dataset.compute_episode_stats = _compute_episode_stats
@@ -0,0 +1,193 @@
+from pathlib import Path
+from typing import Any, Dict, List
+import argparse
+import logging
+
+import numpy as np
+import yaml
+
+from scripts.utils.episode_arrays import (
+    get_feature_names,
+    load_dataset_info,
+    load_episodes_table,
+    read_episode_columns,
+    resolve_dataset_root,
+)
+from scripts.utils.signal_utils import fit_linear_with_lag
+
+np.set_printoptions(suppress=True)
+
+# ------------------------ Logging Setup ------------------------ #
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+
+JOINT_KEYS = [f"joint_{i}.pos" for i in range(1, 7)]
+
+# A scale this far from 1 cannot be absorbed by hardware_offsets and is reported instead.
+SCALE_WARN_TOLERANCE = 0.05
+
+
+# ------------------------ Config Loader ------------------------ #
+class CalibrationConfig:
+    """Configuration for fitting teleop calibration from recorded episodes."""
+
+    def __init__(self, cfg: Dict[str, Any]):
+        fit_cfg = cfg["fit_calibration"]
+        dxl_cfg = cfg["record"]["teleop"]["dynamixel_config"]
+
+        self.dataset_name: str = fit_cfg["dataset_name"]
+        self.episodes: List[int] | None = fit_cfg.get("episodes") or None
+        self.max_lag_frames: int = fit_cfg.get("max_lag_frames", 10)
+        self.fit_gripper: bool = fit_cfg.get("fit_gripper", False)
+        self.gripper_quantile: float = fit_cfg.get("gripper_quantile", 0.01)
+
+        # Calibration used when the dataset was recorded
+        self.hardware_offsets: List[float] = dxl_cfg["hardware_offsets"]
+        self.joint_offsets: List[float] = dxl_cfg["joint_offsets"]
+        self.joint_signs: List[int] = dxl_cfg["joint_signs"]
+        self.gripper_config: List[float] = dxl_cfg["gripper_config"]
+
+
+# ------------------------ Data Loading ------------------------ #
+def load_leader_follower_segments(cfg: CalibrationConfig, root: Path | None = None) -> Dict[str, Any]:
+    """Load leader actions and follower states of the selected episodes as arrays."""
+    root = resolve_dataset_root(cfg.dataset_name, root)
+    info = load_dataset_info(root)
+    episodes_table = load_episodes_table(root)
+    action_names = get_feature_names(info["features"], "action")
+    state_names = get_feature_names(info["features"], "observation.state")
+
+    missing = [key for key in JOINT_KEYS if key not in action_names]
+    if missing:
+        raise ValueError(
+            f"Dataset actions do not contain {missing}. Calibration fitting needs a dataset "
+            "recorded with control_space 'joint' or 'joint_to_tcp_force'."
+        )
+
+    action_idx = [action_names.index(key) for key in JOINT_KEYS]
+    state_idx = [state_names.index(key) for key in JOINT_KEYS]
+    gripper_idx = action_names.index("gripper_position") if "gripper_position" in action_names else None
+
+    episode_indices = cfg.episodes if cfg.episodes is not None else episodes_table["episode_index"].tolist()
+    leader, follower, gripper = [], [], []
+    for episode_index in episode_indices:
+        arrays = read_episode_columns(
+            root, episode_index, ["action", "observation.state"], info=info, episodes=episodes_table
+        )
+        leader.append(arrays["action"][:, action_idx].astype(float))
+        follower.append(arrays["observation.state"][:, state_idx].astype(float))
+        if gripper_idx is not None:
+            gripper.append(arrays["action"][:, gripper_idx].astype(float))
+
+    return {
+        "fps": info["fps"],
+        "episodes": list(episode_indices),
+        "leader": leader,
+        "follower": follower,
+        "gripper": gripper,
+    }
+
+
+# ------------------------ Fitting ------------------------ #
+def corrected_hardware_offsets(cfg: CalibrationConfig, unit_offset_rad: np.ndarray) -> List[float]:
+    """Fold a follower - leader offset (rad, action space) into hardware_offsets (deg).
+
+    Actions are `sign * (raw + hardware_offset - joint_offset)`, so shifting
+    the action by `b` shifts the hardware offset by `sign * b`.
+    """
+    signs = np.asarray(cfg.joint_signs, dtype=float)
+    offsets = np.asarray(cfg.hardware_offsets, dtype=float) + np.rad2deg(signs * unit_offset_rad)
+    return [round(float(x), 3) for x in offsets]
+
+
+def fit_gripper_range(cfg: CalibrationConfig, gripper_actions: List[np.ndarray]) -> List[float]:
+    """Stretch gripper_config so the range the operator actually used maps to [0, 1]."""
+    gripper_id, g_min, g_max = cfg.gripper_config
+    values = np.concatenate(gripper_actions)
+    lo, hi = np.quantile(values, [cfg.gripper_quantile, 1.0 - cfg.gripper_quantile])
+    span = g_max - g_min
+    # Saturated ends carry no information about how far the true range extends.
+    new_min = g_min + lo * span if lo > 1e-3 else g_min
+    new_max = g_min + hi * span if hi < 1.0 - 1e-3 else g_max
+    logger.info(
+        "Gripper action quantiles: %.3f / %.3f -> gripper range [%.6f, %.6f]",
+        lo, hi, new_min, new_max,
+    )
+    return [int(gripper_id), round(float(new_min), 6), round(float(new_max), 6)]
+
+
+def fit_calibration(cfg: CalibrationConfig, root: Path | None = None) -> Dict[str, Any]:
+    data = load_leader_follower_segments(cfg, root)
+    logger.info(
+        "Loaded %d episodes, %d frames at %d fps.",
+        len(data["episodes"]),
+        sum(len(x) for x in data["leader"]),
+        data["fps"],
+    )
+
+    fit = fit_linear_with_lag(data["leader"], data["follower"], cfg.max_lag_frames)
+    lag_ms = fit["lag"] / data["fps"] * 1e3
+
+    logger.info("\nPer-joint fit (follower = scale * leader + offset at the fitted lag):")
+    for i, key in enumerate(JOINT_KEYS):
+        logger.info(
+            "%s: lag %.1f ms, scale %.4f, offset %+.3f deg (unit-scale %+.3f deg), rms %.3f deg",
+            key,
+            lag_ms[i],
+            fit["scale"][i],
+            np.rad2deg(fit["offset"][i]),
+            np.rad2deg(fit["unit_offset"][i]),
+            np.rad2deg(fit["unit_rms"][i]),
+        )
+        if abs(fit["scale"][i] - 1.0) > SCALE_WARN_TOLERANCE:
+            logger.warning(
+                "%s: scale %.4f is far from 1 and cannot be corrected through hardware_offsets; "
+                "check joint_signs and the leader joint mechanics.",
+                key,
+                fit["scale"][i],
+            )
+
+    block = {
+        "hardware_offsets": corrected_hardware_offsets(cfg, fit["unit_offset"]),
+        "joint_offsets": [float(x) for x in cfg.joint_offsets],
+        "gripper_config": list(cfg.gripper_config),
+    }
+    if cfg.fit_gripper and data["gripper"]:
+        block["gripper_config"] = fit_gripper_range(cfg, data["gripper"])
+
+    return {"fit": fit, "lag_ms": lag_ms, "dynamixel_config": block}
+
+
+def format_cfg_block(block: Dict[str, Any]) -> str:
+    return yaml.safe_dump({"dynamixel_config": block}, default_flow_style=None, sort_keys=False)
+
+
+# ------------------------ Main ------------------------ #
+def main():
+    parser = argparse.ArgumentParser(description="Fit teleop calibration from recorded joint-space episodes")
+    parser.add_argument(
+        "--episodes",
+        type=str,
+        default=None,
+        help='Episode indices to use, e.g. "[0,1,2]". Defaults to fit_calibration.episodes or all episodes.',
+    )
+    parser.add_argument("--root", type=Path, default=None, help="Local dataset root, if not in the lerobot cache.")
+    parser.add_argument("--output", type=Path, default=None, help="Also write the corrected YAML block to this file.")
+    args = parser.parse_args()
+
+    parent_path = Path(__file__).resolve().parent
+    cfg_path = parent_path.parent / "config" / "cfg.yaml"
+    with open(cfg_path, "r") as f:
+        cfg = yaml.safe_load(f)
+
+    calib_cfg = CalibrationConfig(cfg)
+    if args.episodes is not None:
+        calib_cfg.episodes = yaml.safe_load(args.episodes)
+
+    result = fit_calibration(calib_cfg, args.root)
+    text = format_cfg_block(result["dynamixel_config"])
+    logger.info("\nCorrected block for record.teleop in cfg.yaml:\n%s", text)
+    if args.output is not None:
+        args.output.write_text(text, encoding="utf-8")
+        logger.info("Written to %s", args.output)
@@ -0,0 +1,140 @@
+import logging
+import numbers
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# ------------------------ Logging Setup ------------------------ #
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+FRAME_VALID = "frame_valid"
+FRAME_VALID_FEATURE = {"dtype": "float32", "shape": (1,), "names": None}
+POLICIES = ("warn", "mark", "interpolate", "abort")
+LATE_TOLERANCE = 0.5  # a tick starting more than half a period late has missed its frame
+
+
+def interpolate_values(prev: Dict[str, Any], curr: Dict[str, Any], alpha: float) -> Dict[str, Any]:
+    """Blend two observation/action dicts; images and non-numeric values hold the previous value."""
+    out = {}
+    for key, value in curr.items():
+        before = prev.get(key, value)
+        if isinstance(value, np.ndarray) and value.ndim < 2 and np.issubdtype(value.dtype, np.number):
+            out[key] = before + alpha * (value - before)
+        elif isinstance(value, numbers.Real) and not isinstance(value, bool):
+            out[key] = float(before) + alpha * (float(value) - float(before))
+        else:
+            out[key] = before
+    return out
+
+
+# ------------------------ Frame Health ------------------------ #
+class FrameHealth:
+    """Per-episode detection of late ticks and repeated camera frames.
+
+    A tick is late when it starts more than LATE_TOLERANCE periods after the
+    previous one; round(gap / period) - 1 frames were missed. A camera frame
+    is repeated when its reader's sequence number did not advance since the
+    previous tick. The policy decides what happens to such frames:
+
+    - "warn": count them and report at the end of the episode
+    - "mark": also write FRAME_VALID = 0 for them, 1 otherwise
+    - "interpolate": fill up to `max_interpolated` missed frames per gap with
+      interpolated state and action and the previous camera frames, so
+      frame_index keeps matching time
+    - "abort": once more than `max_bad_frames` frames are late or repeated,
+      stop the episode so it is re-recorded
+    """
+
+    def __init__(self, fps: int, cameras: List[str], policy: str = "warn", max_bad_frames: int = 15,
+                 max_interpolated: Optional[int] = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown frame policy {policy!r}, expected one of {POLICIES}")
+        self.fps = fps
+        self.period_s = 1.0 / fps
+        self.policy = policy
+        self.max_bad_frames = max_bad_frames
+        self.max_interpolated = fps if max_interpolated is None else max_interpolated
+        self.cameras = list(cameras)
+        self.reset()
+
+    def reset(self) -> None:
+        self.frames = 0
+        self.late_ticks = 0
+        self.missed_frames = 0
+        self.repeats = {name: 0 for name in self.cameras}
+        self.longest_repeat = {name: 0 for name in self.cameras}
+        self.bad_frames: List[int] = []
+        self.interpolated: List[int] = []
+        self.aborted = False
+        self._run = {name: 0 for name in self.cameras}
+        self._last_seq: Dict[str, int] = {}
+        self._last_tick: Optional[float] = None
+        self._tick_bad = False
+
+    def check(self, tick_start: float, camera_seqs: Dict[str, int]) -> int:
+        """Check a recorded tick before it is written; returns the number of frames it missed."""
+        missed = 0
+        if self._last_tick is not None:
+            gap = tick_start - self._last_tick
+            if gap > self.period_s * (1.0 + LATE_TOLERANCE):
+                missed = max(1, round(gap / self.period_s) - 1)
+                self.late_ticks += 1
+                self.missed_frames += missed
+        self._last_tick = tick_start
+
+        repeated = False
+        for name, seq in camera_seqs.items():
+            if self._last_seq.get(name) == seq:
+                repeated = True
+                self.repeats[name] += 1
+                self._run[name] += 1
+                self.longest_repeat[name] = max(self.longest_repeat[name], self._run[name])
+            else:
+                self._run[name] = 0
+            self._last_seq[name] = seq
+        self._tick_bad = bool(missed or repeated)
+        return missed
+
+    def add_interpolated(self) -> None:
+        """Count a frame filled in for a missed one, written before the checked tick."""
+        self.interpolated.append(self.frames)
+        self.frames += 1
+
+    def add_frame(self) -> np.ndarray:
+        """Count the checked tick as written; returns its FRAME_VALID value."""
+        if self._tick_bad:
+            self.bad_frames.append(self.frames)
+        self.frames += 1
+        return np.array([0.0 if self._tick_bad else 1.0], dtype=np.float32)
+
+    def should_abort(self) -> bool:
+        if self.policy == "abort" and not self.aborted and len(self.bad_frames) > self.max_bad_frames:
+            self.aborted = True
+            logger.info(
+                f"====== [FRAMES] {len(self.bad_frames)} late or repeated frames "
+                f"(limit {self.max_bad_frames}), re-recording the episode ======"
+            )
+        return self.aborted
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "policy": self.policy,
+            "frames": self.frames,
+            "late_ticks": self.late_ticks,
+            "missed_frames": self.missed_frames,
+            "interpolated_frames": list(self.interpolated),
+            "camera_repeats": dict(self.repeats),
+            "longest_camera_repeat": dict(self.longest_repeat),
+            "bad_frames": list(self.bad_frames),
+        }
+
+    def one_line(self) -> str:
+        repeats = ", ".join(f"{name} {n}" for name, n in self.repeats.items() if n) or "none"
+        line = (
+            f"{self.late_ticks} late ticks ({self.missed_frames} frames missed), "
+            f"camera repeats: {repeats}, {len(self.bad_frames)} of {self.frames} frames flagged"
+        )
+        if self.interpolated:
+            line += f", {len(self.interpolated)} interpolated"
+        return line
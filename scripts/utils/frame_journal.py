@@ -0,0 +1,154 @@
+import json
+import logging
+import os
+import shutil
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# ------------------------ Logging Setup ------------------------ #
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+JOURNAL_DIR = "journal"
+JOURNAL_VERSION = 1
+META_FILE = "meta.json"
+FRAMES_FILE = "frames.bin"
+
+
+def list_journals(dataset_root: Path) -> List[Path]:
+    root = Path(dataset_root) / JOURNAL_DIR
+    if not root.is_dir():
+        return []
+    return sorted(path for path in root.iterdir() if (path / META_FILE).exists())
+
+
+def record_dtype(columns: Sequence[Tuple[str, str, Sequence[int]]]) -> np.dtype:
+    """Fixed-size record: crc32 of the rest, frame index, timestamp, task index, then the columns."""
+    fields = [("crc", "<u4"), ("frame_index", "<i8"), ("timestamp", "<f8"), ("task_index", "<i4")]
+    fields += [(key, np.dtype(dtype).newbyteorder("<"), tuple(shape)) for key, dtype, shape in columns]
+    return np.dtype(fields)
+
+
+def _write_json_atomic(path: Path, data: Dict[str, Any]) -> None:
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+# ------------------------ Writer ------------------------ #
+class FrameJournal:
+    """Append-only write-ahead log of one episode's frames.
+
+    Every frame is written straight to the OS, so a crash of the recording
+    process loses nothing. fsync runs at most every `sync_interval_s` (group
+    commit), which bounds what a power loss can take; 0 syncs every frame.
+    Camera images are not copied; meta.json records where each camera's
+    frames are (a fragmented mp4 being streamed, or the PNG folder).
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        episode_index: int,
+        fps: int,
+        columns: Sequence[Tuple[str, str, Sequence[int]]],
+        sync_interval_s: float = 0.5,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.sync_interval_s = sync_interval_s
+        self.frames = 0
+        self._dtype = record_dtype(columns)
+        self._columns = [key for key, _, _ in columns]
+        self._record = np.zeros(1, dtype=self._dtype)
+        self._meta: Dict[str, Any] = {
+            "version": JOURNAL_VERSION,
+            "episode_index": episode_index,
+            "fps": fps,
+            "created": time.time(),
+            "columns": [[key, str(np.dtype(dtype)), list(shape)] for key, dtype, shape in columns],
+            "tasks": [],
+            "media": {},
+        }
+        self._task_index: Dict[str, int] = {}
+        _write_json_atomic(self.directory / META_FILE, self._meta)
+        self._fd: Optional[int] = os.open(self.directory / FRAMES_FILE, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._last_sync = time.perf_counter()
+
+    def set_media(self, key: str, kind: str, path: Path) -> None:
+        """Record where the frames of camera `key` live; kind is "video" or "images"."""
+        self._meta["media"][key] = {"kind": kind, "path": str(path)}
+        _write_json_atomic(self.directory / META_FILE, self._meta)
+
+    def append(self, frame_index: int, timestamp: float, task: str, values: Dict[str, Any]) -> None:
+        task_index = self._task_index.get(task)
+        if task_index is None:
+            task_index = self._task_index[task] = len(self._meta["tasks"])
+            self._meta["tasks"].append(task)
+            _write_json_atomic(self.directory / META_FILE, self._meta)
+
+        record = self._record[0]
+        record["frame_index"] = frame_index
+        record["timestamp"] = timestamp
+        record["task_index"] = task_index
+        for key in self._columns:
+            record[key] = values[key]
+        payload = self._record.tobytes()[4:]
+        os.write(self._fd, struct.pack("<I", zlib.crc32(payload)) + payload)
+        self.frames += 1
+
+        now = time.perf_counter()
+        if now - self._last_sync >= self.sync_interval_s:
+            os.fsync(self._fd)
+            self._last_sync = now
+
+    def sync(self) -> None:
+        if self._fd is not None:
+            os.fsync(self._fd)
+            self._last_sync = time.perf_counter()
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.fsync(self._fd)
+            os.close(self._fd)
+            self._fd = None
+
+    def remove(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# ------------------------ Reader ------------------------ #
+def read_journal(directory: Path) -> Tuple[Dict[str, Any], np.ndarray]:
+    """Return (meta, records) with records cut at the first torn or corrupt one."""
+    directory = Path(directory)
+    with open(directory / META_FILE, "r") as f:
+        meta = json.load(f)
+    if meta.get("version") != JOURNAL_VERSION:
+        raise ValueError(f"Unsupported journal version {meta.get('version')} in {directory}")
+
+    dtype = record_dtype([(key, dtype, shape) for key, dtype, shape in meta["columns"]])
+    raw = (directory / FRAMES_FILE).read_bytes()
+    count = len(raw) // dtype.itemsize
+    records = np.frombuffer(raw, dtype=dtype, count=count)
+
+    valid = 0
+    for i in range(count):
+        start = i * dtype.itemsize
+        expected = int(records[i]["crc"])
+        if zlib.crc32(raw[start + 4 : start + dtype.itemsize]) != expected or records[i]["frame_index"] != i:
+            break
+        valid += 1
+    if valid < count or len(raw) % dtype.itemsize:
+        logger.info(f"====== [JOURNAL] {directory.name}: kept {valid} of {count} records, dropped a torn tail ======")
+    return meta, records[:valid]
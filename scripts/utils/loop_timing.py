@@ -0,0 +1,190 @@
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# ------------------------ Logging Setup ------------------------ #
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+BUCKET_MS = 0.25
+NUM_BUCKETS = 2000  # 0 - 500 ms; slower samples land in the last bucket
+TIMING_DIR = "loop_timing"
+OVERRUN_TOLERANCE = 0.1  # sleep jitter keeps tick-to-tick periods slightly above 1 / fps
+
+
+# ------------------------ Histogram ------------------------ #
+class StageHistogram:
+    """Fixed-bucket duration histogram; cheap enough to update on every tick.
+
+    Each instance is written by a single thread. Percentiles are reported as
+    the upper edge of their bucket, capped at the largest sample seen.
+    """
+
+    __slots__ = ("counts", "count", "total_s", "max_s", "overruns")
+
+    def __init__(self):
+        self.counts: List[int] = [0] * NUM_BUCKETS
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.overruns = 0
+
+    def add(self, seconds: float, overrun_s: float) -> None:
+        index = int(seconds * 1e3 / BUCKET_MS)
+        self.counts[index if index < NUM_BUCKETS else NUM_BUCKETS - 1] += 1
+        self.count += 1
+        self.total_s += seconds
+        if seconds > self.max_s:
+            self.max_s = seconds
+        if seconds > overrun_s:
+            self.overruns += 1
+
+    def merge(self, other: "StageHistogram") -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total_s += other.total_s
+        self.max_s = max(self.max_s, other.max_s)
+        self.overruns += other.overruns
+
+    def percentile_ms(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for index, n in enumerate(self.counts):
+            cumulative += n
+            if n and cumulative >= target:
+                return min((index + 1) * BUCKET_MS, self.max_s * 1e3)
+        return self.max_s * 1e3
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_s / self.count * 1e3, 3) if self.count else 0.0,
+            "p50_ms": round(self.percentile_ms(0.50), 3),
+            "p95_ms": round(self.percentile_ms(0.95), 3),
+            "p99_ms": round(self.percentile_ms(0.99), 3),
+            "max_ms": round(self.max_s * 1e3, 3),
+            "overruns": self.overruns,
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            **self.summary(),
+            "total_s": self.total_s,
+            "histogram": {str(i): n for i, n in enumerate(self.counts) if n},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StageHistogram":
+        hist = cls()
+        for index, n in data.get("histogram", {}).items():
+            hist.counts[int(index)] = int(n)
+        hist.count = int(data["count"])
+        hist.total_s = float(data.get("total_s", data["mean_ms"] * data["count"] / 1e3))
+        hist.max_s = float(data["max_ms"]) / 1e3
+        hist.overruns = int(data["overruns"])
+        return hist
+
+
+# ------------------------ Loop Timing ------------------------ #
+class LoopTiming:
+    """Per-stage histograms for one recording phase.
+
+    Overruns count samples longer than the frame period 1 / fps plus
+    OVERRUN_TOLERANCE. Stage names are created on first use, e.g.
+    "observation", "teleop", "send_action", "tick" (work per control tick)
+    and "period" (tick start to tick start).
+    """
+
+    def __init__(self, fps: float):
+        self.fps = fps
+        self.period_s = 1.0 / fps
+        self.overrun_s = self.period_s * (1.0 + OVERRUN_TOLERANCE)
+        self.stages: Dict[str, StageHistogram] = {}
+        self.started = time.time()
+
+    def add(self, stage: str, seconds: float) -> None:
+        hist = self.stages.get(stage)
+        if hist is None:
+            hist = self.stages.setdefault(stage, StageHistogram())
+        hist.add(seconds, self.overrun_s)
+
+    def merge(self, other: "LoopTiming") -> None:
+        for stage, hist in other.stages.items():
+            self.stages.setdefault(stage, StageHistogram()).merge(hist)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {stage: hist.summary() for stage, hist in self.stages.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "fps": self.fps,
+            "period_ms": round(self.period_s * 1e3, 3),
+            "bucket_ms": BUCKET_MS,
+            "started": self.started,
+            "stages": {stage: hist.to_dict() for stage, hist in self.stages.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LoopTiming":
+        timing = cls(data["fps"])
+        timing.started = data.get("started", timing.started)
+        timing.stages = {stage: StageHistogram.from_dict(d) for stage, d in data["stages"].items()}
+        return timing
+
+    def log_summary(self, title: str) -> None:
+        logger.info(f"\n====== [TIMING] {title} (period {self.period_s * 1e3:.1f} ms) ======")
+        if not self.stages:
+            logger.info("  no samples")
+            return
+        width = max(len(stage) for stage in self.stages)
+        logger.info(f"  {'stage':<{width}}  {'count':>7}  {'p50':>8}  {'p95':>8}  {'p99':>8}  {'max':>8}  overruns")
+        for stage, hist in self.stages.items():
+            s = hist.summary()
+            logger.info(
+                f"  {stage:<{width}}  {s['count']:>7}  {s['p50_ms']:>6.1f}ms  {s['p95_ms']:>6.1f}ms  "
+                f"{s['p99_ms']:>6.1f}ms  {s['max_ms']:>6.1f}ms  {s['overruns']}"
+            )
+
+    def one_line(self) -> str:
+        tick = self.stages.get("tick")
+        period = self.stages.get("period")
+        if tick is None or period is None:
+            return "no ticks"
+        return (
+            f"{tick.count} ticks, tick p99 {tick.percentile_ms(0.99):.1f} ms, "
+            f"period p99 {period.percentile_ms(0.99):.1f} ms, {tick.overruns} overruns"
+        )
+
+
+# ------------------------ Persistence ------------------------ #
+def episode_timing_path(dataset_root: Path, episode_index: int) -> Path:
+    return Path(dataset_root) / "meta" / TIMING_DIR / f"episode_{episode_index:06d}.json"
+
+
+def write_episode_timing(
+    dataset_root: Path,
+    episode_index: int,
+    timing: LoopTiming,
+    frame_health: Optional[Dict[str, Any]] = None,
+) -> Path:
+    """Store an episode's timing next to the episode metadata, under meta/loop_timing/.
+
+    frame_health, the FrameHealth summary of the episode, is stored under "frames".
+    """
+    path = episode_timing_path(dataset_root, episode_index)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"episode_index": episode_index, **timing.to_dict()}
+    if frame_health is not None:
+        data["frames"] = frame_health
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+    return path
+
+
+def load_episode_timing(dataset_root: Path, episode_index: int) -> LoopTiming:
+    with open(episode_timing_path(dataset_root, episode_index), "r") as f:
+        return LoopTiming.from_dict(json.load(f))
@@ -0,0 +1,421 @@
+import logging
+import math
+import numbers
+import queue
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import rerun as rr
+
+from lerobot.datasets.image_writer import safe_stop_image_writer
+from lerobot.datasets.lerobot_dataset import LeRobotDataset
+from lerobot.datasets.utils import build_dataset_frame
+from lerobot.utils.constants import ACTION, OBS_STR
+from lerobot.utils.robot_utils import busy_wait
+
+from scripts.utils.frame_health import FRAME_VALID, FrameHealth, interpolate_values
+from scripts.utils.loop_timing import LoopTiming
+
+# ------------------------ Logging Setup ------------------------ #
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+# ------------------------ Camera Stage ------------------------ #
+class CameraReader:
+    """Reads one camera in a background thread and keeps only the latest frame.
+
+    The control loop never blocks on the camera: it takes whatever frame is
+    newest. A frame older than `timeout_s` is treated as a dead camera.
+    """
+
+    def __init__(self, name: str, camera, timing: LoopTiming, timeout_s: float = 1.0):
+        self.name = name
+        self.timing = timing
+        self._stage = f"camera_read.{name}"
+        self._camera = camera
+        self._timeout_s = timeout_s
+        self._lock = threading.Lock()
+        self._frame: Optional[np.ndarray] = None
+        self._stamp = 0.0
+        self._seq = 0
+        self._error: Optional[BaseException] = None
+        self._stop = threading.Event()
+        self._has_frame = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name=f"camera-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self._timeout_s + 1.0)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                frame = self._camera.read()
+            except Exception as e:
+                with self._lock:
+                    self._error = e
+                time.sleep(0.01)
+                continue
+            stamp = time.perf_counter()
+            self.timing.add(self._stage, stamp - t0)
+            with self._lock:
+                self._frame = frame
+                self._stamp = stamp
+                self._seq += 1
+                self._error = None
+            self._has_frame.set()
+
+    def latest(self) -> Tuple[np.ndarray, int]:
+        """Return (frame, sequence number) of the newest frame."""
+        if not self._has_frame.wait(self._timeout_s):
+            raise TimeoutError(f"Camera {self.name} produced no frame within {self._timeout_s:.1f} s")
+        with self._lock:
+            age = time.perf_counter() - self._stamp
+            if age > self._timeout_s:
+                reason = f": {self._error}" if self._error is not None else ""
+                raise TimeoutError(f"Camera {self.name} has not delivered a frame for {age:.1f} s{reason}")
+            return self._frame, self._seq
+
+
+# ------------------------ Writer Stage ------------------------ #
+class DatasetWriter:
+    """Builds dataset frames and calls add_frame in a background thread.
+
+    The queue is bounded and put() blocks when it is full, so a slow writer
+    slows the control loop down instead of losing frames.
+    """
+
+    def __init__(self, max_queue: int, timing: LoopTiming):
+        self.timing = timing
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="dataset-writer", daemon=True)
+        self._thread.start()
+
+    def put(
+        self,
+        dataset: LeRobotDataset,
+        observation: Dict[str, Any],
+        action: Dict[str, Any],
+        task: str,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.raise_if_failed()
+        self._queue.put((dataset, observation, action, task, extra))
+
+    def drain(self) -> None:
+        """Wait until every queued frame has been added to its dataset."""
+        self._queue.join()
+        self.raise_if_failed()
+
+    def raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"Dataset writer failed: {self._error}") from self._error
+
+    def close(self) -> None:
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                if self._error is not None:
+                    continue  # drop frames after a failure; the control loop raises on its next put
+                dataset, observation, action, task, extra = item
+                t0 = time.perf_counter()
+                observation_frame = build_dataset_frame(dataset.features, observation, prefix=OBS_STR)
+                action_frame = build_dataset_frame(dataset.features, action, prefix=ACTION)
+                dataset.add_frame({**observation_frame, **action_frame, **(extra or {}), "task": task})
+                self.timing.add("add_frame", time.perf_counter() - t0)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+
+# ------------------------ Display Stage ------------------------ #
+def _scalar_items(prefix: str, data: Dict[str, Any]) -> Iterator[Tuple[str, float]]:
+    """Yield (entity, value) for every scalar in data, named like lerobot's log_rerun_data."""
+    for k, v in data.items():
+        if v is None:
+            continue
+        key = k if str(k).startswith(f"{prefix}.") else f"{prefix}.{k}"
+        if isinstance(v, np.ndarray) and v.ndim > 0:
+            if prefix == OBS_STR and v.ndim > 1:
+                continue  # images are logged separately
+            for i, vi in enumerate(v.ravel()):
+                yield f"{key}_{i}", float(vi)
+        elif isinstance(v, (numbers.Real, np.ndarray)):
+            yield key, float(v)
+
+
+def _preview_image(image: np.ndarray, max_width: int) -> np.ndarray:
+    """CHW to HWC if needed, then shrink by an integer stride to at most max_width."""
+    if image.ndim == 3 and image.shape[0] in (1, 3, 4) and image.shape[-1] not in (1, 3, 4):
+        image = np.transpose(image, (1, 2, 0))
+    step = max(1, math.ceil(image.shape[1] / max_width))
+    return np.ascontiguousarray(image[::step, ::step])
+
+
+class DisplayWorker:
+    """Logs a decimated preview to rerun in a background thread.
+
+    The control loop only appends its tick to a short deque. Every
+    1 / scalar_hz the worker sends the scalars of all ticks since its last
+    pass as one column batch per signal, and at most image_hz times a second
+    logs the newest camera frames, shrunk to preview_width and JPEG-compressed.
+    When the worker falls behind, the oldest ticks are dropped, so the viewer
+    never slows down control.
+    """
+
+    def __init__(
+        self,
+        timing: LoopTiming,
+        fps: int,
+        preview_width: int = 320,
+        image_hz: float = 5.0,
+        scalar_hz: float = 5.0,
+        jpeg_quality: int = 75,
+    ):
+        self.timing = timing
+        self.preview_width = preview_width
+        self.jpeg_quality = jpeg_quality
+        self._image_period = 1.0 / image_hz if image_hz > 0 else float("inf")
+        self._flush_period = 1.0 / scalar_hz
+        self._pending: deque = deque(maxlen=2 * max(1, math.ceil(fps / scalar_hz)))
+        self._last_image = 0.0
+        self.dropped = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rerun-display", daemon=True)
+        self._thread.start()
+
+    def put(self, observation: Dict[str, Any], action: Dict[str, Any]) -> None:
+        if len(self._pending) == self._pending.maxlen:
+            self.dropped += 1
+        self._pending.append((time.time(), observation, action))
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._flush_period):
+            ticks = []
+            while self._pending:
+                ticks.append(self._pending.popleft())
+            if not ticks:
+                continue
+            t0 = time.perf_counter()
+            try:
+                self._log_scalars(ticks)
+                if t0 - self._last_image >= self._image_period:
+                    self._last_image = t0
+                    self._log_images(ticks[-1][1])
+                self.timing.add("display", time.perf_counter() - t0)
+            except Exception as e:
+                logger.info(f"====== [WARNING] Rerun logging failed: {e} ======")
+
+    def _log_scalars(self, ticks) -> None:
+        series: Dict[str, Tuple[List[float], List[float]]] = {}
+        for stamp, observation, action in ticks:
+            for prefix, data in ((OBS_STR, observation), (ACTION, action)):
+                for entity, value in _scalar_items(prefix, data):
+                    stamps, values = series.setdefault(entity, ([], []))
+                    stamps.append(stamp)
+                    values.append(value)
+        for entity, (stamps, values) in series.items():
+            rr.send_columns(
+                entity,
+                indexes=[rr.TimeColumn("time", timestamp=np.asarray(stamps))],
+                columns=rr.Scalars.columns(scalars=np.asarray(values)),
+            )
+
+    def _log_images(self, observation: Dict[str, Any]) -> None:
+        for k, v in observation.items():
+            if not isinstance(v, np.ndarray) or v.ndim < 2:
+                continue
+            key = k if str(k).startswith(f"{OBS_STR}.") else f"{OBS_STR}.{k}"
+            preview = _preview_image(v, self.preview_width)
+            if preview.ndim == 3 and preview.shape[-1] == 3 and preview.dtype == np.uint8:
+                rr.log(key, rr.Image(preview).compress(jpeg_quality=self.jpeg_quality), static=True)
+            else:
+                rr.log(key, rr.Image(preview), static=True)
+
+
+# ------------------------ Pipeline ------------------------ #
+class RecordPipeline:
+    """Project-owned replacement for lerobot's record_loop.
+
+    The calling thread runs the control stage (arm state, teleop, send_action)
+    at the target fps. Cameras, dataset writing and rerun display run in their
+    own threads, so a slow camera, disk or viewer no longer delays actuation.
+    Every stage is timed into `self.timing`, and recorded ticks are checked
+    for lateness and repeated camera frames by `self.health`; both are reset
+    at each run().
+    """
+
+    def __init__(
+        self,
+        robot,
+        teleop,
+        fps: int,
+        teleop_action_processor,
+        robot_action_processor,
+        robot_observation_processor,
+        writer_queue_size: int = 30,
+        camera_timeout_s: float = 1.0,
+        display_cfg: Optional[Dict[str, Any]] = None,
+        frame_policy: str = "warn",
+        max_bad_frames: int = 15,
+    ):
+        self.robot = robot
+        self.teleop = teleop
+        self.fps = fps
+        self.teleop_action_processor = teleop_action_processor
+        self.robot_action_processor = robot_action_processor
+        self.robot_observation_processor = robot_observation_processor
+        self.timing = LoopTiming(fps)
+        self.cameras = {
+            name: CameraReader(name, cam, self.timing, camera_timeout_s) for name, cam in robot.cameras.items()
+        }
+        self.writer = DatasetWriter(writer_queue_size, self.timing)
+        self.display = DisplayWorker(self.timing, fps, **(display_cfg or {}))
+        self.health = FrameHealth(fps, list(self.cameras), frame_policy, max_bad_frames)
+        self._closed = False
+        for reader in self.cameras.values():
+            reader.start()
+
+    @safe_stop_image_writer
+    def run(
+        self,
+        events: Dict[str, bool],
+        control_time_s: float,
+        dataset: Optional[LeRobotDataset] = None,
+        single_task: Optional[str] = None,
+        display_data: bool = False,
+    ) -> None:
+        """Run one recording or reset phase; returns once all its frames are written."""
+        if dataset is not None and dataset.fps != self.fps:
+            raise ValueError(f"The dataset fps should be equal to requested fps ({dataset.fps} != {self.fps}).")
+
+        # Fresh histograms for this phase; the stage threads pick them up on their next sample.
+        self.timing = LoopTiming(self.fps)
+        for worker in (*self.cameras.values(), self.writer, self.display):
+            worker.timing = self.timing
+        self.health.reset()
+
+        try:
+            self._control_loop(events, control_time_s, dataset, single_task, display_data)
+        finally:
+            if dataset is not None:
+                self.writer.drain()
+            # Freeze this phase's histograms: the camera readers keep sampling until the next run(),
+            # including while the episode is being submitted, and those reads belong to no phase.
+            idle = LoopTiming(self.fps)
+            for worker in (*self.cameras.values(), self.writer, self.display):
+                worker.timing = idle
+
+    def _control_loop(
+        self,
+        events: Dict[str, bool],
+        control_time_s: float,
+        dataset: Optional[LeRobotDataset],
+        single_task: Optional[str],
+        display_data: bool,
+    ) -> None:
+        period = 1.0 / self.fps
+        timing = self.timing
+        health = self.health
+        camera_seqs: Dict[str, int] = {}
+        prev_obs: Optional[Dict[str, Any]] = None
+        prev_act: Optional[Dict[str, Any]] = None
+        timestamp = 0.0
+        start_episode_t = time.perf_counter()
+        prev_loop_t = None
+        while timestamp < control_time_s:
+            start_loop_t = time.perf_counter()
+            if prev_loop_t is not None:
+                timing.add("period", start_loop_t - prev_loop_t)
+            prev_loop_t = start_loop_t
+
+            if events["exit_early"]:
+                events["exit_early"] = False
+                break
+
+            # Arm state plus the latest camera frames
+            obs = self.robot.get_state_observation()
+            t_obs = time.perf_counter()
+            for name, reader in self.cameras.items():
+                obs[name], camera_seqs[name] = reader.latest()
+            obs_processed = self.robot_observation_processor(obs)
+            t_cam = time.perf_counter()
+
+            # Teleop action and actuation
+            act = self.teleop.get_action()
+            act_processed = self.teleop_action_processor((act, obs))
+            robot_action_to_send = self.robot_action_processor((act_processed, obs))
+            t_teleop = time.perf_counter()
+            self.robot.send_action(robot_action_to_send)
+            t_send = time.perf_counter()
+
+            # Hand the tick to the writer and display stages
+            if dataset is not None:
+                missed = health.check(start_loop_t, camera_seqs)
+                if missed and health.policy == "interpolate" and prev_obs is not None:
+                    for j in range(1, min(missed, health.max_interpolated) + 1):
+                        alpha = j / (missed + 1)
+                        self.writer.put(
+                            dataset,
+                            interpolate_values(prev_obs, obs_processed, alpha),
+                            interpolate_values(prev_act, act_processed, alpha),
+                            single_task,
+                        )
+                        health.add_interpolated()
+                valid = health.add_frame()
+                extra = {FRAME_VALID: valid} if health.policy == "mark" else None
+                self.writer.put(dataset, obs_processed, act_processed, single_task, extra)
+                prev_obs, prev_act = obs_processed, act_processed
+                if health.should_abort():
+                    events["rerecord_episode"] = True
+                    events["exit_early"] = True
+            if display_data:
+                self.display.put(obs_processed, act_processed)
+            t_end = time.perf_counter()
+
+            timing.add("observation", t_obs - start_loop_t)
+            timing.add("camera", t_cam - t_obs)
+            timing.add("teleop", t_teleop - t_cam)
+            timing.add("send_action", t_send - t_teleop)
+            timing.add("handoff", t_end - t_send)
+            timing.add("tick", t_end - start_loop_t)
+
+            dt_s = t_end - start_loop_t
+            busy_wait(period - dt_s)
+
+            timestamp = time.perf_counter() - start_episode_t
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        for reader in self.cameras.values():
+            reader.stop()
+        self.writer.close()
+        self.display.close()
+        if self.display.dropped:
+            logger.info(f"====== [INFO] Display skipped {self.display.dropped} stale frames ======")
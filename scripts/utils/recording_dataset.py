@@ -0,0 +1,421 @@
+import logging
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from lerobot.datasets.lerobot_dataset import LeRobotDataset
+from lerobot.datasets.utils import DEFAULT_FEATURES
+
+from scripts.utils.episode_stats import EpisodeStats, use_episode_stats
+from scripts.utils.frame_journal import JOURNAL_DIR, FrameJournal, list_journals
+from scripts.utils.video_encoder import (
+    FRAGMENTED_MP4,
+    EncoderPool,
+    PooledStreamEncoder,
+    StreamEncoder,
+    make_codec_options,
+)
+
+# ------------------------ Logging Setup ------------------------ #
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+
+Encoder = Union[StreamEncoder, PooledStreamEncoder]
+
+
+# ------------------------ Episode Spill ------------------------ #
+class EpisodeSpill:
+    """Append-only on-disk columns holding the rows flushed out of one episode buffer.
+
+    Each column is one raw binary file; rows of a column share the dtype and
+    shape of the first flush, so reading it back is a single np.fromfile().
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.rows = 0
+        self._specs: Dict[str, Tuple[np.dtype, Tuple[int, ...]]] = {}
+
+    def append(self, columns: Dict[str, list]) -> None:
+        num_rows = None
+        for key, values in columns.items():
+            array = self._as_column(key, values)
+            if num_rows is not None and len(array) != num_rows:
+                raise ValueError(f"Column {key} has {len(array)} rows, expected {num_rows}")
+            num_rows = len(array)
+            with open(self.directory / f"{key}.bin", "ab") as f:
+                array.tofile(f)
+        self.rows += num_rows or 0
+
+    def _as_column(self, key: str, values) -> np.ndarray:
+        array = np.asarray(values)
+        spec = self._specs.setdefault(key, (array.dtype, array.shape[1:]))
+        if array.shape[1:] != spec[1]:
+            raise ValueError(f"Column {key} changed shape from {spec[1]} to {array.shape[1:]}")
+        return np.ascontiguousarray(array, dtype=spec[0])
+
+    def read(self, key: str, tail: list) -> np.ndarray:
+        """The full column: spilled rows followed by the rows still in memory."""
+        dtype, shape = self._specs[key]
+        spilled = np.fromfile(self.directory / f"{key}.bin", dtype=dtype).reshape(-1, *shape)
+        return np.concatenate([spilled, self._as_column(key, tail)]) if tail else spilled
+
+    def keys(self):
+        return self._specs.keys()
+
+    def remove(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+# ------------------------ Recording Dataset ------------------------ #
+class RecordingDataset(LeRobotDataset):
+    """LeRobotDataset that encodes camera streams while the episode is recorded.
+
+    After start_streaming(), every video frame passed to add_frame() goes to a
+    per-camera encoder instead of being written as a PNG, so save_episode()
+    only flushes the encoders instead of reading every image back. Only every
+    `stats_stride`-th frame is still written as a PNG, for the image stats.
+    With `num_processes` > 0 the encoders run in an EncoderPool of worker
+    processes instead of threads of the recording process.
+
+    After start_spilling(), state/action rows are moved from the buffer lists
+    to an EpisodeSpill every `spill_rows` frames and image path lists are
+    dropped (they are regenerated from the frame index), so buffer memory
+    stays flat however long the episode runs. save_episode() assembles the
+    columns again just before lerobot writes the parquet.
+
+    After start_journal(), every frame is also appended to a FrameJournal and
+    streamed videos are written as fragmented mp4, so an episode cut short
+    by a crash can be rebuilt with tools-recover-episode. A journal is
+    deleted once its episode is saved or discarded.
+
+    After start_running_stats(), add_frame() keeps EpisodeStats up to date,
+    sampling every `image_stride`-th camera frame, and save_episode() hands
+    them to lerobot instead of computing stats over the whole buffer and
+    reading images back. Streamed cameras then write no PNGs at all.
+
+    Encoders, spills, journals and stats are keyed by episode index, so an episode
+    can be saved in the background while the next one is recorded.
+    clear_episode_buffer() aborts the encoders and deletes the spill, journal
+    and stats of the discarded episode. Without the start_*() calls the
+    dataset behaves exactly like LeRobotDataset.
+    """
+
+    def start_streaming(
+        self,
+        vcodec: str = "libsvtav1",
+        pix_fmt: str = "yuv420p",
+        g: Optional[int] = 2,
+        crf: Optional[int] = 30,
+        encoder_queue_size: int = 60,
+        stats_stride: int = 5,
+        num_processes: int = 0,
+        encoder_threads: int = 0,
+    ) -> None:
+        make_codec_options(vcodec, g, crf)  # fail on a bad codec before recording starts
+        self._encoder_options: Dict[str, Any] = {
+            "vcodec": vcodec,
+            "pix_fmt": pix_fmt,
+            "g": g,
+            "crf": crf,
+            "threads": encoder_threads,
+        }
+        self._encoder_queue_size = encoder_queue_size
+        self._encoder_pool: Optional[EncoderPool] = None
+        if num_processes > 0:
+            self._encoder_pool = EncoderPool(num_workers=num_processes, ring_slots=encoder_queue_size)
+        self._stats_stride = max(1, int(stats_stride))
+        self._encoders: Dict[Tuple[int, str], Encoder] = {}
+        self._encoders_lock = threading.Lock()
+        self._streaming = True
+
+    @property
+    def streaming(self) -> bool:
+        return getattr(self, "_streaming", False)
+
+    def start_spilling(self, spill_rows: int = 1800) -> None:
+        if spill_rows <= 0:
+            raise ValueError(f"spill_rows must be positive, got {spill_rows}")
+        self._spill_rows = spill_rows
+        self._spills: Dict[int, EpisodeSpill] = {}
+        self._spills_lock = threading.Lock()
+
+    @property
+    def spilling(self) -> bool:
+        return getattr(self, "_spill_rows", 0) > 0
+
+    def start_journal(self, sync_interval_s: float = 0.5) -> None:
+        self._journal_sync_interval_s = sync_interval_s
+        self._journal_columns = [
+            (key, ft["dtype"], tuple(ft["shape"]))
+            for key, ft in self.features.items()
+            if ft["dtype"] not in ("image", "video", "string") and key not in DEFAULT_FEATURES
+        ]
+        self._journals: Dict[int, FrameJournal] = {}
+        self._journals_lock = threading.Lock()
+        self._journaling = True
+        stale = list_journals(self.root)
+        if stale:
+            logger.info(
+                f"====== [JOURNAL] {len(stale)} unrecovered episode(s) in {self.root / JOURNAL_DIR}; "
+                "run tools-recover-episode to add them ======"
+            )
+
+    @property
+    def journaling(self) -> bool:
+        return getattr(self, "_journaling", False)
+
+    def start_running_stats(self, image_stride: int = 5) -> None:
+        self._stats_image_stride = image_stride
+        self._episode_stats: Dict[int, EpisodeStats] = {}
+        self._episode_stats_lock = threading.Lock()
+        self._running_stats = True
+
+    @property
+    def running_stats(self) -> bool:
+        return getattr(self, "_running_stats", False)
+
+    def _get_episode_stats(self, episode_index: int) -> EpisodeStats:
+        with self._episode_stats_lock:
+            stats = self._episode_stats.get(episode_index)
+            if stats is None:
+                stats = self._episode_stats[episode_index] = EpisodeStats(self.features, self._stats_image_stride)
+            return stats
+
+    def _pop_episode_stats(self, episode_index: int) -> Optional[EpisodeStats]:
+        with self._episode_stats_lock:
+            return self._episode_stats.pop(episode_index, None)
+
+    def _get_journal(self, episode_index: int) -> FrameJournal:
+        with self._journals_lock:
+            journal = self._journals.get(episode_index)
+            if journal is None:
+                (self.root / JOURNAL_DIR).mkdir(parents=True, exist_ok=True)
+                directory = tempfile.mkdtemp(prefix=f"episode_{episode_index:06d}_", dir=self.root / JOURNAL_DIR)
+                journal = FrameJournal(
+                    directory, episode_index, self.fps, self._journal_columns, self._journal_sync_interval_s
+                )
+                for key in self.meta.camera_keys:
+                    if not (self.streaming and key in self.meta.video_keys):
+                        journal.set_media(key, "images", self._get_image_file_dir(episode_index, key))
+                self._journals[episode_index] = journal
+            return journal
+
+    def _pop_journal(self, episode_index: int) -> Optional[FrameJournal]:
+        with self._journals_lock:
+            return self._journals.pop(episode_index, None)
+
+    # ------------------------ Recording Side ------------------------ #
+    def add_frame(self, frame: Dict) -> None:
+        if self.journaling:
+            if self.episode_buffer is None:
+                self.episode_buffer = self.create_episode_buffer()
+            # add_frame() pops task and timestamp, so take what the journal needs first
+            episode_index = int(self.episode_buffer["episode_index"])
+            frame_index = int(self.episode_buffer["size"])
+            task = frame["task"]
+            timestamp = frame.get("timestamp", frame_index / self.fps)
+            values = {key: frame[key] for key, _, _ in self._journal_columns}
+        stats_frame = dict(frame) if self.running_stats else None
+        super().add_frame(frame)
+        if self.running_stats:
+            self._get_episode_stats(int(self.episode_buffer["episode_index"])).add(stats_frame)
+        if self.journaling:
+            self._get_journal(episode_index).append(frame_index, timestamp, task, values)
+        if self.spilling and len(self.episode_buffer["frame_index"]) >= self._spill_rows:
+            self._spill(self.episode_buffer)
+
+    def _spill(self, episode_buffer: Dict) -> None:
+        episode_index = int(episode_buffer["episode_index"])
+        with self._spills_lock:
+            spill = self._spills.get(episode_index)
+            if spill is None:
+                spill = EpisodeSpill(tempfile.mkdtemp(prefix=f"spill_{episode_index:06d}_", dir=self.root))
+                self._spills[episode_index] = spill
+        camera_keys = set(self.meta.camera_keys)
+        columns = {
+            key: values
+            for key, values in episode_buffer.items()
+            if isinstance(values, list) and values and key != "task" and key not in camera_keys
+        }
+        spill.append(columns)
+        for key in columns:
+            episode_buffer[key] = []
+        for key in camera_keys:
+            episode_buffer[key] = []
+
+    def _save_image(self, image, fpath: Path) -> None:
+        # add_frame() calls this with images/<key>/episode-<i>/frame-<j>.png before bumping the buffer size
+        video_key = fpath.parent.parent.name
+        if not self.streaming or video_key not in self.meta.video_keys:
+            super()._save_image(image, fpath)
+            return
+
+        episode_index = int(self.episode_buffer["episode_index"])
+        frame_index = int(self.episode_buffer["size"])
+        self._get_encoder(episode_index, video_key).put(frame_index, np.asarray(image))
+        if not self.running_stats and frame_index % self._stats_stride == 0:
+            super()._save_image(image, fpath)
+
+    def _get_encoder(self, episode_index: int, video_key: str) -> Encoder:
+        with self._encoders_lock:
+            encoder = self._encoders.get((episode_index, video_key))
+            if encoder is None:
+                # Same temporary location as lerobot's own encoding; _save_episode_video removes it
+                video_path = Path(tempfile.mkdtemp(dir=self.root)) / f"{video_key}_{episode_index:03d}.mp4"
+                container_options = FRAGMENTED_MP4 if self.journaling else None
+                if self._encoder_pool is not None:
+                    encoder = self._encoder_pool.open_stream(
+                        video_path, self.fps, container_options=container_options, **self._encoder_options
+                    )
+                else:
+                    encoder = StreamEncoder(
+                        video_path,
+                        self.fps,
+                        max_queue=self._encoder_queue_size,
+                        container_options=container_options,
+                        **self._encoder_options,
+                    )
+                self._encoders[(episode_index, video_key)] = encoder
+                if self.journaling:
+                    self._get_journal(episode_index).set_media(video_key, "video", video_path)
+            return encoder
+
+    def _pop_encoders(self, episode_index: int) -> Dict[str, Encoder]:
+        with self._encoders_lock:
+            keys = [key for key in self._encoders if key[0] == episode_index]
+            return {key[1]: self._encoders.pop(key) for key in keys}
+
+    # ------------------------ Saving ------------------------ #
+    def save_episode(self, episode_data: Optional[Dict] = None) -> None:
+        episode_buffer = episode_data if episode_data is not None else self.episode_buffer
+        episode_index = int(episode_buffer["episode_index"])
+        if self.spilling:
+            self._assemble_spilled_episode(episode_buffer)
+        if self.streaming:
+            self._prepare_streamed_episode(episode_buffer)
+        if self.running_stats:
+            stats = self._pop_episode_stats(episode_index)
+            if stats is None or stats.frames != int(episode_buffer["size"]):
+                counted = 0 if stats is None else stats.frames
+                raise RuntimeError(
+                    f"Episode {episode_index} has {episode_buffer['size']} frames but stats cover {counted}"
+                )
+            with use_episode_stats(stats.get_statistics()):
+                super().save_episode(episode_data=episode_data)
+        else:
+            super().save_episode(episode_data=episode_data)
+        if self.journaling:
+            journal = self._pop_journal(episode_index)
+            if journal is not None:
+                journal.remove()
+
+    def _assemble_spilled_episode(self, episode_buffer: Dict) -> None:
+        episode_index = int(episode_buffer["episode_index"])
+        with self._spills_lock:
+            spill = self._spills.pop(episode_index, None)
+        if spill is None:
+            return
+        try:
+            for key in spill.keys():
+                episode_buffer[key] = spill.read(key, episode_buffer[key])
+            for key in self.meta.camera_keys:
+                episode_buffer[key] = [
+                    str(self._get_image_file_path(episode_index, key, i)) for i in range(episode_buffer["size"])
+                ]
+        finally:
+            spill.remove()
+
+    def _prepare_streamed_episode(self, episode_buffer: Dict) -> None:
+        episode_index = int(episode_buffer["episode_index"])
+        episode_length = int(episode_buffer["size"])
+        stride = self._stats_stride
+        for video_key in self.meta.video_keys:
+            with self._encoders_lock:
+                encoder = self._encoders.get((episode_index, video_key))
+            if encoder is None or encoder.num_frames != episode_length:
+                streamed = 0 if encoder is None else encoder.num_frames
+                raise RuntimeError(
+                    f"Episode {episode_index} has {episode_length} frames but {streamed} were streamed for {video_key}"
+                )
+            if self.running_stats:
+                continue  # no PNGs were written and none are read
+            # Stats sample from the frames kept on disk: point each row at the nearest written PNG
+            paths = episode_buffer[video_key]
+            episode_buffer[video_key] = [paths[i - i % stride] for i in range(len(paths))]
+
+    def _encode_temporary_episode_video(self, video_key: str, episode_index: int) -> Path:
+        if not self.streaming:
+            return super()._encode_temporary_episode_video(video_key, episode_index)
+        with self._encoders_lock:
+            encoder = self._encoders.pop((episode_index, video_key), None)
+        if encoder is None:
+            raise RuntimeError(f"No streamed video for {video_key} in episode {episode_index}")
+        video_path = encoder.finish()
+        shutil.rmtree(self._get_image_file_dir(episode_index, video_key), ignore_errors=True)
+        return video_path
+
+    # ------------------------ Discarding ------------------------ #
+    def clear_episode_buffer(self, delete_images: bool = True) -> None:
+        if self.episode_buffer is not None and (
+            self.streaming or self.spilling or self.journaling or self.running_stats
+        ):
+            episode_index = self.episode_buffer["episode_index"]
+            if isinstance(episode_index, np.ndarray):
+                episode_index = episode_index.item() if episode_index.size == 1 else episode_index[0]
+            episode_index = int(episode_index)
+            if self.streaming:
+                for encoder in self._pop_encoders(episode_index).values():
+                    encoder.abort()
+            if self.spilling:
+                with self._spills_lock:
+                    spill = self._spills.pop(episode_index, None)
+                if spill is not None:
+                    spill.remove()
+            if self.journaling:
+                journal = self._pop_journal(episode_index)
+                if journal is not None:
+                    journal.remove()
+            if self.running_stats:
+                self._pop_episode_stats(episode_index)
+        super().clear_episode_buffer(delete_images=delete_images)
+
+    def finalize(self) -> None:
+        if self.streaming:
+            with self._encoders_lock:
+                leftovers = list(self._encoders.values())
+                self._encoders.clear()
+            for encoder in leftovers:
+                if self.journaling:
+                    # Unsaved episodes stay recoverable from their journal
+                    try:
+                        encoder.finish()
+                    except Exception as e:
+                        logger.info(f"====== [WARNING] Could not close {encoder.video_path.name}: {e} ======")
+                else:
+                    encoder.abort()
+            if self._encoder_pool is not None:
+                self._encoder_pool.close()
+                self._encoder_pool = None
+        if self.spilling:
+            with self._spills_lock:
+                leftovers = list(self._spills.values())
+                self._spills.clear()
+            for spill in leftovers:
+                spill.remove()
+        if self.journaling:
+            with self._journals_lock:
+                journals = list(self._journals.items())
+                self._journals.clear()
+            for episode_index, journal in journals:
+                journal.close()
+                logger.info(
+                    f"====== [JOURNAL] Episode {episode_index} was not saved; {journal.frames} frames kept in "
+                    f"{journal.directory}. Run tools-recover-episode to add it ======"
+                )
+        super().finalize()
@@ -0,0 +1,307 @@
+import json
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy.spatial.transform import Rotation as R
+
+from scripts.utils.episode_arrays import (
+    ActionFrameView,
+    action_frames,
+    ensure_local_dataset,
+    get_feature_names,
+    load_dataset_info,
+    load_episodes_table,
+    parse_episode_spec,
+    read_episode_columns,
+)
+
+# ------------------------ Logging Setup ------------------------ #
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+LATE_POLICIES = ("catch_up", "skip")
+LATE_TOLERANCE = 0.1  # a frame released more than this fraction of a period after its deadline counts as late
+SPIN_S = 0.002  # the last part of each wait is spun; time.sleep() can overshoot by about a millisecond
+BETWEEN_EPISODES = ("none", "settle", "home")
+JOINT_NAMES = [f"joint_{i}.pos" for i in range(1, 7)]
+TCP_POSE_NAMES = [f"tcp_pose.{axis}" for axis in ("x", "y", "z", "rx", "ry", "rz")]
+DELTA_NAMES = [f"delta_{axis}" for axis in ("x", "y", "z", "rx", "ry", "rz")]
+TARGET_MODES = ("live", "precomputed")
+
+
+# ------------------------ Waiting ------------------------ #
+def wait_until(deadline: float, spin_s: float = SPIN_S) -> None:
+    """Sleep until shortly before `deadline` (perf_counter time), then spin the rest."""
+    remaining = deadline - time.perf_counter()
+    if remaining > spin_s:
+        time.sleep(remaining - spin_s)
+    while time.perf_counter() < deadline:
+        pass
+
+
+# ------------------------ Scheduler ------------------------ #
+class ReplayScheduler:
+    """Paces replay on absolute deadlines: frame i is due at start + i / (fps * speed).
+
+    Because deadlines do not depend on when the previous frame finished, a
+    slow frame does not shift the ones after it and drift cannot build up.
+    A frame released after its deadline is handled by `late_policy`:
+
+    - "catch_up": send every frame; late ones go out immediately until the
+      schedule is met again
+    - "skip": jump to the frame that is due now, dropping the ones whose
+      deadline has already passed
+
+    Per-frame lateness is kept for report().
+    """
+
+    def __init__(self, fps: float, speed: float = 1.0, late_policy: str = "catch_up", spin_s: float = SPIN_S):
+        if speed <= 0:
+            raise ValueError(f"speed must be positive, got {speed}")
+        if late_policy not in LATE_POLICIES:
+            raise ValueError(f"Unknown late_policy {late_policy!r}, expected one of {LATE_POLICIES}")
+        self.fps = fps
+        self.speed = speed
+        self.period_s = 1.0 / (fps * speed)
+        self.late_policy = late_policy
+        self.spin_s = spin_s
+        self.sent: List[int] = []
+        self.lateness_s: List[float] = []
+        self.skipped: List[int] = []
+        self._start = 0.0
+        self._end = 0.0
+        self._cpu_s = 0.0
+
+    def frames(self, num_frames: int) -> Iterator[int]:
+        """Yield the frame indices to send, each at its deadline."""
+        self.sent, self.lateness_s, self.skipped = [], [], []
+        cpu_start = time.process_time()
+        self._start = time.perf_counter()
+        index = 0
+        try:
+            while index < num_frames:
+                deadline = self._start + index * self.period_s
+                now = time.perf_counter()
+                if now < deadline:
+                    wait_until(deadline, self.spin_s)
+                elif self.late_policy == "skip" and now - deadline >= self.period_s:
+                    due = min(int((now - self._start) / self.period_s), num_frames - 1)
+                    self.skipped.extend(range(index, due))
+                    index = due
+                    deadline = self._start + index * self.period_s
+                self.lateness_s.append(time.perf_counter() - deadline)
+                self.sent.append(index)
+                yield index
+                index += 1
+        finally:
+            # Also reached on close(), Ctrl+C or an exception, so report() covers the frames sent so far
+            self._end = time.perf_counter()
+            self._cpu_s = time.process_time() - cpu_start
+
+    def report(self) -> Dict[str, Any]:
+        """Summary plus per-frame lateness; drift is how late the last frame went out."""
+        lateness_ms = np.asarray(self.lateness_s if self.lateness_s else [0.0]) * 1e3
+        return {
+            "fps": self.fps,
+            "speed": self.speed,
+            "late_policy": self.late_policy,
+            "frames_sent": len(self.sent),
+            "frames_skipped": len(self.skipped),
+            "late_frames": int(np.sum(lateness_ms > LATE_TOLERANCE * self.period_s * 1e3)),
+            "lateness_p50_ms": round(float(np.percentile(lateness_ms, 50)), 3),
+            "lateness_p99_ms": round(float(np.percentile(lateness_ms, 99)), 3),
+            "lateness_max_ms": round(float(lateness_ms.max()), 3),
+            "drift_ms": round(float(lateness_ms[-1]), 3),
+            "duration_s": round(self._end - self._start, 4),
+            "cpu_s": round(self._cpu_s, 3),
+            "frames": [
+                {"frame_index": i, "lateness_ms": round(late, 3)} for i, late in zip(self.sent, lateness_ms.tolist())
+            ],
+            "skipped": list(self.skipped),
+        }
+
+    def log_report(self, title: str) -> Dict[str, Any]:
+        report = self.report()
+        logger.info(
+            f"====== [TIMING] {title}: {report['frames_sent']} frames at {self.speed:g}x, "
+            f"{report['frames_skipped']} skipped, lateness p50 {report['lateness_p50_ms']:.2f} ms / "
+            f"p99 {report['lateness_p99_ms']:.2f} ms / max {report['lateness_max_ms']:.2f} ms, "
+            f"drift {report['drift_ms']:+.1f} ms, cpu {report['cpu_s']:.2f} s of {report['duration_s']:.2f} s ======"
+        )
+        return report
+
+
+def write_replay_report(path: Path, reports: Dict[str, Any]) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(reports, f, indent=2)
+    return path
+
+
+# ------------------------ Absolute Targets ------------------------ #
+def absolute_tcp_targets(
+    states: np.ndarray,
+    state_names: Sequence[str],
+    actions: np.ndarray,
+    action_names: Sequence[str],
+    reference_frame: str,
+    tcp_offset: Sequence[float],
+    reference_ee_pose: Optional[Sequence[float]] = None,
+) -> np.ndarray:
+    """Rebuild the absolute TCP targets of a delta-action episode in one batched pass.
+
+    Each recorded delta was taken against the EE pose read just before it,
+    which the observation logs as tcp_pose (xyz + euler "xyz"). Composing the
+    two the way UR5e._target_pose_from_delta_action does gives every target
+    without the live pose. With reference_frame "tcp" the observed poses are
+    relative to the episode's reference pose, so `reference_ee_pose` (rotation
+    vector, base frame) anchors them at replay time. Returns (num_frames, 6)
+    TCP poses with rotation vectors, offset by `tcp_offset`.
+    """
+    missing = [name for name in (*TCP_POSE_NAMES, *DELTA_NAMES) if name not in (*state_names, *action_names)]
+    if missing:
+        raise ValueError(f"Precomputed targets need the recorded {', '.join(missing)}")
+    pose = states[:, [list(state_names).index(name) for name in TCP_POSE_NAMES]]
+    delta = actions[:, [list(action_names).index(name) for name in DELTA_NAMES]]
+
+    current_rotation = R.from_euler("xyz", pose[:, 3:])
+    delta_rotation = R.from_euler("xyz", delta[:, 3:])
+    if reference_frame == "base":
+        position = pose[:, :3] + delta[:, :3]
+        rotation = delta_rotation * current_rotation
+    elif reference_frame == "tcp":
+        position = pose[:, :3] + current_rotation.apply(delta[:, :3])
+        rotation = current_rotation * delta_rotation
+        if reference_ee_pose is None:
+            raise ValueError("reference_frame 'tcp' needs the episode reference EE pose")
+        reference_rotation = R.from_rotvec(np.asarray(reference_ee_pose[3:], dtype=float))
+        position = np.asarray(reference_ee_pose[:3], dtype=float) + reference_rotation.apply(position)
+        rotation = reference_rotation * rotation
+    else:
+        raise ValueError(f"Unsupported reference_frame: {reference_frame}")
+
+    # EE to TCP: T_tcp = T_ee @ T_offset
+    offset = np.asarray(tcp_offset, dtype=float)
+    position = position + rotation.apply(offset[:3])
+    rotation = rotation * R.from_rotvec(offset[3:])
+    return np.concatenate([position, rotation.as_rotvec()], axis=1)
+
+
+def pose_distance(pose_a: Sequence[float], pose_b: Sequence[float]) -> Tuple[float, float]:
+    """Translation (m) and rotation angle (rad) between two [x, y, z, rx, ry, rz] rotation-vector poses."""
+    pose_a = np.asarray(pose_a, dtype=float)
+    pose_b = np.asarray(pose_b, dtype=float)
+    rotation = R.from_rotvec(pose_b[3:]) * R.from_rotvec(pose_a[3:]).inv()
+    return float(np.linalg.norm(pose_b[:3] - pose_a[:3])), float(rotation.magnitude())
+
+
+# ------------------------ Playlist ------------------------ #
+@dataclass
+class ReplayEpisode:
+    dataset_name: str
+    episode_index: int
+    fps: float
+    actions: np.ndarray
+    action_names: List[str]
+    frames: List[ActionFrameView]
+    states: Optional[np.ndarray]  # recorded observation.state, if the dataset has it
+    state_names: List[str]
+    start_joints: Optional[np.ndarray]  # recorded joint positions of the first frame, if the dataset has them
+    load_s: float
+
+
+class EpisodeLoader:
+    """Loads episode actions straight from the dataset parquet files.
+
+    Dataset metadata is read once per dataset and reused for every episode
+    of it in a playlist. Datasets missing locally are fetched from the hub
+    through LeRobotDataset.
+    """
+
+    def __init__(self):
+        self._meta: Dict[str, Tuple[Path, dict, Dict[str, np.ndarray]]] = {}
+
+    def metadata(self, dataset_name: str) -> Tuple[Path, dict, Dict[str, np.ndarray]]:
+        if dataset_name not in self._meta:
+            root = ensure_local_dataset(dataset_name)
+            self._meta[dataset_name] = (root, load_dataset_info(root), load_episodes_table(root))
+        return self._meta[dataset_name]
+
+    def expand(self, entries: Sequence[Tuple[str, Any]]) -> List[Tuple[str, int]]:
+        """Resolve (dataset_name, episode spec) entries into (dataset_name, episode_index) pairs."""
+        playlist = []
+        for dataset_name, spec in entries:
+            indices = parse_episode_spec(spec)
+            if indices is None:
+                indices = self.metadata(dataset_name)[2]["episode_index"].astype(int).tolist()
+            playlist.extend((dataset_name, index) for index in indices)
+        return playlist
+
+    def load(self, dataset_name: str, episode_index: int, key: str = "action") -> ReplayEpisode:
+        start = time.perf_counter()
+        root, info, episodes = self.metadata(dataset_name)
+        features = info["features"]
+        columns = [key]
+        state_names: List[str] = []
+        if "observation.state" in features:
+            columns.append("observation.state")
+            state_names = get_feature_names(features, "observation.state")
+
+        arrays = read_episode_columns(root, episode_index, columns, info=info, episodes=episodes)
+        actions = np.ascontiguousarray(arrays[key], dtype=np.float64)
+        action_names = get_feature_names(features, key)
+        states = arrays["observation.state"].astype(np.float64) if state_names else None
+        start_joints = None
+        if states is not None and len(states) and all(name in state_names for name in JOINT_NAMES):
+            start_joints = states[0, [state_names.index(name) for name in JOINT_NAMES]]
+        return ReplayEpisode(
+            dataset_name=dataset_name,
+            episode_index=episode_index,
+            fps=info["fps"],
+            actions=actions,
+            action_names=action_names,
+            frames=action_frames(actions, action_names),
+            states=states,
+            state_names=state_names,
+            start_joints=start_joints,
+            load_s=time.perf_counter() - start,
+        )
+
+
+class EpisodePrefetcher:
+    """Iterates a playlist, loading the next episode on a background thread while the current one plays.
+
+    Reading parquet spends most of its time outside the GIL, so the load
+    overlaps the replay loop instead of sitting between episodes.
+    """
+
+    def __init__(self, loader: EpisodeLoader, playlist: Sequence[Tuple[str, int]]):
+        self.loader = loader
+        self.playlist = list(playlist)
+        self.wait_s: List[float] = []  # time spent blocked on each episode's load
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="replay-prefetch")
+
+    def _submit(self, position: int) -> Optional[Future]:
+        if position >= len(self.playlist):
+            return None
+        return self._executor.submit(self.loader.load, *self.playlist[position])
+
+    def __iter__(self) -> Iterator[ReplayEpisode]:
+        pending = self._submit(0)
+        try:
+            for position in range(len(self.playlist)):
+                start = time.perf_counter()
+                episode = pending.result()
+                self.wait_s.append(time.perf_counter() - start)
+                pending = self._submit(position + 1)
+                yield episode
+        finally:
+            if pending is not None:
+                pending.cancel()
+            self._executor.shutdown(wait=False)
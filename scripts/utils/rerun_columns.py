@@ -0,0 +1,94 @@
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+import rerun as rr
+
+# Per-frame scalar columns logged under their own name, as lerobot's visualize_dataset does
+FLAG_KEYS = ("next.done", "next.reward", "next.success")
+
+
+def episode_time_columns(frame_index: np.ndarray, timestamp: np.ndarray) -> List[rr.TimeColumn]:
+    """The frame_index and timestamp timelines the per-frame logging used, as columns."""
+    return [
+        rr.TimeColumn("frame_index", sequence=np.asarray(frame_index, dtype=np.int64)),
+        rr.TimeColumn("timestamp", timestamp=np.asarray(timestamp, dtype=np.float64)),
+    ]
+
+
+def send_scalar_columns(prefix: str, values: np.ndarray, names: Sequence[str], indexes: List[rr.TimeColumn]) -> int:
+    """Send every dimension of a (num_frames, D) array as `prefix/name` in one call each; returns the call count."""
+    values = np.asarray(values, dtype=np.float64).reshape(len(values), -1)
+    for dim, name in enumerate(names):
+        rr.send_columns(f"{prefix}/{name}", indexes=indexes, columns=rr.Scalars.columns(scalars=values[:, dim]))
+    return len(names)
+
+
+def log_episode_scalars(arrays: Dict[str, np.ndarray], names: Dict[str, Sequence[str]]) -> int:
+    """Log an episode's scalar series with rerun's columnar API.
+
+    `arrays` holds frame_index, timestamp and any of the vector features in
+    `names` (e.g. action, observation.state) or FLAG_KEYS, all ordered by
+    frame. Entity paths and timelines match the per-frame rr.log layout, but
+    the number of calls depends on the number of dimensions, not frames.
+    """
+    indexes = episode_time_columns(arrays["frame_index"], arrays["timestamp"])
+    calls = 0
+    for key, key_names in names.items():
+        if key in arrays:
+            calls += send_scalar_columns(key, arrays[key], key_names, indexes)
+    for key in FLAG_KEYS:
+        if key in arrays:
+            values = np.asarray(arrays[key], dtype=np.float64).reshape(-1)
+            rr.send_columns(key, indexes=indexes, columns=rr.Scalars.columns(scalars=values))
+            calls += 1
+    return calls
+
+
+def log_video_asset(
+    entity: str,
+    video_path: Path | str,
+    frame_index: np.ndarray,
+    timestamp: np.ndarray,
+    from_timestamp: float = 0.0,
+) -> None:
+    """Log an mp4 as a static rr.AssetVideo and point each frame at its time in the file.
+
+    Frame i shows the video at `from_timestamp + timestamp[i]`, the same
+    time lerobot decodes it at, so the viewer decodes on demand and nothing
+    is decoded or converted here.
+    """
+    rr.log(entity, rr.AssetVideo(path=video_path), static=True)
+    video_ns = np.round((from_timestamp + np.asarray(timestamp, dtype=np.float64)) * 1e9).astype(np.int64)
+    rr.send_columns(
+        entity,
+        indexes=episode_time_columns(frame_index, timestamp),
+        columns=rr.VideoFrameReference.columns_nanos(video_ns),
+    )
+
+
+def log_episode_comparison(
+    key: str,
+    names: Sequence[str],
+    aligned: np.ndarray,
+    mean: np.ndarray,
+    std: np.ndarray,
+    labels: Sequence[str],
+) -> int:
+    """Overlay aligned episodes of one feature with their mean and mean ± std band.
+
+    `aligned` is (num_episodes, num_points, D); every dimension becomes one
+    `compare/key/name` entity holding a series per episode plus mean and the
+    two band edges, all sent in one call on the "progress" timeline.
+    """
+    num_episodes, num_points, _ = aligned.shape
+    indexes = [rr.TimeColumn("progress", sequence=np.arange(num_points, dtype=np.int64))]
+    series_names = [*labels, "mean", "mean - std", "mean + std"]
+    colors = [[120, 150, 190, 140]] * num_episodes + [[20, 60, 120, 255], [230, 120, 40, 200], [230, 120, 40, 200]]
+    widths = [1.0] * num_episodes + [3.0, 1.5, 1.5]
+    for dim, name in enumerate(names):
+        entity = f"compare/{key}/{name}"
+        values = np.column_stack([aligned[:, :, dim].T, mean[:, dim], mean[:, dim] - std[:, dim], mean[:, dim] + std[:, dim]])
+        rr.log(entity, rr.SeriesLines(names=series_names, colors=colors, widths=widths), static=True)
+        rr.send_columns(entity, indexes=indexes, columns=rr.Scalars.columns(scalars=values))
+    return len(names)
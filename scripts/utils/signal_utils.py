@@ -0,0 +1,249 @@
+from statistics import NormalDist
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+
+# ------------------------ Stream Alignment ------------------------ #
+def resample_streams(
+    t_a: np.ndarray,
+    x_a: np.ndarray,
+    t_b: np.ndarray,
+    x_b: np.ndarray,
+    rate_hz: float,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Linearly resample two time-stamped streams onto a shared uniform grid.
+
+    Only the time span covered by both streams is kept. `x_a`/`x_b` are
+    (N, D) arrays; the result is (grid, x_a_on_grid, x_b_on_grid).
+    """
+    t_a = np.asarray(t_a, dtype=float)
+    t_b = np.asarray(t_b, dtype=float)
+    x_a = np.asarray(x_a, dtype=float).reshape(len(t_a), -1)
+    x_b = np.asarray(x_b, dtype=float).reshape(len(t_b), -1)
+
+    t_start = max(t_a[0], t_b[0])
+    t_end = min(t_a[-1], t_b[-1])
+    if t_end <= t_start:
+        raise ValueError("The two streams do not overlap in time.")
+
+    grid = np.arange(t_start, t_end, 1.0 / rate_hz)
+    a_on_grid = np.empty((len(grid), x_a.shape[1]), dtype=float)
+    b_on_grid = np.empty((len(grid), x_b.shape[1]), dtype=float)
+    for j in range(x_a.shape[1]):
+        a_on_grid[:, j] = np.interp(grid, t_a, x_a[:, j])
+    for j in range(x_b.shape[1]):
+        b_on_grid[:, j] = np.interp(grid, t_b, x_b[:, j])
+    return grid, a_on_grid, b_on_grid
+
+
+# ------------------------ Robust Estimation ------------------------ #
+def huber_location(
+    residuals: np.ndarray,
+    k: float = 1.345,
+    max_iter: int = 50,
+    tol: float = 1e-9,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Column-wise Huber M-estimate of location via IRLS.
+
+    Returns (location, scale) with scale taken from the MAD of each column.
+    """
+    r = np.asarray(residuals, dtype=float).reshape(len(residuals), -1)
+    location = np.median(r, axis=0)
+    scale = 1.4826 * np.median(np.abs(r - location), axis=0)
+    scale = np.where(scale > 0, scale, 1e-12)
+
+    for _ in range(max_iter):
+        u = np.abs(r - location) / (k * scale)
+        weights = np.minimum(1.0, 1.0 / np.maximum(u, 1e-12))
+        new_location = np.sum(weights * r, axis=0) / np.sum(weights, axis=0)
+        if np.all(np.abs(new_location - location) <= tol * (1.0 + np.abs(location))):
+            location = new_location
+            break
+        location = new_location
+
+    return location, scale
+
+
+def effective_sample_size(residuals: np.ndarray) -> np.ndarray:
+    """Column-wise sample size corrected for lag-1 autocorrelation."""
+    r = np.asarray(residuals, dtype=float).reshape(len(residuals), -1)
+    n = r.shape[0]
+    centered = r - r.mean(axis=0)
+    denom = np.sum(centered * centered, axis=0)
+    rho = np.sum(centered[1:] * centered[:-1], axis=0) / np.where(denom > 0, denom, 1.0)
+    rho = np.clip(rho, 0.0, 0.999)
+    return np.maximum(n * (1.0 - rho) / (1.0 + rho), 1.0)
+
+
+def huber_location_ci(
+    residuals: np.ndarray,
+    confidence: float = 0.95,
+    k: float = 1.345,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Huber location per column with an asymptotic confidence half-width.
+
+    The standard error uses the Huber sandwich variance and an effective
+    sample size, since densely sampled residuals are strongly autocorrelated.
+    Returns (location, half_width, effective_n).
+    """
+    r = np.asarray(residuals, dtype=float).reshape(len(residuals), -1)
+    location, scale = huber_location(r, k=k)
+
+    u = (r - location) / scale
+    psi = np.clip(u, -k, k)
+    d_psi = (np.abs(u) <= k).astype(float)
+    mean_d_psi = np.maximum(d_psi.mean(axis=0), 1e-12)
+    variance = scale**2 * np.mean(psi * psi, axis=0) / mean_d_psi**2
+
+    n_eff = effective_sample_size(r)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2.0)
+    half_width = z * np.sqrt(variance / n_eff)
+    return location, half_width, n_eff
+
+
+# ------------------------ Lagged Linear Fit ------------------------ #
+def refine_peak(values: np.ndarray, index: np.ndarray) -> np.ndarray:
+    """Sub-sample position of per-column extrema by parabolic interpolation.
+
+    `values` is (num_lags, D) and `index` holds the integer extremum of each
+    column; edges are returned unchanged.
+    """
+    index = np.asarray(index)
+    cols = np.arange(values.shape[1])
+    refined = index.astype(float)
+    inner = (index > 0) & (index < values.shape[0] - 1)
+    if np.any(inner):
+        i = index[inner]
+        c = cols[inner]
+        left, mid, right = values[i - 1, c], values[i, c], values[i + 1, c]
+        denom = left - 2.0 * mid + right
+        shift = np.where(np.abs(denom) > 1e-15, 0.5 * (left - right) / np.where(denom != 0, denom, 1.0), 0.0)
+        refined[inner] = i + np.clip(shift, -0.5, 0.5)
+    return refined
+
+
+def fit_linear_with_lag(
+    x_segments: List[np.ndarray],
+    y_segments: List[np.ndarray],
+    max_lag: int,
+) -> Dict[str, np.ndarray]:
+    """Fit y[t + lag] = scale * x[t] + offset per column over several segments.
+
+    Every integer lag in [0, max_lag] is fitted by closed-form least squares
+    across all segments at once; each column keeps the lag with the lowest
+    mean squared residual. `unit_offset` is the offset when the scale is
+    fixed to 1, and `lag` is refined to a sub-sample value.
+    """
+    num_cols = x_segments[0].shape[1]
+    num_lags = max_lag + 1
+    mse = np.full((num_lags, num_cols), np.inf)
+    scale = np.zeros((num_lags, num_cols))
+    offset = np.zeros((num_lags, num_cols))
+    unit_offset = np.zeros((num_lags, num_cols))
+    unit_rms = np.zeros((num_lags, num_cols))
+    num_samples = np.zeros(num_lags, dtype=int)
+
+    for lag in range(num_lags):
+        pairs = [(xs[: len(xs) - lag], ys[lag:]) for xs, ys in zip(x_segments, y_segments) if len(xs) > lag + 1]
+        if not pairs:
+            break
+        x = np.concatenate([p[0] for p in pairs])
+        y = np.concatenate([p[1] for p in pairs])
+        x_mean = x.mean(axis=0)
+        y_mean = y.mean(axis=0)
+        dx = x - x_mean
+        dy = y - y_mean
+        var_x = np.mean(dx * dx, axis=0)
+        cov_xy = np.mean(dx * dy, axis=0)
+        scale[lag] = np.where(var_x > 1e-12, cov_xy / np.where(var_x > 1e-12, var_x, 1.0), 1.0)
+        offset[lag] = y_mean - scale[lag] * x_mean
+        residual = y - (scale[lag] * x + offset[lag])
+        mse[lag] = np.mean(residual * residual, axis=0)
+        diff = y - x
+        unit_offset[lag] = diff.mean(axis=0)
+        unit_rms[lag] = np.sqrt(np.mean((diff - unit_offset[lag]) ** 2, axis=0))
+        num_samples[lag] = len(x)
+
+    best = np.argmin(mse, axis=0)
+    cols = np.arange(num_cols)
+    finite_mse = np.where(np.isfinite(mse), mse, np.nanmax(np.where(np.isfinite(mse), mse, np.nan)))
+    return {
+        "lag": refine_peak(-finite_mse, best),
+        "lag_frames": best,
+        "scale": scale[best, cols],
+        "offset": offset[best, cols],
+        "rms": np.sqrt(mse[best, cols]),
+        "unit_offset": unit_offset[best, cols],
+        "unit_rms": unit_rms[best, cols],
+        "num_samples": num_samples[best],
+    }
+
+
+# ------------------------ Cross-Correlation ------------------------ #
+def estimate_lag_xcorr(x: np.ndarray, y: np.ndarray, max_lag: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-column lag (in samples) by which `y` trails `x`.
+
+    Uses the normalized FFT cross-correlation over lags in [-max_lag, max_lag]
+    with parabolic peak refinement. Returns (lag, peak_correlation).
+    """
+    x = np.asarray(x, dtype=float).reshape(len(x), -1)
+    y = np.asarray(y, dtype=float).reshape(len(y), -1)
+    x = x - x.mean(axis=0)
+    y = y - y.mean(axis=0)
+    n = len(x)
+    max_lag = min(max_lag, n - 1)
+    nfft = 1 << int(np.ceil(np.log2(2 * n)))
+
+    spectrum = np.conj(np.fft.rfft(x, nfft, axis=0)) * np.fft.rfft(y, nfft, axis=0)
+    corr = np.fft.irfft(spectrum, nfft, axis=0)
+    corr = np.concatenate([corr[nfft - max_lag:], corr[: max_lag + 1]], axis=0)
+    norm = np.sqrt(np.sum(x * x, axis=0) * np.sum(y * y, axis=0))
+    corr = corr / np.where(norm > 0, norm, 1.0)
+
+    best = np.argmax(corr, axis=0)
+    lag = refine_peak(corr, best) - max_lag
+    return lag, corr[best, np.arange(corr.shape[1])]
+
+
+def estimate_lag_segments(
+    x_segments: List[np.ndarray],
+    y_segments: List[np.ndarray],
+    max_lag: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-column lag (in samples) by which `y` trails `x`, pooled over contiguous segments.
+
+    Each lag's correlation only sums the samples that overlap at that lag,
+    within each segment, and is normalized by the energy of those same
+    samples, so neither the zero padding nor the gaps between segments pull
+    the peak toward 0. Pass velocities rather than positions: slow position
+    signals correlate almost equally at every small lag. Returns
+    (lag, peak_correlation); columns with no overlap give NaN.
+    """
+    x_segments = [np.asarray(xs, dtype=float).reshape(len(xs), -1) for xs in x_segments]
+    y_segments = [np.asarray(ys, dtype=float).reshape(len(ys), -1) for ys in y_segments]
+    num_cols = x_segments[0].shape[1]
+    x_mean = np.concatenate(x_segments).mean(axis=0)
+    y_mean = np.concatenate(y_segments).mean(axis=0)
+
+    lags = np.arange(-max_lag, max_lag + 1)
+    sxy = np.zeros((len(lags), num_cols))
+    sxx = np.zeros((len(lags), num_cols))
+    syy = np.zeros((len(lags), num_cols))
+    for xs, ys in zip(x_segments, y_segments):
+        xs, ys = xs - x_mean, ys - y_mean
+        n = len(xs)
+        for k, lag in enumerate(lags):
+            if abs(lag) >= n - 1:
+                continue
+            a, b = (xs[: n - lag], ys[lag:]) if lag >= 0 else (xs[-lag:], ys[: n + lag])
+            sxy[k] += np.sum(a * b, axis=0)
+            sxx[k] += np.sum(a * a, axis=0)
+            syy[k] += np.sum(b * b, axis=0)
+
+    norm = np.sqrt(sxx * syy)
+    corr = np.where(norm > 0, sxy / np.where(norm > 0, norm, 1.0), -np.inf)
+    best = np.argmax(corr, axis=0)
+    peak = corr[best, np.arange(num_cols)]
+    lag = refine_peak(np.where(np.isfinite(corr), corr, -1.0), best) - max_lag
+    return np.where(np.isfinite(peak), lag, np.nan), np.where(np.isfinite(peak), peak, np.nan)
@@ -0,0 +1,47 @@
+import time
+from threading import Event, Thread
+from typing import Callable, Tuple
+
+import numpy as np
+
+
+class JointStreamRecorder:
+    """Sample a joint reader at a fixed rate in a background thread.
+
+    Each sample is stamped with the midpoint of the read call, so streams from
+    different devices can be aligned afterwards.
+    """
+
+    def __init__(self, read_fn: Callable[[], np.ndarray], rate_hz: float, max_samples: int, num_joints: int = 6):
+        self._read_fn = read_fn
+        self._period = 1.0 / rate_hz
+        self._times = np.empty(max_samples, dtype=float)
+        self._joints = np.empty((max_samples, num_joints), dtype=float)
+        self._count = 0
+        self._stop = Event()
+        self._thread = Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Tuple[np.ndarray, np.ndarray]:
+        self._stop.set()
+        self._thread.join()
+        return self._times[: self._count].copy(), self._joints[: self._count].copy()
+
+    def _run(self) -> None:
+        next_tick = time.perf_counter()
+        while not self._stop.is_set() and self._count < len(self._times):
+            t_before = time.perf_counter()
+            joints = self._read_fn()
+            t_after = time.perf_counter()
+            self._times[self._count] = 0.5 * (t_before + t_after)
+            self._joints[self._count] = joints
+            self._count += 1
+
+            next_tick += self._period
+            sleep_s = next_tick - time.perf_counter()
+            if sleep_s > 0:
+                time.sleep(sleep_s)
+            else:
+                next_tick = time.perf_counter()
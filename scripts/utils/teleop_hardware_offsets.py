@@ -1,12 +1,16 @@
 from pathlib import Path
 from typing import Any, Dict, List
+import argparse
 import logging
+import time
 
 import numpy as np
 import yaml
 from rtde_receive import RTDEReceiveInterface
 
 from lerobot_teleoperator_ur5e.dynamixel import DynamixelDriver
+from scripts.utils.signal_utils import huber_location_ci, resample_streams
+from scripts.utils.stream_recorder import JointStreamRecorder
 
 np.set_printoptions(suppress=True)
 
@@ -17,6 +21,9 @@ logger = logging.getLogger(__name__)
 
 JOINT_NAMES = ["first", "second", "third", "fourth", "fifth", "sixth"]
 
+# Joints that move less than this during a streaming pass get a warning.
+MIN_STREAM_MOTION_DEG = 5.0
+
 
 # ------------------------ Config Loader ------------------------ #
 class RecordConfig:
@@ -116,15 +123,143 @@ def compute_hardware_offsets(cfg: RecordConfig) -> List[float]:
             rtde_r.disconnect()
 
 
-def run(record_cfg: RecordConfig) -> List[float]:
+# ------------------------ Streaming Calibration ------------------------ #
+def fit_streaming_offsets(
+    ur5e_t: np.ndarray,
+    ur5e_rad: np.ndarray,
+    dxl_t: np.ndarray,
+    dxl_rad: np.ndarray,
+    joint_signs: List[int],
+    rate_hz: float,
+    confidence: float = 0.95,
+) -> Dict[str, np.ndarray]:
+    """Fit per-joint hardware offsets (deg) from two time-stamped streams.
+
+    Both streams are resampled onto a shared grid, and the per-sample offsets
+    `joint_sign * UR5e deg - Dynamixel deg` are reduced with a Huber estimate.
+    """
+    _, ur5e_grid, dxl_grid = resample_streams(ur5e_t, ur5e_rad, dxl_t, dxl_rad, rate_hz)
+    signs = np.asarray(joint_signs, dtype=float)
+    ur5e_deg = np.rad2deg(ur5e_grid)
+    dxl_deg = np.rad2deg(dxl_grid)
+    residuals = signs * ur5e_deg - dxl_deg
+    offsets, half_width, n_eff = huber_location_ci(residuals, confidence=confidence)
+    return {
+        "offsets": offsets,
+        "half_width": half_width,
+        "n_eff": n_eff,
+        "num_samples": np.full(6, len(residuals)),
+        "motion_deg": np.ptp(ur5e_deg, axis=0),
+    }
+
+
+def compute_hardware_offsets_streaming(
+    cfg: RecordConfig,
+    duration_s: float = 20.0,
+    rate_hz: float = 200.0,
+    confidence: float = 0.95,
+) -> List[float]:
+    """Compute hardware_offsets from one continuous pass over all joints.
+
+    Both arms are sampled while the operator moves them together, then every
+    joint offset is fitted at once with a confidence interval.
+    """
+    logger.info("Connecting to UR5e...")
+    rtde_r = RTDEReceiveInterface(cfg.robot_ip)
+    logger.info("UR5e connected.")
+
+    logger.info("Connecting to Dynamixel master arm...")
+    driver = DynamixelDriver(
+        cfg.joint_ids,
+        port=cfg.port,
+        baudrate=57600,
+        use_fake_fallback=False,
+    )
+    logger.info("Dynamixel connected.\n")
+
+    try:
+        for _ in range(10):
+            driver.get_joints()
+
+        max_samples = int(duration_s * rate_hz) + 1
+        ur5e_recorder = JointStreamRecorder(lambda: get_ur5e_raw_joints(rtde_r), rate_hz, max_samples)
+        dxl_recorder = JointStreamRecorder(lambda: get_dynamixel_raw_joints(driver), rate_hz, max_samples)
+
+        logger.info("Streaming hardware offset calibration.")
+        logger.info("Move master and slave together through a comfortable range on every joint.")
+        logger.info("Formula: offset = joint_sign * UR5e raw deg - Dynamixel raw deg\n")
+        input(f"Press Enter to start sampling for {duration_s:.0f} s at {rate_hz:.0f} Hz...")
+
+        ur5e_recorder.start()
+        dxl_recorder.start()
+        try:
+            time.sleep(duration_s)
+        finally:
+            ur5e_t, ur5e_rad = ur5e_recorder.stop()
+            dxl_t, dxl_rad = dxl_recorder.stop()
+
+        logger.info("Collected %d UR5e and %d Dynamixel samples.\n", len(ur5e_t), len(dxl_t))
+        fit = fit_streaming_offsets(
+            ur5e_t, ur5e_rad, dxl_t, dxl_rad, cfg.joint_signs, rate_hz, confidence=confidence
+        )
+
+        hardware_offsets: List[float] = []
+        for i in range(6):
+            rounded_offset = round(float(fit["offsets"][i]), 3)
+            hardware_offsets.append(rounded_offset)
+            logger.info(
+                "Joint %d (%s): offset %.3f deg, %d%% CI +/- %.3f deg (n=%d, n_eff=%.0f, motion %.1f deg)",
+                i + 1,
+                JOINT_NAMES[i],
+                rounded_offset,
+                round(confidence * 100),
+                fit["half_width"][i],
+                fit["num_samples"][i],
+                fit["n_eff"][i],
+                fit["motion_deg"][i],
+            )
+            if fit["motion_deg"][i] < MIN_STREAM_MOTION_DEG:
+                logger.warning(
+                    "Joint %d moved only %.1f deg; move it further for a more reliable offset.",
+                    i + 1,
+                    fit["motion_deg"][i],
+                )
+
+        logger.info("\nhardware_offsets: %s", hardware_offsets)
+        return hardware_offsets
+    finally:
+        driver.close()
+        if hasattr(rtde_r, "disconnect"):
+            rtde_r.disconnect()
+
+
+def run(record_cfg: RecordConfig, args: argparse.Namespace | None = None) -> List[float]:
+    if args is not None and args.stream:
+        return compute_hardware_offsets_streaming(
+            record_cfg,
+            duration_s=args.duration,
+            rate_hz=args.rate,
+            confidence=args.confidence,
+        )
     return compute_hardware_offsets(record_cfg)
 
 
 # ------------------------ Main ------------------------ #
 def main():
+    parser = argparse.ArgumentParser(description="Compute hardware offsets between UR5e and Dynamixel joints")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Sample both arms continuously while moving them together instead of one joint per prompt.",
+    )
+    parser.add_argument("--duration", type=float, default=20.0, help="Streaming sample duration in seconds.")
+    parser.add_argument("--rate", type=float, default=200.0, help="Streaming sample rate in Hz.")
+    parser.add_argument("--confidence", type=float, default=0.95, help="Confidence level of the printed intervals.")
+    args = parser.parse_args()
+
     parent_path = Path(__file__).resolve().parent
     cfg_path = parent_path.parent / "config" / "cfg.yaml"
     with open(cfg_path, "r") as f:
         cfg = yaml.safe_load(f)
     record_cfg = RecordConfig(cfg["record"])
-    run(record_cfg)
+    run(record_cfg, args)
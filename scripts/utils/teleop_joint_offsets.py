@@ -29,14 +29,18 @@ def get_start_joints(cfg) -> List[float]:
         return []
 
 # ------------------------ Offset Calculation ------------------------ #
-def compute_joint_offsets(cfg, start_joints: List[float]):
-    """Compute offsets for Dynamixel joints to match the UR5e joint positions."""
-    
-    dxl_ids = list(cfg.joint_ids)
-    if cfg.use_gripper and cfg.gripper_config is not None:
-        dxl_ids.append(cfg.gripper_config[0])
+def compute_joint_offsets(cfg, start_joints: List[float], driver=None):
+    """Compute offsets for Dynamixel joints to match the UR5e joint positions.
+
+    An already open driver (e.g. the teleop's) can be passed in; it is left open.
+    """
+    own_driver = driver is None
+    if own_driver:
+        dxl_ids = list(cfg.joint_ids)
+        if cfg.use_gripper and cfg.gripper_config is not None:
+            dxl_ids.append(cfg.gripper_config[0])
 
-    driver = DynamixelDriver(dxl_ids, port=cfg.port, baudrate=57600)
+        driver = DynamixelDriver(dxl_ids, port=cfg.port, baudrate=57600)
 
     # Warmup reads
     for _ in range(10):
@@ -62,7 +66,8 @@ def compute_joint_offsets(cfg, start_joints: List[float]):
         )
 
     # Close driver
-    driver.close()
+    if own_driver:
+        driver.close()
 
     best_offsets = []
     
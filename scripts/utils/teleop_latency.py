@@ -0,0 +1,359 @@
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, Tuple
+import argparse
+import json
+import logging
+import time
+
+import numpy as np
+import yaml
+
+from scripts.utils.signal_utils import estimate_lag_xcorr, resample_streams
+from scripts.utils.stream_recorder import JointStreamRecorder
+
+np.set_printoptions(suppress=True)
+
+# ------------------------ Logging Setup ------------------------ #
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+
+JOINT_KEYS = [f"joint_{i}.pos" for i in range(1, 7)]
+
+# Joints whose velocity correlation peak is below this are left out of the summary.
+MIN_CORRELATION = 0.5
+
+
+# ------------------------ Fake Stand-ins ------------------------ #
+class FakeLeaderArm:
+    """Leader stand-in making sharp smoothed steps on every joint.
+
+    Reads go through a serial cache that refreshes every `serial_period_s`,
+    like the DynamixelDriver background reader.
+    """
+
+    def __init__(
+        self,
+        duration_s: float,
+        serial_period_s: float = 0.01,
+        read_duration_s: float = 0.004,
+        step_interval_s: float = 1.2,
+        ramp_s: float = 0.12,
+        seed: int = 0,
+    ):
+        rng = np.random.default_rng(seed)
+        num_steps = int(duration_s / step_interval_s) + 2
+        self._step_times = (
+            np.arange(num_steps)[:, None] * step_interval_s
+            + rng.uniform(0.2, 0.6, size=(num_steps, 6))
+        )
+        self._step_sizes = rng.choice([-1.0, 1.0], size=(num_steps, 6)) * rng.uniform(0.15, 0.35, size=(num_steps, 6))
+        self._ramp_s = ramp_s
+        self._serial_period_s = serial_period_s
+        self._read_duration_s = read_duration_s
+        self._t0 = time.perf_counter()
+
+    def position(self, t: float) -> np.ndarray:
+        s = np.clip((t - self._t0 - self._step_times) / self._ramp_s, 0.0, 1.0)
+        smooth = s * s * (3.0 - 2.0 * s)
+        return np.sum(self._step_sizes * smooth, axis=0)
+
+    def get_read_timing(self) -> Tuple[float, float]:
+        now = time.perf_counter()
+        stamp = self._t0 + np.floor((now - self._t0) / self._serial_period_s) * self._serial_period_s
+        return float(stamp), self._read_duration_s
+
+    def get_joint_state(self) -> np.ndarray:
+        stamp, read_duration = self.get_read_timing()
+        return self.position(stamp - 0.5 * read_duration)
+
+
+class FakeFollowerArm:
+    """Follower stand-in tracking commands with a dead time and a first-order lag."""
+
+    def __init__(self, delay_s: float = 0.03, tau_s: float = 0.02):
+        self.delay_s = delay_s
+        self.tau_s = tau_s
+        self._lock = Lock()
+        self._pending = []
+        self._state = np.zeros(6)
+        self._target = np.zeros(6)
+        self._t = time.perf_counter()
+
+    def command(self, joints: np.ndarray) -> None:
+        with self._lock:
+            self._pending.append((time.perf_counter() + self.delay_s, np.array(joints, dtype=float)))
+
+    def _advance(self, t: float) -> None:
+        dt = t - self._t
+        if dt > 0:
+            self._state += (self._target - self._state) * (1.0 - np.exp(-dt / self.tau_s))
+            self._t = t
+
+    def getActualQ(self) -> list[float]:
+        now = time.perf_counter()
+        with self._lock:
+            while self._pending and self._pending[0][0] <= now:
+                t_apply, target = self._pending.pop(0)
+                self._advance(t_apply)
+                self._target = target
+            self._advance(now)
+            return self._state.tolist()
+
+
+class FakeTeleop:
+    def __init__(self, leader: FakeLeaderArm, compute_s: float = 0.002):
+        self._leader = leader
+        self._compute_s = compute_s
+
+    def get_action(self) -> Dict[str, float]:
+        joints = self._leader.get_joint_state()
+        time.sleep(self._compute_s)
+        return {key: float(joints[i]) for i, key in enumerate(JOINT_KEYS)}
+
+
+class FakeRobot:
+    def __init__(self, follower: FakeFollowerArm, send_s: float = 0.003):
+        self._follower = follower
+        self._send_s = send_s
+
+    def send_action(self, action: Dict[str, float]) -> Dict[str, float]:
+        time.sleep(self._send_s)
+        self._follower.command([action[key] for key in JOINT_KEYS])
+        return action
+
+
+# ------------------------ Measurement ------------------------ #
+def run_latency_session(
+    robot: Any,
+    teleop: Any,
+    read_leader: Callable[[], np.ndarray],
+    read_follower: Callable[[], np.ndarray],
+    read_timing: Callable[[], Tuple[float, float]],
+    duration_s: float,
+    loop_hz: float,
+    sample_hz: float,
+) -> Dict[str, np.ndarray]:
+    """Run the teleop loop while sampling leader and follower joint streams.
+
+    Each tick records the serial read duration, the age of the leader sample,
+    and the time spent in teleop.get_action and robot.send_action.
+    """
+    max_samples = int(duration_s * sample_hz) + 1
+    max_ticks = int(duration_s * loop_hz) + 1
+    leader_recorder = JointStreamRecorder(read_leader, sample_hz, max_samples)
+    follower_recorder = JointStreamRecorder(read_follower, sample_hz, max_samples)
+    stages = np.zeros((max_ticks, 4), dtype=float)
+
+    leader_recorder.start()
+    follower_recorder.start()
+    period = 1.0 / loop_hz
+    start = time.perf_counter()
+    next_tick = start
+    num_ticks = 0
+    try:
+        while num_ticks < max_ticks and time.perf_counter() - start < duration_s:
+            stamp, read_duration = read_timing()
+            t0 = time.perf_counter()
+            action = teleop.get_action()
+            t1 = time.perf_counter()
+            robot.send_action(action)
+            t2 = time.perf_counter()
+            stages[num_ticks] = (read_duration, t0 - stamp, t1 - t0, t2 - t1)
+            num_ticks += 1
+
+            next_tick += period
+            sleep_s = next_tick - time.perf_counter()
+            if sleep_s > 0:
+                time.sleep(sleep_s)
+            else:
+                next_tick = time.perf_counter()
+    finally:
+        leader_t, leader_q = leader_recorder.stop()
+        follower_t, follower_q = follower_recorder.stop()
+
+    return {
+        "leader_t": leader_t,
+        "leader_q": leader_q,
+        "follower_t": follower_t,
+        "follower_q": follower_q,
+        "stages": stages[:num_ticks],
+    }
+
+
+def analyze_latency(
+    session: Dict[str, np.ndarray],
+    loop_hz: float,
+    sample_hz: float,
+    max_latency_s: float = 1.0,
+) -> Dict[str, Any]:
+    """Estimate per-joint latency and split it into pipeline stages (all in ms).
+
+    The cross-correlation is taken between leader and follower velocities on
+    a shared grid. Since the sampled leader stream is already as stale as the
+    serial cache, the serial stage is added on top of the correlation lag to
+    get the end-to-end latency.
+    """
+    _, leader, follower = resample_streams(
+        session["leader_t"], session["leader_q"], session["follower_t"], session["follower_q"], sample_hz
+    )
+    # The follower moves in loop-rate steps; the same one-tick box filter on
+    # both velocities smooths that out without shifting the lag.
+    width = max(int(round(sample_hz / loop_hz)), 1)
+    kernel = np.ones(width) / width
+    leader_vel = np.apply_along_axis(np.convolve, 0, np.gradient(leader, axis=0), kernel, mode="same")
+    follower_vel = np.apply_along_axis(np.convolve, 0, np.gradient(follower, axis=0), kernel, mode="same")
+    lag, peak = estimate_lag_xcorr(leader_vel, follower_vel, int(max_latency_s * sample_hz))
+    joint_ms = lag / sample_hz * 1e3
+
+    valid = peak >= MIN_CORRELATION
+    measured_ms = float(np.median(joint_ms[valid])) if np.any(valid) else float("nan")
+
+    stages = session["stages"] * 1e3
+    serial_ms = float(np.mean(0.5 * stages[:, 0] + stages[:, 1]))
+    loop_wait_ms = 0.5e3 / loop_hz
+    teleop_ms = float(np.mean(stages[:, 2]))
+    send_ms = float(np.mean(stages[:, 3]))
+    tracking_ms = measured_ms - loop_wait_ms - teleop_ms - send_ms
+
+    return {
+        "joint_latency_ms": joint_ms.tolist(),
+        "joint_correlation": peak.tolist(),
+        "end_to_end_ms": serial_ms + measured_ms,
+        "breakdown_ms": {
+            "serial_read": serial_ms,
+            "loop_wait": loop_wait_ms,
+            "teleop_compute": teleop_ms,
+            "send_action": send_ms,
+            "controller_tracking": tracking_ms,
+        },
+        "stage_p95_ms": {
+            "serial_read": float(np.percentile(stages[:, 0], 95)),
+            "teleop_compute": float(np.percentile(stages[:, 2], 95)),
+            "send_action": float(np.percentile(stages[:, 3], 95)),
+        },
+        "num_ticks": int(len(stages)),
+    }
+
+
+def log_report(report: Dict[str, Any]) -> None:
+    logger.info("\n===== [LATENCY] Leader -> follower latency =====")
+    for i, key in enumerate(JOINT_KEYS):
+        logger.info(
+            "%s: %7.1f ms (correlation %.2f)",
+            key,
+            report["joint_latency_ms"][i],
+            report["joint_correlation"][i],
+        )
+    logger.info("End-to-end latency: %.1f ms over %d ticks", report["end_to_end_ms"], report["num_ticks"])
+    for stage, value in report["breakdown_ms"].items():
+        logger.info("  %-20s %7.1f ms", stage, value)
+    logger.info("===== [LATENCY] Done =====\n")
+
+
+# ------------------------ Sessions ------------------------ #
+def run_fake(duration_s: float, loop_hz: float, sample_hz: float, max_latency_s: float) -> Dict[str, Any]:
+    """Run the measurement against stand-ins with known delays and check the estimate."""
+    leader = FakeLeaderArm(duration_s)
+    follower = FakeFollowerArm()
+    teleop = FakeTeleop(leader)
+    robot = FakeRobot(follower)
+
+    session = run_latency_session(
+        robot,
+        teleop,
+        read_leader=leader.get_joint_state,
+        read_follower=follower.getActualQ,
+        read_timing=leader.get_read_timing,
+        duration_s=duration_s,
+        loop_hz=loop_hz,
+        sample_hz=sample_hz,
+    )
+    report = analyze_latency(session, loop_hz, sample_hz, max_latency_s)
+    log_report(report)
+
+    expected_tracking_ms = (follower.delay_s + follower.tau_s) * 1e3
+    # The loop wait is taken as its mean of half a period, so allow a tenth of a period for its
+    # spread plus a few ms of sampling; stand-in runs land within about 5 ms of the injected value
+    tolerance_ms = 0.1e3 / loop_hz + 8.0
+    error_ms = report["breakdown_ms"]["controller_tracking"] - expected_tracking_ms
+    status = "PASS" if abs(error_ms) <= tolerance_ms else "FAIL"
+    logger.info(
+        "[FAKE] Injected tracking %.1f ms, estimated %.1f ms (tolerance %.1f ms): %s",
+        expected_tracking_ms,
+        report["breakdown_ms"]["controller_tracking"],
+        tolerance_ms,
+        status,
+    )
+    report["fake_check"] = {"expected_tracking_ms": expected_tracking_ms, "status": status}
+    return report
+
+
+def run_hardware(cfg: Dict[str, Any], duration_s: float, loop_hz: float, sample_hz: float, max_latency_s: float) -> Dict[str, Any]:
+    from lerobot_robot_ur5e import UR5e
+    from lerobot_teleoperator_ur5e import UR5eTeleop
+    from scripts.core.run_record import RecordConfig, make_robot_config, make_teleop_config
+
+    record_cfg = RecordConfig(cfg["record"])
+    if record_cfg.debug:
+        logger.warning("record.debug is True, so the UR5e will not move and latency cannot be measured.")
+
+    robot = UR5e(make_robot_config(record_cfg, camera_config={}))
+    teleop = UR5eTeleop(make_teleop_config(record_cfg))
+    teleop.set_robot(robot)
+    robot.connect()
+    teleop.connect()
+    try:
+        robot.set_episode_reference_pose()
+        driver = teleop.dynamixel_robot._driver
+        input(f"Press Enter, then make a few sharp motions on every master joint for {duration_s:.0f} s...")
+        session = run_latency_session(
+            robot,
+            teleop,
+            read_leader=lambda: teleop.dynamixel_robot.get_joint_state()[:6],
+            read_follower=robot.get_joint_positions,
+            read_timing=driver.get_read_timing,
+            duration_s=duration_s,
+            loop_hz=loop_hz,
+            sample_hz=sample_hz,
+        )
+    finally:
+        robot.stop_force()
+        robot.disconnect()
+        teleop.disconnect()
+
+    report = analyze_latency(session, loop_hz, sample_hz, max_latency_s)
+    log_report(report)
+    return report
+
+
+# ------------------------ Main ------------------------ #
+def main():
+    parent_path = Path(__file__).resolve().parent
+    cfg_path = parent_path.parent / "config" / "cfg.yaml"
+    with open(cfg_path, "r") as f:
+        cfg = yaml.safe_load(f)
+
+    parser = argparse.ArgumentParser(description="Measure leader-to-follower teleop latency")
+    parser.add_argument("--duration", type=float, default=15.0, help="Measurement duration in seconds.")
+    parser.add_argument(
+        "--loop-rate",
+        type=float,
+        default=float(cfg["record"].get("fps", 15)),
+        help="Teleop loop rate in Hz. Defaults to record.fps.",
+    )
+    parser.add_argument("--sample-rate", type=float, default=500.0, help="Leader/follower sample rate in Hz.")
+    parser.add_argument("--max-latency", type=float, default=1.0, help="Largest latency searched, in seconds.")
+    parser.add_argument("--fake", action="store_true", help="Run against local fake robot and driver stand-ins.")
+    parser.add_argument("--output", type=Path, default=None, help="Write the report as JSON to this file.")
+    args = parser.parse_args()
+
+    if args.fake:
+        report = run_fake(args.duration, args.loop_rate, args.sample_rate, args.max_latency)
+    else:
+        report = run_hardware(cfg, args.duration, args.loop_rate, args.sample_rate, args.max_latency)
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        logger.info("Report written to %s", args.output)
@@ -0,0 +1,170 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from scripts.utils.signal_utils import estimate_lag_segments
+
+# ------------------------ Logging Setup ------------------------ #
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+JOINT_NAMES = [f"joint_{i}.pos" for i in range(1, 7)]
+GROUPS = {
+    "joint": JOINT_NAMES,
+    "tcp_pose": [f"tcp_pose.{axis}" for axis in ("x", "y", "z", "rx", "ry", "rz")],
+    "tcp_force": [f"tcp_force.{axis}" for axis in ("x", "y", "z", "rx", "ry", "rz")],
+}
+ANGLE_NAMES = {*JOINT_NAMES, "tcp_pose.rx", "tcp_pose.ry", "tcp_pose.rz"}  # errors wrap to [-pi, pi)
+SPEED_NAMES = [f"tcp_speed.{axis}" for axis in ("x", "y", "z", "rx", "ry", "rz")]
+SATURATION_RATIO = 0.95  # a force-mode axis moving at this fraction of its speed limit counts as saturated
+
+
+# ------------------------ Recording ------------------------ #
+class TrackingRecorder:
+    """Collects the achieved state at each replayed frame into a (num_frames, D) array.
+
+    Columns follow the dataset's observation.state names so the result lines
+    up with the recorded observations; frames that were never sent (skipped
+    by the scheduler) stay NaN.
+    """
+
+    def __init__(self, names: Sequence[str], num_frames: int):
+        self.names = list(names)
+        self.achieved = np.full((num_frames, len(self.names)), np.nan)
+
+    def add(self, index: int, observation: Dict[str, Any]) -> None:
+        row = self.achieved[index]
+        for col, name in enumerate(self.names):
+            value = observation.get(name)
+            if value is not None:
+                row[col] = value
+
+
+# ------------------------ Comparison ------------------------ #
+def wrap_angles(values: np.ndarray, angles: np.ndarray) -> np.ndarray:
+    """Wrap the angle columns of a (N, D) difference to [-pi, pi)."""
+    values = values.copy()
+    values[:, angles] = (values[:, angles] + np.pi) % (2 * np.pi) - np.pi
+    return values
+
+
+def contiguous_runs(mask: np.ndarray) -> List[np.ndarray]:
+    """Frame indices of each run of consecutive True values in `mask`."""
+    edges = np.diff(np.r_[0, mask.astype(np.int8), 0])
+    return [np.arange(start, stop) for start, stop in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1))]
+
+
+def compare_tracking(
+    recorded: np.ndarray,
+    achieved: np.ndarray,
+    names: Sequence[str],
+    frame_period_s: float,
+    max_lag_frames: int = 10,
+    force_limit: Optional[Sequence[float]] = None,
+    select_vector: Optional[Sequence[int]] = None,
+) -> Dict[str, Any]:
+    """Per-channel error, lag and force-mode saturation of a replayed episode against its recording.
+
+    `recorded` and `achieved` are (num_frames, D) with columns named by
+    `names`. Error is achieved - recorded, wrapped for angles; lag is how many
+    frames the achieved signal trails the recorded one, from the correlation
+    of their velocities within each contiguous run of compared frames.
+    `force_limit` holds forceMode's per-axis speed limits; when given,
+    saturation is the fraction of frames a compliant axis (non-zero in
+    `select_vector`, all six by default) moved at or above SATURATION_RATIO
+    of its limit.
+    """
+    index = {name: col for col, name in enumerate(names)}
+    tracked = [index[name] for group_names in GROUPS.values() for name in group_names if name in index]
+    valid = np.all(np.isfinite(achieved[:, tracked]), axis=1) & np.all(np.isfinite(recorded[:, tracked]), axis=1)
+    report: Dict[str, Any] = {"frames_compared": int(valid.sum()), "groups": {}, "channels": {}}
+    if valid.sum() < 2:
+        return report
+    # Lag is estimated within runs of consecutive frames, never across the gap left by a skipped one
+    runs = [run for run in contiguous_runs(valid) if len(run) > 2]
+
+    for group, group_names in GROUPS.items():
+        present = [name for name in group_names if name in index]
+        if not present:
+            continue
+        cols = [index[name] for name in present]
+        x, y = recorded[valid][:, cols], achieved[valid][:, cols]
+        angles = np.array([name in ANGLE_NAMES for name in present])
+        error = wrap_angles(y - x, angles)
+        rms = np.sqrt(np.mean(error**2, axis=0))
+        max_abs = np.abs(error).max(axis=0)
+        x_vel = [wrap_angles(np.diff(recorded[run][:, cols], axis=0), angles) for run in runs]
+        y_vel = [wrap_angles(np.diff(achieved[run][:, cols], axis=0), angles) for run in runs]
+        if x_vel:
+            lag, corr = estimate_lag_segments(x_vel, y_vel, max_lag_frames)
+        else:
+            lag = corr = np.full(len(cols), np.nan)
+        for i, name in enumerate(present):
+            report["channels"][name] = {
+                "rms": round(float(rms[i]), 6),
+                "max": round(float(max_abs[i]), 6),
+                "lag_frames": round(float(lag[i]), 3),
+                "lag_ms": round(float(lag[i]) * frame_period_s * 1e3, 2),
+                "correlation": round(float(corr[i]), 4),
+            }
+        median_lag = np.nanmedian(lag) if np.any(np.isfinite(lag)) else np.nan
+        report["groups"][group] = {
+            "rms": round(float(np.sqrt(np.mean(rms**2))), 6),
+            "max": round(float(max_abs.max()), 6),
+            "median_lag_ms": round(float(median_lag) * frame_period_s * 1e3, 2),
+        }
+
+    if force_limit is not None and all(name in index for name in SPEED_NAMES):
+        compliant = np.asarray(select_vector if select_vector is not None else [1] * 6) != 0
+        speed_names = [name for name, on in zip(SPEED_NAMES, compliant) if on]
+        speed = np.abs(achieved[:, [index[name] for name in speed_names]])
+        speed = speed[np.all(np.isfinite(speed), axis=1)]
+        saturated = speed >= SATURATION_RATIO * np.asarray(force_limit, dtype=float)[compliant]
+        report["saturation"] = {
+            name: round(float(fraction), 4) for name, fraction in zip(speed_names, saturated.mean(axis=0))
+        }
+        report["saturated_frames"] = int(np.any(saturated, axis=1).sum())
+    return report
+
+
+def log_tracking(title: str, report: Dict[str, Any]) -> None:
+    parts = [
+        f"{group} rms {stats['rms']:.4f} / max {stats['max']:.4f} / lag {stats['median_lag_ms']:+.0f} ms"
+        for group, stats in report["groups"].items()
+    ]
+    if "saturated_frames" in report:
+        parts.append(f"{report['saturated_frames']} frames at the force-mode speed limit")
+    logger.info(f"====== [TRACKING] {title}: {', '.join(parts) or 'nothing to compare'} ======")
+
+
+# ------------------------ Output ------------------------ #
+def write_tracking_report(path: Path, episodes: List[Dict[str, Any]]) -> Path:
+    """Write JSON, or one row per episode and channel when the path ends in .parquet."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix != ".parquet":
+        with open(path, "w") as f:
+            json.dump({"episodes": episodes}, f, indent=2)
+        return path
+
+    rows: Dict[str, list] = {
+        "dataset": [], "episode_index": [], "channel": [],
+        "rms": [], "max": [], "lag_frames": [], "lag_ms": [], "correlation": [], "saturation": [],
+    }
+    for episode in episodes:
+        saturation = episode.get("saturation", {})
+        for name, stats in episode["channels"].items():
+            rows["dataset"].append(episode["dataset"])
+            rows["episode_index"].append(episode["episode_index"])
+            rows["channel"].append(name)
+            for key in ("rms", "max", "lag_frames", "lag_ms", "correlation"):
+                rows[key].append(stats[key])
+            speed_name = name.replace("tcp_force.", "tcp_speed.") if name.startswith("tcp_force.") else None
+            rows["saturation"].append(saturation.get(speed_name))
+    pq.write_table(pa.table(rows), path)
+    return path
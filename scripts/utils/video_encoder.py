@@ -0,0 +1,415 @@
+import itertools
+import logging
+import multiprocessing as mp
+import queue
+import shutil
+import threading
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import av
+import numpy as np
+
+# ------------------------ Logging Setup ------------------------ #
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+logging.getLogger("libav").setLevel(logging.ERROR)
+
+_STOP = object()
+
+SUPPORTED_VCODECS = ("h264", "hevc", "libsvtav1")
+
+# Fragmented mp4 stays readable up to the last fragment if the recorder dies before closing it
+FRAGMENTED_MP4 = {"movflags": "frag_keyframe+empty_moov+default_base_moof", "flush_packets": "1"}
+
+
+def make_codec_options(vcodec: str, g: Optional[int], crf: Optional[int], threads: int = 0) -> Dict[str, str]:
+    """Codec options matching lerobot's encode_video_frames; threads=0 lets the codec decide."""
+    if vcodec not in SUPPORTED_VCODECS:
+        raise ValueError(f"Unsupported video codec: {vcodec}. Supported codecs are: {', '.join(SUPPORTED_VCODECS)}.")
+    options: Dict[str, str] = {}
+    if g is not None:
+        options["g"] = str(g)
+    if crf is not None:
+        options["crf"] = str(crf)
+    if threads:
+        options["threads"] = str(threads)
+    return options
+
+
+# ------------------------ Video Sink ------------------------ #
+class VideoSink:
+    """One open mp4 file; frame i is written with pts i, so video and parquet rows line up."""
+
+    def __init__(self, video_path: Path, fps: int, vcodec: str, pix_fmt: str, options: Dict[str, str],
+                 container_options: Optional[Dict[str, str]] = None):
+        self.video_path = Path(video_path)
+        self.fps = fps
+        self.vcodec = vcodec
+        self.pix_fmt = pix_fmt
+        self.options = options
+        self.container_options = container_options or {}
+        self._container = None
+        self._stream = None
+
+    def write(self, frame_index: int, image: np.ndarray) -> None:
+        if self._container is None:
+            self.video_path.parent.mkdir(parents=True, exist_ok=True)
+            self._container = av.open(str(self.video_path), "w", options=self.container_options)
+            self._stream = self._container.add_stream(self.vcodec, self.fps, options=self.options)
+            self._stream.pix_fmt = self.pix_fmt
+            self._stream.width = image.shape[1]
+            self._stream.height = image.shape[0]
+        frame = av.VideoFrame.from_ndarray(np.ascontiguousarray(image), format="rgb24")
+        frame.pts = frame_index
+        self._container.mux(self._stream.encode(frame))
+
+    def close(self, flush: bool = True) -> None:
+        if self._container is None:
+            return
+        try:
+            if flush:
+                self._container.mux(self._stream.encode())
+        finally:
+            self._container.close()
+            self._container = None
+
+
+# ------------------------ Stream Copy ------------------------ #
+def remux_video_span(src_path: Path, dst_path: Path, start_s: float, end_s: float) -> float:
+    """Copy the packets covering [start_s, end_s] of an mp4 into a new file, without re-encoding.
+
+    Copying starts at the keyframe at or before `start_s` and stops at the
+    first keyframe after `end_s`, so every frame in the span stays decodable.
+    Timestamps are rebased so that keyframe is presented at 0; returns the
+    time in the new file that corresponds to `start_s` in the source.
+    """
+    dst_path = Path(dst_path)
+    dst_path.parent.mkdir(parents=True, exist_ok=True)
+    with av.open(str(src_path)) as src, av.open(str(dst_path), "w") as dst:
+        in_stream = src.streams.video[0]
+        out_stream = dst.add_stream_from_template(in_stream, opaque=True)
+        time_base = in_stream.time_base
+        src.seek(int(start_s / time_base), stream=in_stream, backward=True, any_frame=False)
+        offset = None
+        for packet in src.demux(in_stream):
+            if packet.dts is None:
+                continue
+            if offset is None:
+                offset = packet.pts  # the keyframe is presented first; it becomes time 0
+            elif packet.is_keyframe and packet.pts * time_base > end_s:
+                break
+            packet.dts -= offset
+            packet.pts -= offset
+            packet.stream = out_stream
+            dst.mux(packet)
+    return start_s - float((offset or 0) * time_base)
+
+
+# ------------------------ Thread Encoder ------------------------ #
+class StreamEncoder:
+    """Encodes one camera stream of one episode in a background thread.
+
+    Frames must arrive in order. The queue is bounded and put() blocks when
+    it is full.
+    """
+
+    def __init__(
+        self,
+        video_path: Path,
+        fps: int,
+        vcodec: str = "libsvtav1",
+        pix_fmt: str = "yuv420p",
+        g: Optional[int] = 2,
+        crf: Optional[int] = 30,
+        threads: int = 0,
+        max_queue: int = 60,
+        container_options: Optional[Dict[str, str]] = None,
+    ):
+        self.video_path = Path(video_path)
+        self.num_frames = 0
+        self._sink = VideoSink(
+            video_path, fps, vcodec, pix_fmt, make_codec_options(vcodec, g, crf, threads), container_options
+        )
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._error: Optional[BaseException] = None
+        self._aborted = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"encoder-{self.video_path.stem}", daemon=True)
+        self._thread.start()
+
+    def put(self, frame_index: int, image: np.ndarray) -> None:
+        self.raise_if_failed()
+        if frame_index != self.num_frames:
+            raise RuntimeError(
+                f"Frame {frame_index} sent to {self.video_path.name}, expected frame {self.num_frames}"
+            )
+        self._queue.put((frame_index, image))
+        self.num_frames += 1
+
+    def raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"Encoding {self.video_path.name} failed: {self._error}") from self._error
+
+    def finish(self) -> Path:
+        """Flush the encoder and close the file; returns the finished mp4."""
+        self._stop()
+        self.raise_if_failed()
+        if self.num_frames == 0 or not self.video_path.exists():
+            raise OSError(f"Video encoding did not work. File not found: {self.video_path}.")
+        return self.video_path
+
+    def abort(self) -> None:
+        """Stop without flushing and delete the partial video."""
+        self._aborted = True
+        self._stop()
+        shutil.rmtree(self.video_path.parent, ignore_errors=True)
+
+    def _stop(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def _run(self) -> None:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+                if self._error is not None or self._aborted:
+                    continue
+                frame_index, image = item
+                self._sink.write(frame_index, image)
+            self._sink.close(flush=not self._aborted)
+        except Exception as e:
+            self._error = e
+            logger.info(f"====== [ERROR] Encoding {self.video_path.name} failed: {e} ======")
+            # Keep consuming so a blocked put() can return and report the error
+            while self._queue.get() is not _STOP:
+                pass
+            self._sink.close(flush=False)
+
+
+# ------------------------ Process Pool ------------------------ #
+def _encoder_worker(commands, results) -> None:
+    """Worker process loop; encodes every stream assigned to it from shared-memory rings."""
+    sinks: Dict[int, VideoSink] = {}
+    rings: Dict[int, Tuple[shared_memory.SharedMemory, np.ndarray]] = {}
+    errors: Dict[int, str] = {}
+    while True:
+        cmd = commands.get()
+        kind, stream_id = cmd[0], cmd[1]
+        if kind == "stop":
+            break
+        try:
+            if kind == "open":
+                _, _, video_path, fps, vcodec, pix_fmt, options, container_options, shm_name, shape = cmd
+                shm = shared_memory.SharedMemory(name=shm_name)
+                rings[stream_id] = (shm, np.ndarray(shape, dtype=np.uint8, buffer=shm.buf))
+                sinks[stream_id] = VideoSink(video_path, fps, vcodec, pix_fmt, options, container_options)
+            elif kind == "frame":
+                _, _, slot, frame_index = cmd
+                if stream_id not in errors:
+                    sinks[stream_id].write(frame_index, rings[stream_id][1][slot])
+                results.put(("free", stream_id, slot))
+            elif kind in ("close", "abort"):
+                sink = sinks.pop(stream_id, None)
+                if sink is not None:
+                    sink.close(flush=kind == "close" and stream_id not in errors)
+                if stream_id in rings:
+                    shm, view = rings.pop(stream_id)
+                    del view  # the mapping cannot close while an array still points into it
+                    shm.close()
+                results.put(("done", stream_id, errors.pop(stream_id, None)))
+        except Exception as e:
+            if stream_id not in errors:
+                errors[stream_id] = f"{type(e).__name__}: {e}"
+                results.put(("error", stream_id, errors[stream_id]))
+            if kind == "frame":
+                results.put(("free", stream_id, cmd[2]))
+            elif kind in ("close", "abort"):
+                results.put(("done", stream_id, errors.pop(stream_id)))
+
+
+class EncoderPool:
+    """Process pool that encodes camera streams outside the recording process.
+
+    Each stream (one camera of one episode) is pinned to the least busy worker
+    process. Frames travel through a per-stream shared-memory ring of
+    `ring_slots` frames; only slot numbers are sent over the queues, so images
+    are never pickled. A full ring blocks the producer, like the thread encoder.
+    """
+
+    def __init__(self, num_workers: int = 2, ring_slots: int = 30):
+        self.ring_slots = ring_slots
+        ctx = mp.get_context("spawn")  # the recording process runs driver threads; do not fork it
+        self._results = ctx.Queue()
+        self._workers: List[Tuple[mp.Process, object]] = []
+        for i in range(num_workers):
+            commands = ctx.Queue()
+            proc = ctx.Process(target=_encoder_worker, args=(commands, self._results), name=f"encoder-{i}", daemon=True)
+            proc.start()
+            self._workers.append((proc, commands))
+        self._load = [0] * num_workers
+        self._streams: Dict[int, "PooledStreamEncoder"] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._dispatcher = threading.Thread(target=self._dispatch, name="encoder-pool", daemon=True)
+        self._dispatcher.start()
+
+    def open_stream(self, video_path: Path, fps: int, vcodec: str = "libsvtav1", pix_fmt: str = "yuv420p",
+                    g: Optional[int] = 2, crf: Optional[int] = 30, threads: int = 0,
+                    container_options: Optional[Dict[str, str]] = None) -> "PooledStreamEncoder":
+        options = make_codec_options(vcodec, g, crf, threads)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Encoder pool is closed")
+            worker = min(range(len(self._workers)), key=lambda i: self._load[i])
+            self._load[worker] += 1
+            stream = PooledStreamEncoder(
+                self, next(self._ids), worker, video_path, fps, vcodec, pix_fmt, options, container_options
+            )
+            self._streams[stream.stream_id] = stream
+        return stream
+
+    def _send(self, worker: int, cmd: tuple) -> None:
+        self._workers[worker][1].put(cmd)
+
+    def _release(self, stream: "PooledStreamEncoder") -> None:
+        with self._lock:
+            if self._streams.pop(stream.stream_id, None) is not None:
+                self._load[stream.worker] -= 1
+
+    def _dispatch(self) -> None:
+        while True:
+            try:
+                kind, stream_id, payload = self._results.get(timeout=0.5)
+            except queue.Empty:
+                if self._closed:
+                    return
+                self._check_workers()
+                continue
+            with self._lock:
+                stream = self._streams.get(stream_id)
+            if stream is None:
+                continue
+            if kind == "free":
+                stream._free.put(payload)
+            elif kind == "error":
+                stream._set_error(payload)
+            elif kind == "done":
+                stream._set_done(payload)
+
+    def _check_workers(self) -> None:
+        for index, (proc, _) in enumerate(self._workers):
+            if proc.is_alive():
+                continue
+            with self._lock:
+                lost = [s for s in self._streams.values() if s.worker == index and not s._done.is_set()]
+            for stream in lost:
+                stream._set_done(f"encoder process {proc.name} exited with code {proc.exitcode}")
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        with self._lock:
+            streams = list(self._streams.values())
+        for stream in streams:
+            stream.abort()
+        self._closed = True
+        for proc, commands in self._workers:
+            commands.put(("stop", None))
+        for proc, _ in self._workers:
+            proc.join(timeout=5.0)
+            if proc.is_alive():
+                proc.terminate()
+        self._dispatcher.join()
+
+
+class PooledStreamEncoder:
+    """Parent-side handle of a stream encoded in an EncoderPool; same interface as StreamEncoder."""
+
+    def __init__(self, pool: EncoderPool, stream_id: int, worker: int, video_path: Path, fps: int,
+                 vcodec: str, pix_fmt: str, options: Dict[str, str], container_options: Optional[Dict[str, str]]):
+        self.video_path = Path(video_path)
+        self.stream_id = stream_id
+        self.worker = worker
+        self.num_frames = 0
+        self._pool = pool
+        self._open_args = (str(video_path), fps, vcodec, pix_fmt, options, container_options or {})
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        self._ring: Optional[np.ndarray] = None
+        self._free: queue.Queue = queue.Queue()
+        self._done = threading.Event()
+        self._error: Optional[str] = None
+        self._ended = False
+
+    def put(self, frame_index: int, image: np.ndarray) -> None:
+        self.raise_if_failed()
+        if frame_index != self.num_frames:
+            raise RuntimeError(
+                f"Frame {frame_index} sent to {self.video_path.name}, expected frame {self.num_frames}"
+            )
+        image = np.asarray(image, dtype=np.uint8)
+        if self._ring is None:
+            self._open_ring(image.shape)
+        elif image.shape != self._ring.shape[1:]:
+            raise ValueError(f"Frame shape {image.shape} does not match {self._ring.shape[1:]} for {self.video_path.name}")
+
+        slot = self._free.get()
+        while slot is None:  # woken up by a failure
+            self.raise_if_failed()
+            slot = self._free.get()
+        self._ring[slot] = image
+        self._pool._send(self.worker, ("frame", self.stream_id, slot, frame_index))
+        self.num_frames += 1
+
+    def _open_ring(self, shape: Tuple[int, ...]) -> None:
+        ring_shape = (self._pool.ring_slots, *shape)
+        self._shm = shared_memory.SharedMemory(create=True, size=int(np.prod(ring_shape)))
+        self._ring = np.ndarray(ring_shape, dtype=np.uint8, buffer=self._shm.buf)
+        for slot in range(ring_shape[0]):
+            self._free.put(slot)
+        self._pool._send(self.worker, ("open", self.stream_id, *self._open_args, self._shm.name, ring_shape))
+
+    def raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise RuntimeError(f"Encoding {self.video_path.name} failed: {self._error}")
+
+    def finish(self) -> Path:
+        """Wait for the worker to flush and close the file; returns the finished mp4."""
+        self._end("close")
+        self.raise_if_failed()
+        if self.num_frames == 0 or not self.video_path.exists():
+            raise OSError(f"Video encoding did not work. File not found: {self.video_path}.")
+        return self.video_path
+
+    def abort(self) -> None:
+        """Stop without flushing and delete the partial video."""
+        self._end("abort")
+        shutil.rmtree(self.video_path.parent, ignore_errors=True)
+
+    def _set_error(self, error: str) -> None:
+        if self._error is None:
+            self._error = error
+        self._free.put(None)
+
+    def _set_done(self, error: Optional[str]) -> None:
+        if error is not None:
+            self._set_error(error)
+        self._done.set()
+
+    def _end(self, kind: str) -> None:
+        if self._ended:
+            return
+        self._ended = True
+        if self._ring is not None:
+            self._pool._send(self.worker, (kind, self.stream_id))
+            self._done.wait()
+            self._ring = None
+            self._shm.close()
+            self._shm.unlink()
+        self._pool._release(self)
@@ -27,15 +27,23 @@ setup(
             # utils commands (data utilities)
             "utils-hardware-offsets = scripts.utils.teleop_hardware_offsets:main",
             "utils-joint-offsets = scripts.utils.teleop_joint_offsets:main",
+            "utils-fit-calibration = scripts.utils.fit_teleop_calibration:main",
+            "utils-teleop-latency = scripts.utils.teleop_latency:main",
 
             # tools commands (helper tools)
             "tools-check-info = scripts.tools.check_dataset_info:main",
             "tools-check-rs = scripts.tools.rs_devices:main",
             "tools-check-dataset = scripts.tools.check_dataset:main",
             "tools-prune-dataset = scripts.tools.prune_episodes:main",
+            "tools-recover-episode = scripts.tools.recover_episode:main",
 
             # test commands (testing scripts)
             "test-gripper-ctrl = scripts.test.gripper_ctrl:main",
+            "test-bench-force-control = scripts.test.bench_force_control:main",
+            "test-bench-video-encoding = scripts.test.bench_video_encoding:main",
+            "test-bench-frame-journal = scripts.test.bench_frame_journal:main",
+            "test-bench-visualize-load = scripts.test.bench_visualize_load:main",
+            "test-bench-tracking-report = scripts.test.bench_tracking_report:main",
             # unified help command
             "ur5e-help = scripts.help.help_info:main",
         ]